@@ -0,0 +1,146 @@
+"""Cost of living indices from an item-level price basket.
+
+`data/col_basket.csv` holds one row per item: its category, its monthly
+quantity per unit of category weight and one reference price per location,
+in the location's currency. The prices are approximate 2024 city prices.
+Observations in column form (`PriceBasket.from_columns`) may price an item
+any number of times per location; its price is then their mean.
+
+Loading reduces the table once to a (locations, categories) matrix of
+monthly cost, one partial sum per category. Household weights then only
+scale the categories, so an index for any household is one matrix-vector
+product instead of a pass over the observations.
+"""
+import csv
+import functools
+import os
+
+import numpy as np
+
+from currencies import CURRENCIES
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "col_basket.csv")
+
+# Basket categories in matrix order, with their display names
+CATEGORIES = {
+    "rent_1br": "Rent (1 bedroom)",
+    "rent_2br": "Rent (2 bedrooms)",
+    "rent_3br": "Rent (3 bedrooms)",
+    "groceries": "Groceries",
+    "schooling": "Schooling",
+    "insurance": "Insurance",
+    "transport": "Transport",
+}
+
+# Index base location, whose index is 100
+BASE_LOCATION = "NL"
+
+
+def household_weights(bedrooms=2, adults=1, children=0):
+    """Category weights of a household renting `bedrooms` bedrooms.
+
+    Adults count fully towards groceries, insurance and transport; children
+    count towards schooling and partly towards groceries and insurance.
+    """
+    weights = dict.fromkeys(CATEGORIES, 0.0)
+    weights[f"rent_{bedrooms}br"] = 1.0
+    weights["groceries"] = adults + 0.6 * children
+    weights["schooling"] = float(children)
+    weights["insurance"] = adults + 0.4 * children
+    weights["transport"] = float(adults)
+    return np.array(list(weights.values()))
+
+
+class PriceBasket:
+    """Monthly cost of every basket category per location, in local currency"""
+
+    def __init__(self, locations, currencies, costs):
+        self.locations = list(locations)
+        self.currencies = list(currencies)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.costs.setflags(write=False)
+        self._currency_idx = CURRENCIES.index(self.currencies)
+
+    @classmethod
+    def from_columns(cls, location, category, item, price, quantity, currencies):
+        """Aggregate observation columns into per-category partial sums.
+
+        `location`, `category` and `item` are integer codes into the lists
+        `currencies` (keyed by location code), `CATEGORIES` and any item list;
+        prices are averaged per (location, item) and weighted by quantity.
+        """
+        location_codes = list(currencies)
+        location = np.asarray(location, dtype=np.int64)
+        category = np.asarray(category, dtype=np.int64)
+        item = np.asarray(item, dtype=np.int64)
+        price = np.asarray(price, dtype=np.float64)
+        quantity = np.asarray(quantity, dtype=np.float64)
+
+        # One group per (location, item): its mean price times its quantity
+        groups, group_idx = np.unique(location * (item.max() + 1) + item, return_inverse=True)
+        counts = np.bincount(group_idx)
+        item_cost = np.bincount(group_idx, weights=price * quantity) / counts
+
+        # An item belongs to one category, so any of its rows gives its cell
+        cell = np.empty(groups.size, dtype=np.int64)
+        cell[group_idx] = location * len(CATEGORIES) + category
+        costs = np.bincount(cell, weights=item_cost, minlength=len(location_codes) * len(CATEGORIES))
+        return cls(location_codes, [currencies[code] for code in location_codes],
+                   costs.reshape(len(location_codes), len(CATEGORIES)))
+
+    @classmethod
+    def from_csv(cls, path, currencies):
+        """Load a basket file; `currencies` maps its location codes to currency codes.
+
+        Each row is one item: its category, name and monthly quantity, then
+        one price column per location code. An empty price means the item is
+        not priced there.
+        """
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            price_columns = header[3:]
+            unknown = sorted(set(price_columns) - set(currencies))
+            if unknown:
+                raise ValueError(f"Unknown basket location: {', '.join(unknown)}")
+            location, category, item, price, quantity = [], [], [], [], []
+            for row in reader:
+                if not row:
+                    continue
+                if row[0] not in CATEGORIES:
+                    raise ValueError(f"Unknown basket category: {row[0]}")
+                for code, value in zip(price_columns, row[3:]):
+                    if value.strip():
+                        location.append(list(currencies).index(code))
+                        category.append(list(CATEGORIES).index(row[0]))
+                        item.append(reader.line_num)
+                        price.append(float(value))
+                        quantity.append(float(row[2]))
+        return cls.from_columns(location, category, item, price, quantity, currencies)
+
+    def monthly_cost(self, weights, fx_rates=None):
+        """Monthly EUR cost of the weighted basket in every location.
+
+        `weights` has one entry per category, or shape (..., categories).
+        """
+        local = np.asarray(weights, dtype=np.float64) @ self.costs.T
+        return local / CURRENCIES.rates(fx_rates)[self._currency_idx]
+
+    def index(self, weights, fx_rates=None, base=BASE_LOCATION):
+        """Cost of living index per location code for one household, `base` = 100.
+
+        Locations without prices in the basket are left out.
+        """
+        cost = self.monthly_cost(weights, fx_rates)
+        index = cost * 100 / cost[self.locations.index(base)]
+        priced = self.costs.any(axis=1)
+        return {code: value for code, value, has_prices in zip(self.locations, index.tolist(), priced) if has_prices}
+
+
+@functools.lru_cache(maxsize=4)
+def load_basket(path=DATA_PATH):
+    """Basket of the jurisdictions' locations, aggregated once per process"""
+    from engine import JURISDICTIONS
+
+    currencies = {code: loc.currency for code, loc in JURISDICTIONS.locations.items()}
+    return PriceBasket.from_csv(path, currencies)
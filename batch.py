@@ -0,0 +1,252 @@
+"""Run the location comparison for a whole client book from the command line.
+
+Usage:
+    python batch.py profiles.csv results.parquet [--chunksize 100000] [--workers 4]
+
+Each input row is one client profile with `daily_rate` (EUR), `working_days`
+and optionally one `expenses_<scenario>` column per scenario in that
+scenario's currency (e.g. `expenses_nl_bv_retention`, missing columns count
+as 0). An optional `client_id` column is carried through. The output holds
+one row per profile and scenario with the full breakdown shown in the app.
+
+With `--valuation-date` (or a `valuation_date` column, which takes precedence
+per row) incomes are converted at the historical EUR rates as of that date
+from the FX store (see fx_history.py) instead of the current point estimates.
+`--all-jurisdictions` adds every other location in data/jurisdictions.json.
+`--fixed-point` computes in integer cents with every tax rounded to the cent
+(see fixedpoint.py), so column totals match a spreadsheet to the cent.
+
+Input and output may be CSV or Parquet (chosen by file extension; Parquet
+needs pyarrow). Profiles are streamed in chunks so memory stays bounded by
+the chunk size, not the input size.
+"""
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+
+from engine import (
+    ALL_SCENARIOS, BASE_SCENARIOS, MONEY_COLUMNS, RESULT_COLUMNS, build_scenario_table, evaluate_profiles
+)
+import fixedpoint
+
+SCENARIO_TABLE = build_scenario_table(BASE_SCENARIOS)
+ALL_SCENARIO_TABLE = build_scenario_table(ALL_SCENARIOS)
+
+
+def scenario_slug(name):
+    """'NL: BV Retention' -> 'nl_bv_retention'"""
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def expense_columns(scenarios):
+    return [f"expenses_{scenario_slug(s.name)}" for s in scenarios]
+
+
+EXPENSE_COLUMNS = expense_columns(BASE_SCENARIOS)
+
+
+def valuation_dates(profiles, valuation_date=None):
+    """Per-profile valuation day (NaT where none applies), or None if unused"""
+    if "valuation_date" not in profiles and valuation_date is None:
+        return None
+    dates = np.full(len(profiles), np.datetime64(valuation_date if valuation_date is not None else "NaT", "D"))
+    if "valuation_date" in profiles:
+        column = pd.to_datetime(profiles["valuation_date"]).to_numpy().astype("datetime64[D]")
+        dates = np.where(np.isnat(column), dates, column)
+    return dates
+
+
+def profile_fx_rates(dates, scenarios, table, fx_path=None):
+    """(profiles, scenarios) EUR rates as of each date; NaT keeps the table's rates"""
+    from fx_history import DATA_PATH, load_history
+
+    fx_rate = np.broadcast_to(table["fx_rate"], (len(dates), len(scenarios))).copy()
+    dated = ~np.isnat(dates)
+    if dated.any():
+        history = load_history(fx_path or DATA_PATH)
+        fx_rate[dated] = history.rates_as_of([s.currency for s in scenarios], dates[dated][:, None])
+    return fx_rate
+
+
+def process_chunk(profiles, scenarios=BASE_SCENARIOS, table=SCENARIO_TABLE, valuation_date=None, fx_path=None,
+                  fixed_point=False):
+    """Long-format breakdown (profiles x scenarios) for one chunk of profiles.
+
+    With `fixed_point` the money columns are computed in integer cents and
+    hold amounts rounded to the cent.
+    """
+    missing = {"daily_rate", "working_days"} - set(profiles.columns)
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(sorted(missing))}")
+
+    expenses = np.column_stack([
+        profiles[col].to_numpy(dtype=np.float64) if col in profiles else np.zeros(len(profiles))
+        for col in expense_columns(scenarios)
+    ])
+    dates = valuation_dates(profiles, valuation_date)
+    fx_rate = None if dates is None else profile_fx_rates(dates, scenarios, table, fx_path)
+    if fixed_point:
+        breakdown = fixedpoint.evaluate_profiles(
+            profiles["daily_rate"], profiles["working_days"], expenses, fixedpoint.fixed_table(table), fx_rate
+        )
+    else:
+        breakdown = evaluate_profiles(profiles["daily_rate"], profiles["working_days"], expenses, table, fx_rate)
+
+    # Profile-major order: each profile's scenarios are contiguous
+    repeat = len(scenarios)
+    out = pd.DataFrame({
+        "profile": np.repeat(profiles.index.to_numpy(), repeat),
+    })
+    if "client_id" in profiles:
+        out["client_id"] = np.repeat(profiles["client_id"].to_numpy(), repeat)
+    out["daily_rate"] = np.repeat(profiles["daily_rate"].to_numpy(), repeat)
+    out["working_days"] = np.repeat(profiles["working_days"].to_numpy(), repeat)
+    if dates is not None:
+        out["valuation_date"] = np.repeat(dates, repeat)
+    out["Scenario"] = np.tile([s.name for s in scenarios], len(profiles))
+    out["Country"] = np.tile([s.country for s in scenarios], len(profiles))
+    out["Currency"] = np.tile([s.currency for s in scenarios], len(profiles))
+    for key, label in RESULT_COLUMNS.items():
+        column = breakdown[key].ravel()
+        out[label] = fixedpoint.from_minor(column) if fixed_point and label in MONEY_COLUMNS else column
+    return out
+
+
+def file_format(path):
+    return "parquet" if path.endswith(".parquet") else "csv"
+
+
+def read_chunks(path, chunksize):
+    """Yield DataFrames of at most `chunksize` profiles, indexed by input row"""
+    if file_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize)
+
+
+def encode_chunk(profiles, fmt, valuation_date=None, fx_path=None, all_jurisdictions=False, fixed_point=False):
+    """Process a chunk and serialize it, so encoding also runs in the workers.
+
+    Returns an Arrow table for Parquet, or a (header, body) pair of CSV text.
+    """
+    scenarios, table = (ALL_SCENARIOS, ALL_SCENARIO_TABLE) if all_jurisdictions else (BASE_SCENARIOS, SCENARIO_TABLE)
+    frame = process_chunk(
+        profiles, scenarios, table, valuation_date=valuation_date, fx_path=fx_path, fixed_point=fixed_point
+    )
+    if fmt == "parquet":
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(frame, preserve_index=False)
+    return frame.iloc[:0].to_csv(index=False), frame.to_csv(index=False, header=False)
+
+
+class ChunkWriter:
+    """Append encoded result chunks to a CSV or Parquet file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.format = file_format(path)
+        self.rows = 0
+        self._file = None
+
+    def write(self, encoded):
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            if self._file is None:
+                self._file = pq.ParquetWriter(self.path, encoded.schema)
+            self._file.write_table(encoded)
+            self.rows += encoded.num_rows
+        else:
+            header, body = encoded
+            if self._file is None:
+                self._file = open(self.path, "w", newline="")
+                self._file.write(header)
+            self._file.write(body)
+            self.rows += body.count("\n")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def run(input_path, output_path, chunksize=100_000, workers=1, valuation_date=None, fx_path=None,
+        all_jurisdictions=False, fixed_point=False):
+    """Stream profiles through the engine; returns the number of rows written"""
+    writer = ChunkWriter(output_path)
+    options = {
+        "valuation_date": valuation_date, "fx_path": fx_path, "all_jurisdictions": all_jurisdictions,
+        "fixed_point": fixed_point,
+    }
+    try:
+        if workers <= 1:
+            for chunk in read_chunks(input_path, chunksize):
+                writer.write(encode_chunk(chunk, writer.format, **options))
+        else:
+            # Keep a bounded number of chunks in flight and write in input order
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                pending = []
+                for chunk in read_chunks(input_path, chunksize):
+                    pending.append(pool.submit(encode_chunk, chunk, writer.format, **options))
+                    if len(pending) >= 2 * workers:
+                        writer.write(pending.pop(0).result())
+                for future in pending:
+                    writer.write(future.result())
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Compare NL, Dubai and Zug scenarios for a file of client profiles."
+    )
+    parser.add_argument("input", help="CSV or Parquet file with one client profile per row")
+    parser.add_argument("output", help="CSV or Parquet file for the per-scenario breakdown")
+    parser.add_argument("--chunksize", type=int, default=100_000, help="Profiles per chunk (default: 100000)")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help=f"Worker processes; 0 uses all {os.cpu_count()} cores (default: 1)"
+    )
+    parser.add_argument(
+        "--valuation-date", metavar="YYYY-MM-DD",
+        help="Convert at the historical EUR rates as of this date (default: current rates)"
+    )
+    parser.add_argument("--fx-rates", metavar="CSV", help="ECB-style reference rate CSV (default: bundled rates)")
+    parser.add_argument(
+        "--all-jurisdictions", action="store_true",
+        help="Compare every scenario in data/jurisdictions.json, not only NL, Dubai and Zug"
+    )
+    parser.add_argument(
+        "--fixed-point", action="store_true",
+        help="Compute in integer cents, rounding every tax to the cent (default: floating point)"
+    )
+    args = parser.parse_args(argv)
+
+    workers = args.workers or os.cpu_count()
+    try:
+        valuation_date = np.datetime64(args.valuation_date, "D") if args.valuation_date else None
+        rows = run(
+            args.input, args.output, chunksize=args.chunksize, workers=workers,
+            valuation_date=valuation_date, fx_path=args.fx_rates, all_jurisdictions=args.all_jurisdictions,
+            fixed_point=args.fixed_point
+        )
+    except (OSError, ValueError, ImportError) as exc:
+        parser.exit(1, f"error: {exc}\n")
+    print(f"Wrote {rows:,} rows to {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
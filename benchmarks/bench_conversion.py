@@ -0,0 +1,83 @@
+"""Benchmark EUR conversion and table formatting: row-wise apply vs columnar.
+
+Usage:
+    python benchmarks/bench_conversion.py [--rows 10000 1000000] [--legacy-max-rows 100000]
+
+The row-wise path takes minutes at 1M rows, so above --legacy-max-rows it is
+timed on a sample of that size and scaled linearly (marked "extrapolated").
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import MONEY_COLUMNS, convert_frame_to_eur, convert_to_eur  # noqa: E402
+from formatting import format_currency, format_results_table  # noqa: E402
+
+
+def make_frame(rows, seed=0):
+    """Synthetic results frame with a random currency per row"""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"Currency": rng.choice(["EUR", "CHF", "AED"], size=rows)})
+    for col in MONEY_COLUMNS:
+        df[col] = rng.uniform(0, 500_000, size=rows)
+    df["Retention %"] = rng.uniform(0, 100, size=rows)
+    df["Cost of Living Index"] = rng.choice([85.0, 100.0, 145.0], size=rows)
+    return df
+
+
+def legacy(df):
+    """The original per-column, row-wise DataFrame.apply passes"""
+    df_eur = df.copy()
+    for col in MONEY_COLUMNS:
+        df_eur[col] = df_eur.apply(lambda x: convert_to_eur(x[col], x['Currency']), axis=1)
+    display_df = df.copy()
+    for col in MONEY_COLUMNS:
+        display_df[col] = display_df.apply(lambda x: format_currency(x[col], x['Currency']), axis=1)
+    display_df["Retention %"] = display_df["Retention %"].apply(lambda x: f"{x:.1f}%")
+    display_df["Cost of Living Index"] = display_df["Cost of Living Index"].apply(lambda x: f"{x:.0f}")
+    return df_eur, display_df
+
+
+def columnar(df):
+    return convert_frame_to_eur(df), format_results_table(df, MONEY_COLUMNS)
+
+
+def timed(func, df):
+    start = time.perf_counter()
+    result = func(df)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--legacy-max-rows", type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'row-wise (s)':>16} {'columnar (s)':>14} {'speedup':>9}")
+    for rows in args.rows:
+        df = make_frame(rows)
+        new_time, (new_eur, new_display) = timed(columnar, df)
+
+        sample_rows = min(rows, args.legacy_max_rows)
+        sample = df.iloc[:sample_rows]
+        old_time, (old_eur, old_display) = timed(legacy, sample)
+        # Both paths must agree on the rows they share
+        assert np.allclose(old_eur[MONEY_COLUMNS], new_eur[MONEY_COLUMNS].iloc[:sample_rows])
+        assert old_display.equals(new_display.iloc[:sample_rows])
+
+        note = ""
+        if sample_rows < rows:
+            old_time *= rows / sample_rows
+            note = " (extrapolated)"
+        print(f"{rows:>10,} {old_time:>16.3f} {new_time:>14.3f} {old_time / new_time:>8.0f}x{note}")
+
+
+if __name__ == "__main__":
+    main()
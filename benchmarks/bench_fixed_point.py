@@ -0,0 +1,155 @@
+"""Benchmark the fixed-point engine against the float engine and decimal.Decimal.
+
+Usage:
+    python benchmarks/bench_fixed_point.py [--rows 10000 1000000] [--decimal-max-rows 2000]
+
+The Decimal reference evaluates one profile and scenario at a time with the
+rounding rules of `fixedpoint`, and the fixed-point results must match it to
+the cent. Above --decimal-max-rows it is timed on a sample of that size and
+scaled linearly (marked "extrapolated"). "rounding delta" is the largest
+difference between a float engine column total and the total of the
+cent-rounded results. It comes from rounding every tax to the cent, which
+the float engine does not do; binary floating-point error is a negligible
+part of it.
+"""
+import argparse
+from decimal import ROUND_HALF_UP, Decimal
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fixedpoint  # noqa: E402
+from engine import ALL_SCENARIOS, MONEY_COLUMNS, RESULT_COLUMNS, build_scenario_table, evaluate_profiles  # noqa: E402
+from jurisdictions import COMPANY, SELF_EMPLOYED  # noqa: E402
+
+MONEY_KEYS = [key for key, label in RESULT_COLUMNS.items() if label in MONEY_COLUMNS]
+CENT = Decimal("0.01")
+
+
+def decimal(value):
+    """A float as the Decimal of its shortest representation"""
+    return Decimal(repr(float(value)))
+
+
+def make_profiles(rows, seed=0):
+    """Daily rates and expenses in cents, whole working days"""
+    rng = np.random.default_rng(seed)
+    daily_rate = rng.integers(20_000, 200_000, rows) / 100
+    working_days = rng.integers(100, 240, rows).astype(np.float64)
+    expenses = rng.integers(0, 2_000_000, (rows, len(ALL_SCENARIOS))) / 100
+    return daily_rate, working_days, expenses
+
+
+def decimal_tax(amount, brackets):
+    amount = max(amount, Decimal(0))
+    tax = Decimal(0)
+    for (lower, rate), (upper, _) in zip(brackets, brackets[1:] + [(None, None)]):
+        if amount <= lower:
+            break
+        top = amount if upper is None else min(amount, upper)
+        tax += (top - lower) * rate
+    return tax.quantize(CENT, ROUND_HALF_UP)
+
+
+def decimal_breakdown(daily_rate, working_days, expenses, scenario, fx_rate):
+    """One profile and scenario in Decimal, rounded like `fixedpoint`"""
+    def brackets(component):
+        return [(decimal(t), decimal(r)) for t, r in getattr(scenario, component)]
+
+    annual_income = (decimal(daily_rate) * decimal(working_days)).quantize(CENT, ROUND_HALF_UP)
+    fx_rate = decimal(fx_rate).quantize(Decimal("0.000001"), ROUND_HALF_UP)
+    gross_income = (annual_income * fx_rate).quantize(CENT, ROUND_HALF_UP)
+    company_expenses = decimal(expenses).quantize(CENT, ROUND_HALF_UP)
+
+    taxable_income = gross_income - company_expenses
+    if scenario.strategy == SELF_EMPLOYED:
+        taxable_income -= decimal(scenario.self_employment_deduction)
+    salary = decimal(scenario.min_salary) if scenario.strategy == COMPANY else taxable_income
+
+    personal_tax = decimal_tax(salary, brackets("income_tax"))
+    social_security = decimal_tax(salary, brackets("social_security"))
+    pension = Decimal(0)
+    if scenario.strategy != SELF_EMPLOYED:
+        pension = (salary * decimal(scenario.pension_rate)).quantize(CENT, ROUND_HALF_UP)
+    net_income = salary - personal_tax - social_security - pension
+
+    corporate_income = Decimal(0)
+    if scenario.strategy == COMPANY:
+        corporate_income = max(gross_income - salary - company_expenses, Decimal(0))
+    corporate_tax = decimal_tax(corporate_income, brackets("corporate_tax"))
+    net_income += corporate_income - corporate_tax
+    net_income_adjusted = (net_income * 100 / decimal(scenario.location.cost_of_living)).quantize(
+        CENT, ROUND_HALF_UP
+    )
+    return {
+        "gross_income": gross_income,
+        "company_expenses": company_expenses,
+        "net_income": net_income,
+        "net_income_adjusted": net_income_adjusted,
+        "personal_tax": personal_tax,
+        "corporate_tax": corporate_tax,
+        "dividend_tax": Decimal(0),
+        "social_security": social_security,
+        "pension": pension,
+    }
+
+
+def decimal_engine(daily_rate, working_days, expenses, table):
+    """(profiles, scenarios) money columns in cents from the Decimal reference"""
+    columns = {key: np.zeros(expenses.shape, dtype=np.int64) for key in MONEY_KEYS}
+    for i in range(len(daily_rate)):
+        for j, scenario in enumerate(ALL_SCENARIOS):
+            row = decimal_breakdown(daily_rate[i], working_days[i], expenses[i, j], scenario, table["fx_rate"][j])
+            for key in MONEY_KEYS:
+                columns[key][i, j] = int(row[key] * 100)
+    return columns
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 1_000_000])
+    parser.add_argument("--decimal-max-rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    table = build_scenario_table(ALL_SCENARIOS)
+    fixed = fixedpoint.fixed_table(table)
+    print(f"{'rows':>10} {'float (s)':>10} {'int64 (s)':>10} {'Decimal (s)':>13} {'vs Decimal':>11} {'rounding delta':>15}")
+    for rows in args.rows:
+        daily_rate, working_days, expenses = make_profiles(rows)
+        float_time, floats = timed(evaluate_profiles, daily_rate, working_days, expenses, table)
+        fixed_time, cents = timed(fixedpoint.evaluate_profiles, daily_rate, working_days, expenses, fixed)
+
+        sample = min(rows, args.decimal_max_rows)
+        decimal_time, reference = timed(
+            decimal_engine, daily_rate[:sample], working_days[:sample], expenses[:sample], table
+        )
+        for key in MONEY_KEYS:
+            assert np.array_equal(cents[key][:sample], reference[key]), key
+
+        # Largest gap between a float column total and the cent-rounded total
+        delta = max(
+            abs(float(floats[key].sum(axis=0)[j]) - int(cents[key][:, j].sum()) / 100)
+            for key in MONEY_KEYS for j in range(len(ALL_SCENARIOS))
+        )
+        note = ""
+        if sample < rows:
+            decimal_time *= rows / sample
+            note = " (extrapolated)"
+        print(
+            f"{rows:>10,} {float_time:>10.3f} {fixed_time:>10.3f} {decimal_time:>13.1f} "
+            f"{decimal_time / fixed_time:>10.0f}x {delta:>15.2f}{note}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+"""Benchmark suite: app rerun latency and engine throughput.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--output results.json] [--compare baseline.json]
+
+App timings drive nl-ch.py headlessly through Streamlit's AppTest: cold start
+(first run in this process, including first imports), first render of a new
+session and reruns after changing the daily rate, an expense input and a
+lifestyle slider, with the time the interaction's fragment took on its own.
+Cold starts are also run in fresh processes with fast startup on and off,
+reporting the app's own import and first-paint times. Microbenchmarks cover
+the retention engine, EUR conversion and formatting, and figure construction
+and serialization.
+
+Results are written as JSON (by default to benchmarks/results/<commit>.json)
+so runs on the same machine can be compared between commits.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+APP_PATH = os.path.join(ROOT, "nl-ch.py")
+
+# Runs the app once in a fresh interpreter and prints its section timings
+COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.session_state["fast_startup"] = sys.argv[2] == "fast"
+app.run()
+if app.exception:
+    raise SystemExit(app.exception[0].message)
+print(json.dumps(dict(app.session_state["section_timings"], wall_s=time.perf_counter() - start)))
+"""
+
+
+def measure(func, repeat=5, setup=None):
+    """Run `func` `repeat` times and summarize wall-clock seconds"""
+    times = []
+    for i in range(repeat):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "max_s": max(times),
+        "repeat": repeat,
+    }
+
+
+def app_benchmarks(repeat):
+    from streamlit.testing.v1 import AppTest
+
+    from engine import BASE_SCENARIOS
+
+    def new_app():
+        return AppTest.from_file(APP_PATH, default_timeout=120)
+
+    def checked_run(app):
+        app.run()
+        if app.exception:
+            raise RuntimeError(f"App raised: {app.exception[0].message}")
+
+    results = {}
+    # The very first run pays for importing pandas, plotly and the engine
+    app = new_app()
+    start = time.perf_counter()
+    checked_run(app)
+    results["app.cold_start"] = {"median_s": time.perf_counter() - start, "repeat": 1}
+
+    results["app.first_render"] = measure(lambda: checked_run(new_app()), repeat)
+
+    # Distinct values per repetition so reruns measure real work, not cache hits.
+    # AppTest always reruns the whole script, so the time the interaction's
+    # fragment took on its own (what a fragment rerun costs) is read back from
+    # the timings the app records
+    def rerun_after(setter, fragment):
+        fragment_times = []
+
+        def run():
+            checked_run(app)
+            fragment_times.append(app.session_state["fragment_timings"][fragment])
+
+        result = measure(run, repeat, setup=setter)
+        result["fragment_median_s"] = statistics.median(fragment_times)
+        return result
+
+    results["app.rerun_daily_rate"] = rerun_after(
+        lambda i: app.number_input(key="master_daily_rate").set_value(850 + 50 * i), "Income outputs"
+    )
+    # The expense grid commits through a form; AppTest cannot drive
+    # st.data_editor, so the benchmark sets the committed values directly
+    results["app.rerun_expense"] = rerun_after(
+        lambda i: app.session_state.__setitem__("scenario_values", {
+            s.name: {"company_expenses": 1000 * (i + 1) if j == 1 else 0}
+            for j, s in enumerate(BASE_SCENARIOS)
+        }),
+        "Income outputs"
+    )
+    results["app.rerun_lifestyle_slider"] = rerun_after(
+        lambda i: app.slider(key="weight_safety").set_value(6 + i % 5), "Lifestyle factors"
+    )
+    return results
+
+
+def cold_start_benchmarks(repeat):
+    """First run of a new process with fast startup ("fast") and all tabs ("all")"""
+    results = {}
+    for mode in ("fast", "all"):
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run(
+                [sys.executable, "-c", COLD_START_SCRIPT, APP_PATH, mode],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            ).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        results[f"app.cold_start_process.{mode}"] = {
+            "median_s": statistics.median(r["wall_s"] for r in runs),
+            "script_s": statistics.median(r["total_s"] for r in runs),
+            "imports_s": statistics.median(r["sections"]["Imports"] for r in runs),
+            "first_paint_s": statistics.median(r["milestones"]["First paint"] for r in runs),
+            "repeat": repeat,
+        }
+    return results
+
+
+def engine_benchmarks(repeat):
+    import numpy as np
+
+    from basket import CATEGORIES, PriceBasket, household_weights
+    from breakeven import required_income
+    from engine import ALL_SCENARIOS, BASE_SCENARIOS, build_scenario_table, evaluate, evaluate_profiles
+    import fixedpoint
+    from lifestyle import FactorScores
+    from montecarlo import simulate
+    from result_store import ResultStore
+    from safetynet import load_safety_nets, simulate_careers, value_safety_nets
+    from split import optimize_splits
+    from sweep import grid_axes, sweep_grid
+
+    table = build_scenario_table(BASE_SCENARIOS)
+    all_table = build_scenario_table(ALL_SCENARIOS)
+    fixed_table = fixedpoint.fixed_table(table)
+    rng = np.random.default_rng(0)
+    rows = 100_000
+    daily_rate = rng.uniform(200, 2000, rows)
+    working_days = rng.uniform(100, 240, rows)
+    expenses = np.zeros((rows, len(BASE_SCENARIOS)))
+    all_expenses = np.zeros((rows, len(ALL_SCENARIOS)))
+    gross = np.full(len(BASE_SCENARIOS), 176_000.0) * table["fx_rate"]
+    rates, days = grid_axes(1, 1)
+    basket_rows = 1_000_000
+    basket_cities = {"NL": "EUR", **{f"City {j}": "EUR" for j in range(1, 200)}}
+    basket_items = rng.integers(0, 40, basket_rows)
+    basket_columns = (
+        rng.integers(0, 200, basket_rows), basket_items % len(CATEGORIES), basket_items,
+        rng.uniform(1, 100, basket_rows), np.ones(basket_rows), basket_cities,
+    )
+    basket = PriceBasket.from_columns(*basket_columns)
+    cities = FactorScores(
+        [f"Factor {i}" for i in range(11)], [f"City {j}" for j in range(200)], rng.uniform(0, 10, (11, 200))
+    )
+
+    results = {
+        "engine.build_scenario_table": measure(lambda: build_scenario_table(BASE_SCENARIOS), repeat),
+        "engine.evaluate_6_scenarios": measure(
+            lambda: evaluate(gross, 0.0, np.arange(len(BASE_SCENARIOS)), table), repeat
+        ),
+        "engine.evaluate_profiles_100k": measure(
+            lambda: evaluate_profiles(daily_rate, working_days, expenses, table), repeat
+        ),
+        "engine.evaluate_profiles_100k_all_jurisdictions": measure(
+            lambda: evaluate_profiles(daily_rate, working_days, all_expenses, all_table), repeat
+        ),
+        "fixedpoint.evaluate_profiles_100k": measure(
+            lambda: fixedpoint.evaluate_profiles(daily_rate, working_days, expenses, fixed_table), repeat
+        ),
+        "breakeven.required_income_100k_targets": measure(
+            lambda: required_income(np.linspace(10_000, 1_000_000, 100_000), np.zeros(len(ALL_SCENARIOS)), all_table),
+            repeat
+        ),
+        "split.optimize_splits_all_jurisdictions": measure(
+            lambda: optimize_splits(176_000 * all_table["fx_rate"], np.zeros(len(ALL_SCENARIOS)), all_table),
+            repeat
+        ),
+        "basket.aggregate_1M_observations_200_cities": measure(
+            lambda: PriceBasket.from_columns(*basket_columns), max(1, repeat // 5)
+        ),
+        "basket.reweight_200_cities": measure(lambda: basket.index(household_weights(3, 2, 2)), repeat),
+        "safetynet.simulate_and_value_100k_lives": measure(
+            lambda: value_safety_nets(
+                gross, np.zeros(len(BASE_SCENARIOS)), table,
+                simulate_careers(100_000, load_safety_nets().assumptions), load_safety_nets().assumptions
+            ),
+            repeat
+        ),
+        # Negatively correlated FX shocks, which must not break the Cholesky factor
+        "montecarlo.simulate_100k_draws_negative_fx_correlation": measure(
+            lambda: simulate(
+                800.0, 220, np.zeros(len(BASE_SCENARIOS)), BASE_SCENARIOS, draws=100_000,
+                uncertainty={"fx_correlation": -0.55}
+            ),
+            repeat
+        ),
+        "lifestyle.top_k_200_cities": measure(lambda: cities.top_k(np.full(11, 5.0), 10), repeat),
+        "lifestyle.win_probabilities_1M_200_cities": measure(
+            lambda: cities.win_probabilities(np.full(11, 5.0)), max(1, repeat // 5)
+        ),
+        "sweep.fine_grid": measure(
+            lambda: sweep_grid(rates, days, np.zeros(len(BASE_SCENARIOS)), table), repeat
+        ),
+    }
+    # One scenario's expenses change per rerun; the cost should not grow with
+    # the number of scenarios
+    for count, scenarios in [(6, BASE_SCENARIOS), (210, ALL_SCENARIOS * 15)]:
+        store = ResultStore(scenarios, build_scenario_table(scenarios))
+        store_gross = 176_000.0 * store.table["fx_rate"]
+        store.update(store_gross, np.zeros(count))
+        store_expenses = []
+        results[f"result_store.one_expense_{count}_scenarios"] = measure(
+            lambda: store.update(store_gross, store_expenses[-1]),
+            repeat,
+            setup=lambda i: store_expenses.append(np.where(np.arange(count) == 1, 1000.0 * (i + 1), 0.0))
+        )
+    for name, scenarios in [
+        ("engine.evaluate_profiles_100k", BASE_SCENARIOS),
+        ("engine.evaluate_profiles_100k_all_jurisdictions", ALL_SCENARIOS),
+        ("fixedpoint.evaluate_profiles_100k", BASE_SCENARIOS),
+    ]:
+        results[name]["rows_per_s"] = rows * len(scenarios) / results[name]["median_s"]
+    return results
+
+
+def conversion_benchmarks(repeat):
+    import numpy as np
+
+    from bench_conversion import columnar, legacy, make_frame
+    from currencies import CURRENCIES
+    from engine import convert_to_eur
+    from formatting import format_currency
+    from fx_history import FXHistory, load_history
+
+    frame = make_frame(10_000)
+    history = load_history()
+    rng = np.random.default_rng(0)
+    dates = np.datetime64("2010-12-31") + rng.integers(0, 14 * 365, 1_000_000)
+    currencies = rng.choice(history.currencies, 1_000_000)
+    amounts = rng.uniform(0, 500_000, 1_000_000)
+    return {
+        "fx_history.load_csv": measure(lambda: FXHistory.from_csv(), repeat),
+        "fx_history.convert_1M": measure(lambda: history.convert_to_eur(amounts, currencies, dates), repeat),
+        "currencies.convert_1M": measure(
+            lambda: CURRENCIES.convert(amounts, currencies, currencies[::-1]), repeat
+        ),
+        "convert_to_eur.scalar_10k": measure(
+            lambda: [convert_to_eur(x, c) for x, c in zip(frame["Net Income"], frame["Currency"])], repeat
+        ),
+        "format_currency.scalar_10k": measure(
+            lambda: [format_currency(x, c) for x, c in zip(frame["Net Income"], frame["Currency"])], repeat
+        ),
+        "results_table.rowwise_10k": measure(lambda: legacy(frame), max(1, repeat // 5)),
+        "results_table.columnar_10k": measure(lambda: columnar(frame), repeat),
+    }
+
+
+def figure_benchmarks(repeat):
+    import numpy as np
+    import plotly.io as pio
+
+    from engine import BASE_SCENARIOS, build_scenario_table, convert_frame_to_eur, evaluate, results_frame
+    from figures import (
+        crossover_figure,
+        factor_radar_figure,
+        figure_payload,
+        income_breakdown_figure,
+        net_income_figure,
+        sweep_heatmap_figure,
+    )
+    from sweep import crossover, grid_axes, sweep_grid
+
+    table = build_scenario_table(BASE_SCENARIOS)
+    breakdown = evaluate(176_000.0 * table["fx_rate"], 0.0, np.arange(len(BASE_SCENARIOS)), table)
+    df_eur = convert_frame_to_eur(results_frame(BASE_SCENARIOS, breakdown))
+    factors = [f"Factor {i}" for i in range(11)]
+    locations = ["Netherlands", "Dubai", "Zug"]
+    factor_scores = np.tile([7.0, 8.0, 9.0], (len(factors), 1))
+    # The 1 EUR / 1 day sweep, the largest figures on the page
+    rates, days = grid_axes(1, 1)
+    surface = sweep_grid(rates, days, np.zeros(len(BASE_SCENARIOS)), table)["net_income_adjusted_eur"]
+    margin = crossover(surface, 5, 1)
+
+    results = {}
+    for name, build in [
+        ("income_breakdown", lambda lean: income_breakdown_figure(df_eur, lean)),
+        ("net_income", lambda lean: net_income_figure(df_eur, lean)),
+        ("factor_radar", lambda lean: factor_radar_figure(factors, locations, factor_scores, lean)),
+        ("sweep_heatmap_fine", lambda lean: sweep_heatmap_figure(rates, days, surface[0], "Net", (800, 220), lean)),
+        ("crossover_fine", lambda lean: crossover_figure(rates, days, margin, lean)),
+    ]:
+        # Full payloads keep the original names; lean ones get a suffix
+        for lean, suffix in [(False, ""), (True, ".lean")]:
+            results[f"figure.{name}{suffix}.build"] = measure(lambda: build(lean), repeat)
+            fig = build(lean)
+            results[f"figure.{name}{suffix}.to_json"] = measure(lambda: pio.to_json(fig, validate=False), repeat)
+            results[f"figure.{name}{suffix}.to_json"]["payload_bytes"] = figure_payload(fig)["bytes"]
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current, baseline_path):
+    """Print each benchmark's median against a previous results file"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline.get('commit', baseline_path)}:")
+    for name, result in current["results"].items():
+        before = baseline["results"].get(name)
+        if before:
+            ratio = result["median_s"] / before["median_s"]
+            print(f"  {name:<40} {before['median_s'] * 1000:>10.2f} ms -> {result['median_s'] * 1000:>10.2f} ms  ({ratio:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="JSON results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Previous JSON results file to compare against")
+    parser.add_argument("--repeat", type=int, default=5, help="Repetitions per benchmark (default: 5)")
+    parser.add_argument("--skip-app", action="store_true", help="Only run the microbenchmarks")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = {}
+    # App first, so its cold start is not warmed up by the microbenchmarks
+    if not args.skip_app:
+        results.update(app_benchmarks(args.repeat))
+        results.update(cold_start_benchmarks(args.repeat))
+    results.update(engine_benchmarks(args.repeat))
+    results.update(conversion_benchmarks(args.repeat))
+    results.update(figure_benchmarks(args.repeat))
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output = args.output or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        extra = "".join(
+            f"  {key[:-2]} {result[key] * 1000:.0f} ms"
+            for key in ("script_s", "imports_s", "first_paint_s", "fragment_median_s") if key in result
+        )
+        if "payload_bytes" in result:
+            extra += f"  payload {result['payload_bytes'] / 1024:,.0f} KB"
+        print(f"{name:<40} {result['median_s'] * 1000:>10.2f} ms{extra}")
+    print(f"\nWrote {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Vectorized piecewise-linear evaluation of progressive tax tables.
+
+A table is a list of (lower threshold, marginal rate) pairs in local currency,
+starting at 0. A flat rate is simply a one-bracket table.
+"""
+import numpy as np
+
+# Amounts are clipped below this bound so every table fits in its own slot of
+# one shared, sorted threshold array (see BracketSet)
+MAX_AMOUNT = 2.0 ** 40
+
+
+def flat(rate):
+    """One-bracket table taxing everything at `rate`"""
+    return [(0, rate)]
+
+
+def validate(brackets):
+    """Return thresholds and rates as arrays, checking the table is well formed"""
+    thresholds = np.array([float(t) for t, _ in brackets])
+    rates = np.array([float(r) for _, r in brackets])
+    if thresholds.size == 0 or thresholds[0] != 0:
+        raise ValueError("Tax brackets must start at a threshold of 0")
+    if np.any(np.diff(thresholds) <= 0):
+        raise ValueError("Tax bracket thresholds must be strictly increasing")
+    return thresholds, rates
+
+
+class BracketSet:
+    """Several bracket tables packed for evaluation in a single binary search.
+
+    Table `i` occupies the slot [i * MAX_AMOUNT, (i + 1) * MAX_AMOUNT) of one
+    sorted threshold array, so rows using different tables are located with
+    one `np.searchsorted` call. The tax due at every threshold is precomputed
+    as a prefix sum and folded into a per-bracket intercept, so a value's tax
+    is `intercept + amount * marginal rate`.
+    """
+
+    def __init__(self, tables):
+        self.tables = [validate(brackets) for brackets in tables]
+
+        # A sentinel entry in front of the intercepts and rates lets
+        # searchsorted's insertion point index them directly
+        slot_start, intercepts, rates = [], [0.0], [0.0]
+        for i, (thresholds, table_rates) in enumerate(self.tables):
+            base = np.concatenate([[0.0], np.cumsum(np.diff(thresholds) * table_rates[:-1])])
+            slot_start.extend(thresholds + i * MAX_AMOUNT)
+            intercepts.extend(base - thresholds * table_rates)
+            rates.extend(table_rates)
+        self.slot_start = np.array(slot_start)
+        self.intercepts = np.array(intercepts)
+        self.rates = np.array(rates)
+        self.offsets = np.arange(len(self.tables)) * MAX_AMOUNT
+        # All-flat sets skip the search entirely
+        self.flat_rates = self.rates[1:] if all(t.size == 1 for t, _ in self.tables) else None
+
+    def __len__(self):
+        return len(self.tables)
+
+    def _locate(self, amount, table_idx):
+        return np.searchsorted(self.slot_start, amount + self.offsets[table_idx], side="right")
+
+    def tax(self, amount, table_idx):
+        """Tax on `amount` under table `table_idx`, broadcast elementwise.
+
+        Amounts below zero owe no tax.
+        """
+        amount = np.clip(amount, 0.0, MAX_AMOUNT - 1)
+        table_idx = np.asarray(table_idx, dtype=np.intp)
+        if self.flat_rates is not None:
+            return amount * self.flat_rates[table_idx]
+        pos = self._locate(amount, table_idx)
+        return self.intercepts[pos] + amount * self.rates[pos]
+
+    def marginal_rate(self, amount, table_idx):
+        """Marginal rate that applies to the next unit above `amount`"""
+        amount = np.clip(amount, 0.0, MAX_AMOUNT - 1)
+        return self.rates[self._locate(amount, np.asarray(table_idx, dtype=np.intp))]
+
+    def thresholds(self, table_idx):
+        """Bracket thresholds (kinks) of one table"""
+        return self.tables[table_idx][0]
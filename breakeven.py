@@ -0,0 +1,56 @@
+"""Break-even solver: the income each scenario needs for a target net income.
+
+Net income is piecewise linear and non-decreasing in gross income, with
+kinks where a bracket starts (see `engine.gross_breakpoints`). The engine
+only runs at those kinks and every target is solved exactly on the segment
+it falls in, so there is no iteration and any number of targets costs one
+binary search per scenario.
+"""
+import numpy as np
+
+from engine import COMPANY, evaluate, gross_breakpoints
+
+
+def required_income(targets, company_expenses, table, adjusted=True):
+    """Annual EUR income at which each scenario's EUR net income reaches each target.
+
+    `targets` are EUR net incomes, CoL adjusted unless `adjusted` is False;
+    `company_expenses` holds one value per scenario in its local currency.
+    Returns an array shaped (scenarios, targets), inf where a target is
+    never reached. Company scenarios start where gross income covers the
+    minimum salary and expenses, since below that the salary is not earned.
+    """
+    targets = np.atleast_1d(np.asarray(targets, dtype=np.float64))
+    scenario_count = len(table["kind"])
+    incomes = np.empty((scenario_count, targets.size))
+
+    for scenario in range(scenario_count):
+        fx_rate = table["fx_rate"][scenario]
+        expenses = float(company_expenses[scenario])
+        start = table["min_salary"][scenario] + expenses if table["kind"][scenario] == COMPANY else 0.0
+        kinks = gross_breakpoints(table, scenario, expenses)
+        kinks = kinks[kinks > start]
+        # One point past the last kink gives the slope of the final segment
+        last = kinks[-1] if kinks.size else start
+        gross = np.unique(np.concatenate([[start], kinks, [2 * last + 1.0]]))
+
+        net = evaluate(gross, expenses, scenario, table)["net_income"] / fx_rate
+        if adjusted:
+            net = net * (100 / table["col_index"][scenario])
+        net = np.maximum.accumulate(net)
+        income = gross / fx_rate
+
+        # First point reaching each target, then solve on the segment before it
+        idx = np.searchsorted(net, targets, side="left")
+        lo = np.clip(idx - 1, 0, len(net) - 2)
+        slope = (net[lo + 1] - net[lo]) / (income[lo + 1] - income[lo])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            solved = income[lo] + (targets - net[lo]) / slope
+        solved = np.where(idx == len(net), np.where(slope > 0, solved, np.inf), solved)
+        incomes[scenario] = np.where(idx == 0, income[0], solved)
+    return incomes
+
+
+def required_daily_rate(targets, working_days, company_expenses, table, adjusted=True):
+    """EUR daily rate each scenario needs for each target at `working_days` a year"""
+    return required_income(targets, company_expenses, table, adjusted) / working_days
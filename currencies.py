@@ -0,0 +1,110 @@
+"""Currency registry: codes, display formats and conversion rates.
+
+Every currency is one entry in `CURRENCIES`. Rates are held as units per EUR
+and any-to-any conversion triangulates through EUR in a dense rate matrix,
+so adding a currency is a new entry here, not a new branch elsewhere.
+"""
+import numpy as np
+
+
+class CodeIndex:
+    """Positions of currency codes in a fixed list, looked up a column at a time.
+
+    A column of codes is reduced to its distinct values first, so a million
+    rows cost one dict lookup per distinct code.
+    """
+
+    def __init__(self, codes):
+        self._positions = {code: i for i, code in enumerate(codes)}
+
+    def __call__(self, codes):
+        if isinstance(codes, str):
+            if codes not in self._positions:
+                raise ValueError(f"Unknown currency: {codes}")
+            return self._positions[codes]
+        codes = np.asarray(codes, dtype=str)
+        distinct, inverse = np.unique(codes, return_inverse=True)
+        unknown = [code for code in distinct if code not in self._positions]
+        if unknown:
+            raise ValueError(f"Unknown currency: {', '.join(unknown)}")
+        positions = np.array([self._positions[code] for code in distinct], dtype=np.intp)
+        return positions[inverse].reshape(codes.shape)
+
+
+class Currency:
+    """One currency: its display prefix, thousands separator and EUR rate"""
+
+    __slots__ = ("code", "prefix", "separator", "eur_rate")
+
+    def __init__(self, code, prefix, eur_rate, separator=","):
+        self.code = code
+        self.prefix = prefix
+        self.separator = separator
+        self.eur_rate = eur_rate
+
+    @property
+    def symbol(self):
+        """Prefix without padding, for labels such as 'Expenses (CHF)'"""
+        return self.prefix.strip()
+
+
+class CurrencyRegistry:
+    """Indexed set of currencies with a dense conversion matrix.
+
+    `matrix()[i, j]` is the number of units of currency j per unit of
+    currency i, triangulated through the EUR rates.
+    """
+
+    def __init__(self, currencies):
+        self._currencies = {c.code: c for c in currencies}
+        self.codes = list(self._currencies)
+        self.index = CodeIndex(self.codes)
+        self.eur_rates = np.array([c.eur_rate for c in self._currencies.values()])
+        self.prefixes = np.array([c.prefix for c in self._currencies.values()])
+        self.separators = np.array([c.separator for c in self._currencies.values()])
+        self._matrix = self.eur_rates[None, :] / self.eur_rates[:, None]
+
+    def __getitem__(self, code):
+        return self._currencies[code]
+
+    def __contains__(self, code):
+        return code in self._currencies
+
+    def __iter__(self):
+        return iter(self._currencies.values())
+
+    def rates(self, fx_rates=None):
+        """Units per EUR of every registered currency.
+
+        `fx_rates` maps codes to units per EUR (e.g. historical rates from
+        `fx_history`) and overrides the point estimates it covers.
+        """
+        if fx_rates is None:
+            return self.eur_rates
+        return np.array([fx_rates.get(code, rate) for code, rate in zip(self.codes, self.eur_rates)])
+
+    def matrix(self, fx_rates=None):
+        """Dense (from, to) conversion matrix"""
+        if fx_rates is None:
+            return self._matrix
+        rates = self.rates(fx_rates)
+        return rates[None, :] / rates[:, None]
+
+    def eur_rate(self, code, fx_rates=None):
+        """Units of `code` per 1 EUR"""
+        return float(self.rates(fx_rates)[self.index(code)])
+
+    def convert(self, amounts, from_codes, to_codes="EUR", fx_rates=None):
+        """Convert amounts between any currencies, broadcast elementwise"""
+        factor = self.matrix(fx_rates)[self.index(from_codes), self.index(to_codes)]
+        return np.asarray(amounts, dtype=np.float64) * factor
+
+
+CURRENCIES = CurrencyRegistry([
+    Currency("EUR", "€", 1.0),
+    Currency("CHF", "CHF ", 0.95),  # 1 EUR = 0.95 CHF
+    Currency("AED", "AED ", 3.98),  # 1 EUR = 3.98 AED
+    Currency("GBP", "£", 0.85),  # 1 EUR = 0.85 GBP
+    Currency("USD", "$", 1.08),  # 1 EUR = 1.08 USD
+    Currency("SGD", "S$", 1.45),  # 1 EUR = 1.45 SGD
+])
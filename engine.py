@@ -0,0 +1,260 @@
+"""Headless net-retention engine.
+
+Holds the scenarios (loaded from the data file by `jurisdictions`) and the
+vectorized tax/retention calculation so they can be used outside of a
+Streamlit rerun (batch jobs, sweeps, benchmarks).
+This module must not import Streamlit.
+"""
+import numpy as np
+
+from brackets import BracketSet
+from currencies import CURRENCIES
+from jurisdictions import COMPANY, SELF_EMPLOYED, load_jurisdictions
+
+JURISDICTIONS = load_jurisdictions()
+# Every scenario in the data file; the app and batch runs compare the ones in
+# the default locations
+ALL_SCENARIOS = JURISDICTIONS.scenarios
+BASE_SCENARIOS = JURISDICTIONS.defaults()
+
+# Cost of living index (Netherlands as base 100)
+COST_OF_LIVING = {code: loc.cost_of_living for code, loc in JURISDICTIONS.locations.items()}
+
+# Result columns in display order, keyed by the engine's column names
+RESULT_COLUMNS = {
+    "gross_income": "Gross Income",
+    "company_expenses": "Company Expenses",
+    "net_income": "Net Income",
+    "net_income_adjusted": "Net Income (CoL Adjusted)",
+    "personal_tax": "Personal Tax",
+    "corporate_tax": "Corporate Tax",
+    "dividend_tax": "Dividend Tax",
+    "social_security": "Social Security",
+    "pension": "Pension",
+    "retention_pct": "Retention %",
+    "col_index": "Cost of Living Index",
+}
+
+# Result columns holding amounts in the scenario's currency
+MONEY_COLUMNS = [
+    RESULT_COLUMNS[key] for key in (
+        "gross_income", "company_expenses", "net_income", "net_income_adjusted",
+        "personal_tax", "corporate_tax", "dividend_tax", "social_security", "pension",
+    )
+]
+
+
+def adjust_for_cost_of_living(amount, country):
+    """Adjust amount based on cost of living index (higher index = more expensive)"""
+    nl_equivalent = (amount * 100) / COST_OF_LIVING[country]
+    return nl_equivalent
+
+
+def eur_rate(currency, fx_rates=None):
+    """Units of `currency` per 1 EUR.
+
+    `fx_rates` maps currencies to units per EUR (e.g. historical rates from
+    `fx_history`); without it the registry's point estimates apply.
+    """
+    return CURRENCIES.eur_rate(currency, fx_rates)
+
+
+def convert_to_eur(amount, from_currency):
+    return CURRENCIES.convert(amount, from_currency, "EUR")
+
+
+def convert_frame(df, to_currency, columns=MONEY_COLUMNS, currency_col="Currency", fx_rates=None):
+    """Copy of `df` with the monetary columns converted to `to_currency`.
+
+    Each row's factor is gathered from the registry's conversion matrix in
+    one lookup and the whole block of columns is scaled in one operation.
+    """
+    factor = CURRENCIES.matrix(fx_rates)[
+        CURRENCIES.index(df[currency_col].to_numpy(dtype=str)), CURRENCIES.index(to_currency)
+    ]
+    converted = df.copy()
+    converted[columns] = df[columns].to_numpy(dtype=np.float64) * factor[:, None]
+    return converted
+
+
+def convert_frame_to_eur(df, columns=MONEY_COLUMNS, currency_col="Currency", fx_rates=None):
+    """Copy of `df` with the monetary columns converted to EUR"""
+    return convert_frame(df, "EUR", columns, currency_col, fx_rates)
+
+
+def build_scenario_table(scenarios, fx_rates=None):
+    """Pack scenario records into parameter arrays, one entry per scenario.
+
+    Strategies were resolved when the records were loaded, so evaluation
+    never looks at names. Taxes are bracket sets indexed by scenario position.
+    `fx_rates` optionally replaces the point-estimate EUR rates (see
+    `eur_rate`).
+    """
+    def column(attr):
+        return np.array([float(getattr(s, attr)) for s in scenarios])
+
+    currency_idx = CURRENCIES.index([s.currency for s in scenarios])
+
+    return {
+        "kind": np.array([s.strategy for s in scenarios], dtype=np.int8),
+        "income_tax": BracketSet([s.income_tax for s in scenarios]),
+        "social_security": BracketSet([s.social_security for s in scenarios]),
+        "corporate_tax": BracketSet([s.corporate_tax for s in scenarios]),
+        "dividend_tax": BracketSet([s.dividend_tax for s in scenarios]),
+        "pension_rate": column("pension_rate"),
+        "min_salary": column("min_salary"),
+        "self_employment_deduction": column("self_employment_deduction"),
+        "col_index": np.array([s.location.cost_of_living for s in scenarios], dtype=np.float64),
+        "country": np.array([s.country for s in scenarios]),
+        "currency_idx": currency_idx,
+        "fx_rate": CURRENCIES.rates(fx_rates)[currency_idx],
+    }
+
+
+def with_fx_rates(table, fx_rates):
+    """`table` with its EUR rates replaced by `fx_rates`; the table itself if None.
+
+    Lets a table compiled once be reused at any valuation date.
+    """
+    if fx_rates is None:
+        return table
+    return {**table, "fx_rate": CURRENCIES.rates(fx_rates)[table["currency_idx"]]}
+
+
+def with_cost_of_living(table, cost_of_living):
+    """`table` with its cost of living indices replaced; the table itself if None.
+
+    `cost_of_living` maps location codes to indices (NL = 100), e.g. from a
+    price basket (see `basket`); locations it leaves out keep their own.
+    """
+    if cost_of_living is None:
+        return table
+    col_index = [cost_of_living.get(code, col) for code, col in zip(table["country"], table["col_index"])]
+    return {**table, "col_index": np.array(col_index, dtype=np.float64)}
+
+
+def scenario_salary(gross_income, company_expenses, scenario_idx, table):
+    """Income taxed as salary (local currency), broadcast elementwise.
+
+    Salary and self-employed scenarios are taxed on income after expenses;
+    BV/AG scenarios pay the minimum salary and keep the rest in the company.
+    """
+    kind = table["kind"][scenario_idx]
+    taxable_income = gross_income - company_expenses
+    taxable_income = np.where(
+        kind == SELF_EMPLOYED,
+        taxable_income - table["self_employment_deduction"][scenario_idx],
+        taxable_income,
+    )
+    return np.where(kind == COMPANY, table["min_salary"][scenario_idx], taxable_income)
+
+
+def evaluate(gross_income, company_expenses, scenario_idx, table):
+    """Compute the tax breakdown for every row in one vectorized pass.
+
+    `gross_income` and `company_expenses` are in the scenario's local currency;
+    `scenario_idx` selects the row's parameters from `table`. All three are
+    broadcast against each other. Returns a dict of read-only NumPy columns
+    keyed like `RESULT_COLUMNS`.
+    """
+    gross_income = np.asarray(gross_income, dtype=np.float64)
+    company_expenses = np.asarray(company_expenses, dtype=np.float64)
+    scenario_idx = np.asarray(scenario_idx, dtype=np.intp)
+    shape = np.broadcast_shapes(gross_income.shape, company_expenses.shape, scenario_idx.shape)
+
+    # Parameters are gathered at the index's own shape and broadcast lazily,
+    # so a few scenarios against a large grid stay cheap
+    kind = table["kind"][scenario_idx]
+    pension_rate = table["pension_rate"][scenario_idx]
+    is_company = kind == COMPANY
+    is_self_employed = kind == SELF_EMPLOYED
+    salary = scenario_salary(gross_income, company_expenses, scenario_idx, table)
+
+    personal_tax = table["income_tax"].tax(salary, scenario_idx)
+    social_security = table["social_security"].tax(salary, scenario_idx)
+    # Self-employed scenarios do not pay into a pension
+    pension = np.where(is_self_employed, 0.0, salary * pension_rate)
+    net_income = salary - personal_tax - social_security - pension
+
+    # Calculate corporate portion (everything above minimum salary)
+    corporate_income = np.where(is_company, gross_income - salary - company_expenses, 0.0)
+    corporate_income = np.maximum(corporate_income, 0.0)
+    corporate_tax = table["corporate_tax"].tax(corporate_income, scenario_idx)
+    # No immediate dividend distribution, keep as retained earnings
+    net_income = net_income + corporate_income - corporate_tax
+    net_income = np.broadcast_to(net_income, shape)
+    dividend_tax = np.zeros(shape)
+
+    col_index = table["col_index"][scenario_idx]
+    net_income_adjusted = net_income * (100 / col_index)
+    retention_pct = np.divide(
+        net_income * 100, gross_income,
+        out=np.zeros(shape), where=gross_income != 0,
+    )
+
+    columns = {
+        "gross_income": gross_income,
+        "company_expenses": company_expenses,
+        "net_income": net_income,
+        "net_income_adjusted": net_income_adjusted,
+        "personal_tax": personal_tax,
+        "corporate_tax": corporate_tax,
+        "dividend_tax": dividend_tax,
+        "social_security": social_security,
+        "pension": pension,
+        "retention_pct": retention_pct,
+        "col_index": col_index,
+    }
+    return {key: np.broadcast_to(value, shape) for key, value in columns.items()}
+
+
+def gross_breakpoints(table, scenario, company_expenses):
+    """Gross incomes (local currency) where a scenario's net income has a kink.
+
+    Between consecutive breakpoints every result column is linear in gross
+    income, so evaluating at the breakpoints and interpolating is exact.
+    """
+    kind = table["kind"][scenario]
+    if kind == COMPANY:
+        # Corporate brackets start once income exceeds salary plus expenses
+        start = table["min_salary"][scenario] + company_expenses
+        return np.sort(table["corporate_tax"].thresholds(scenario) + start)
+    start = company_expenses
+    if kind == SELF_EMPLOYED:
+        start = start + table["self_employment_deduction"][scenario]
+    kinks = np.concatenate([
+        table["income_tax"].thresholds(scenario),
+        table["social_security"].thresholds(scenario),
+    ])
+    return np.unique(kinks) + start
+
+
+def evaluate_profiles(daily_rate, working_days, company_expenses, table, fx_rate=None):
+    """Evaluate every scenario for a batch of client profiles.
+
+    `daily_rate` and `working_days` have shape (n,) and are in EUR;
+    `company_expenses` has shape (n, scenarios) in each scenario's currency.
+    `fx_rate` optionally gives each profile its own EUR rates, shape
+    (n, scenarios), instead of the table's. Returns columns of shape
+    (n, scenarios).
+    """
+    annual_income = np.asarray(daily_rate, dtype=np.float64) * np.asarray(working_days, dtype=np.float64)
+    if fx_rate is None:
+        fx_rate = table["fx_rate"][None, :]
+    gross_income = annual_income[:, None] * fx_rate
+    scenario_idx = np.arange(len(table["kind"]))[None, :]
+    return evaluate(gross_income, company_expenses, scenario_idx, table)
+
+
+def results_frame(scenarios, breakdown):
+    """Build the per-scenario results DataFrame shown in the app"""
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        "Scenario": [s.name for s in scenarios],
+        "Country": [s.country for s in scenarios],
+        "Currency": [s.currency for s in scenarios],
+    })
+    for key, label in RESULT_COLUMNS.items():
+        frame[label] = breakdown[key]
+    return frame
@@ -0,0 +1,291 @@
+"""Plotly figure builders for the comparison page.
+
+Builders only take data and return figures, so their output can be cached
+and reused across reruns and sessions.
+
+With `lean=True` a builder emits a smaller spec that is cheaper to render.
+Labels come from `texttemplate` instead of pre-formatted text arrays, line
+and polar traces use WebGL, and heatmaps send float32 values on an evenly
+spaced axis (`x0`/`dx`) instead of full coordinate arrays.
+"""
+import itertools
+import time
+
+import numpy as np
+import plotly.colors
+import plotly.graph_objects as go
+import plotly.io as pio
+
+# Stacked components of the income breakdown chart
+BREAKDOWN_COMPONENTS = [
+    ("Net Income", "rgb(53, 167, 137)"),
+    ("Personal Tax", "rgb(251, 133, 0)"),
+    ("Corporate Tax", "rgb(255, 65, 54)"),
+    ("Dividend Tax", "rgb(128, 0, 128)"),
+    ("Social Security", "rgb(55, 83, 109)"),
+    ("Pension", "rgb(0, 128, 128)"),
+    ("Company Expenses", "rgb(169, 169, 169)")
+]
+
+# Radar colors of the original three locations; others take the palette in order
+LOCATION_COLORS = {
+    "Netherlands": '#FF9999',  # Light red
+    "Dubai": '#FFD700',  # Gold
+    "Zug": '#99FF99',  # Light green
+}
+RADAR_PALETTE = plotly.colors.qualitative.Pastel
+
+
+def figure_payload(fig):
+    """Size in bytes and serialization time of the JSON spec sent to the browser"""
+    start = time.perf_counter()
+    spec = pio.to_json(fig, validate=False)
+    return {"bytes": len(spec), "serialize_s": time.perf_counter() - start}
+
+
+# Label formats of result columns other than EUR amounts: (text, template)
+LABEL_FORMATS = {
+    "Retention %": ("{:.1f}%", "%{y:.1f}%"),
+}
+
+
+def euro_labels(values, lean):
+    """Label arguments for a result column: a template when lean, formatted text otherwise"""
+    fmt, template = LABEL_FORMATS.get(values.name, ("€{:,.0f}", "€%{y:,.0f}"))
+    if lean:
+        return {"texttemplate": template}
+    return {"text": values.apply(fmt.format)}
+
+
+def refresh_traces(fig, df_eur, lean):
+    """Write `df_eur` into the traces named after its columns, in place.
+
+    The comparison charts name each trace after the result column it plots,
+    so new results only replace trace data instead of rebuilding the figure.
+    """
+    with fig.batch_update():
+        for trace in fig.data:
+            if trace.name in df_eur.columns:
+                trace.update(x=df_eur["Scenario"], y=df_eur[trace.name], **euro_labels(df_eur[trace.name], lean))
+
+
+def axis_coordinates(axis, values, lean):
+    """Trace arguments placing `values` along `axis` ("x" or "y").
+
+    Lean figures give the start and step of an evenly spaced axis instead of
+    every coordinate.
+    """
+    if lean and len(values) > 1:
+        return {f"{axis}0": values[0], f"d{axis}": values[1] - values[0]}
+    return {axis: values}
+
+
+def income_breakdown_figure(df_eur, lean=False):
+    """Stacked bar chart of every income component in EUR"""
+    fig = go.Figure()
+
+    # Add bars for each component using df_eur
+    for component, color in BREAKDOWN_COMPONENTS:
+        fig.add_trace(go.Bar(
+            name=component,
+            x=df_eur["Scenario"],
+            y=df_eur[component],  # Use df_eur for EUR values
+            marker_color=color,
+            textposition="inside",
+            **euro_labels(df_eur[component], lean)
+        ))
+
+    fig.update_layout(
+        barmode='stack',
+        height=600,
+        yaxis_title="Amount in EUR",
+        xaxis_title="Scenario",
+        legend_title="Components",
+        font=dict(size=12),
+        xaxis_tickangle=-75,
+        margin=dict(b=150)
+    )
+    return fig
+
+
+def net_income_figure(df_eur, lean=False):
+    """Net income bars with CoL-adjusted net income and retention lines"""
+    fig = go.Figure()
+    line_trace = go.Scattergl if lean else go.Scatter
+
+    # Add nominal net income bars
+    fig.add_trace(go.Bar(
+        name="Net Income",
+        x=df_eur["Scenario"],
+        y=df_eur["Net Income"],
+        marker_color="rgb(53, 167, 137)",
+        textposition="inside",
+        **euro_labels(df_eur["Net Income"], lean)
+    ))
+
+    # Add CoL adjusted net income line
+    fig.add_trace(line_trace(
+        name="Net Income (CoL Adjusted)",
+        x=df_eur["Scenario"],
+        y=df_eur["Net Income (CoL Adjusted)"],
+        line=dict(color="rgb(255, 165, 0)", width=3),  # Orange line
+        mode="lines+markers+text",
+        textposition="top center",
+        **euro_labels(df_eur["Net Income (CoL Adjusted)"], lean)
+    ))
+
+    # Add retention percentage line
+    fig.add_trace(line_trace(
+        name="Retention %",
+        x=df_eur["Scenario"],
+        y=df_eur["Retention %"],
+        yaxis="y2",
+        line=dict(color="rgb(255, 65, 54)", width=3),
+        mode="lines+markers+text",
+        textposition="top center",
+        **euro_labels(df_eur["Retention %"], lean)
+    ))
+
+    fig.update_layout(
+        height=600,
+        yaxis=dict(
+            title="Amount in EUR",
+            tickfont=dict(color="rgb(53, 167, 137)")
+        ),
+        yaxis2=dict(
+            title="Retention %",
+            tickfont=dict(color="rgb(255, 65, 54)"),
+            overlaying="y",
+            side="right",
+            range=[0, 100]
+        ),
+        xaxis_title="Scenario",
+        legend_title="Metrics",
+        font=dict(size=12),
+        xaxis_tickangle=-75,
+        margin=dict(b=150),
+        showlegend=True
+    )
+    return fig
+
+
+def factor_radar_figure(factors, locations, scores, lean=False):
+    """Radar chart of the raw factor scores, one trace per location.
+
+    `scores` is a (factors, locations) matrix matching the two name lists.
+    """
+    fig = go.Figure()
+    polar_trace = go.Scatterpolargl if lean else go.Scatterpolar
+    palette = itertools.cycle(RADAR_PALETTE)
+    for location, values in zip(locations, np.asarray(scores).T):
+        fig.add_trace(polar_trace(
+            r=values,
+            theta=factors,
+            fill='toself',
+            name=location,
+            line=dict(color=LOCATION_COLORS.get(location) or next(palette))
+        ))
+
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(
+                visible=True,
+                range=[0, 10]
+            )),
+        showlegend=True,
+        title="Location Comparison by Factors",
+        height=700,
+        template="plotly_white"  # Use a white template for better visibility
+    )
+    return fig
+
+
+def sweep_heatmap_figure(daily_rates, working_days, surface, metric, current, lean=False):
+    """Heatmap of one scenario's rate x days surface with the current inputs marked"""
+    fig = go.Figure(go.Heatmap(
+        **axis_coordinates("x", daily_rates, lean),
+        **axis_coordinates("y", working_days, lean),
+        z=surface.astype(np.float32) if lean else surface,
+        colorscale="Viridis",
+        colorbar=dict(title=metric)
+    ))
+    fig.add_trace(go.Scatter(
+        x=[current[0]],
+        y=[current[1]],
+        mode="markers",
+        marker=dict(color="white", size=12, line=dict(color="black", width=2)),
+        name="Current inputs"
+    ))
+    fig.update_layout(
+        height=500,
+        xaxis_title="Daily Rate (EUR)",
+        yaxis_title="Working Days per Year",
+        showlegend=False
+    )
+    return fig
+
+
+def crossover_figure(daily_rates, working_days, margin, lean=False):
+    """Margin of one scenario over another with the break-even line"""
+    if lean:
+        # One contour trace colored like a heatmap sends the margin only once
+        fig = go.Figure(go.Contour(
+            **axis_coordinates("x", daily_rates, lean),
+            **axis_coordinates("y", working_days, lean),
+            z=margin.astype(np.float32),
+            colorscale="RdBu",
+            zmid=0,
+            colorbar=dict(title="Margin"),
+            contours=dict(start=0, end=0, size=1, coloring="heatmap", showlabels=False),
+            line=dict(color="black", width=3),
+            name="Break-even"
+        ))
+    else:
+        fig = go.Figure(go.Heatmap(
+            x=daily_rates,
+            y=working_days,
+            z=margin,
+            colorscale="RdBu",
+            zmid=0,
+            colorbar=dict(title="Margin")
+        ))
+        fig.add_trace(go.Contour(
+            x=daily_rates,
+            y=working_days,
+            z=margin,
+            contours=dict(start=0, end=0, size=1, coloring="lines", showlabels=False),
+            line=dict(color="black", width=3),
+            showscale=False,
+            name="Break-even"
+        ))
+    fig.update_layout(
+        height=500,
+        xaxis_title="Daily Rate (EUR)",
+        yaxis_title="Working Days per Year",
+        showlegend=False
+    )
+    return fig
+
+
+def percentile_band_figure(bands):
+    """Box per scenario from precomputed P5/P25/P50/P75/P95 bands"""
+    fig = go.Figure(go.Box(
+        x=bands["Scenario"],
+        lowerfence=bands["P5"],
+        q1=bands["P25"],
+        median=bands["P50"],
+        q3=bands["P75"],
+        upperfence=bands["P95"],
+        marker_color="rgb(53, 167, 137)",
+        name="Net Income (CoL Adjusted)"
+    ))
+    fig.update_layout(
+        height=500,
+        yaxis_title="Amount in EUR",
+        xaxis_title="Scenario",
+        font=dict(size=12),
+        xaxis_tickangle=-75,
+        margin=dict(b=150),
+        showlegend=False
+    )
+    return fig
@@ -0,0 +1,233 @@
+"""Fixed-point money: the retention engine in int64 minor units (cents).
+
+The float engine keeps fractions of a cent, so its totals differ by cents
+from a spreadsheet that rounds every tax to the cent. This module runs
+the same calculation on integers with these rounding rules:
+
+- Input amounts are rounded to cents as written in decimal, half away
+  from zero. The annual income is the daily rate times the working days,
+  rounded once.
+- Tax rates and the pension rate are held in millionths and must be exact
+  at that scale. Bracket thresholds must be whole cents.
+- Each tax component (income tax, social security, corporate tax) and the
+  pension contribution is computed exactly and then rounded to the cent,
+  half away from zero. Net income is the exact sum of those rounded cents.
+- EUR rates are rounded to millionths of a unit per EUR. A conversion
+  multiplies and divides in integers and rounds once to the cent.
+- The cost of living adjustment divides by an index that need not be an
+  integer, so it is rounded to the cent from a float quotient. Retention %
+  and the index itself stay floats.
+
+Money columns are int64 cents; `from_minor` turns them back into currency
+units. Amounts must stay below `MAX_MINOR` cents (about 11 billion units)
+so that no intermediate product overflows int64.
+This module must not import Streamlit.
+"""
+import numpy as np
+
+from currencies import CURRENCIES
+from jurisdictions import COMPANY, SELF_EMPLOYED
+
+# Minor units per currency unit, rate and EUR rate scales
+MINOR_UNIT = 100
+RATE_SCALE = 10 ** 6
+FX_SCALE = 10 ** 6
+
+# Bound on amounts in minor units, and the width of one BracketSet slot
+MAX_MINOR = 2 ** 40
+
+
+def round_half_away(values):
+    """Floats rounded to the nearest integer, halves away from zero, as int64"""
+    values = np.asarray(values, dtype=np.float64)
+    # The cast truncates towards zero
+    return (values + np.copysign(0.5, values)).astype(np.int64)
+
+
+def divide_round(numerator, denominator):
+    """Integer `numerator / denominator` rounded half away from zero.
+
+    `denominator` must be positive; both are broadcast elementwise. One
+    floor division does it: negative numerators are nudged down by one
+    half-unit so that their halves round down too.
+    """
+    numerator = np.asarray(numerator)
+    return (2 * numerator + denominator - (numerator < 0)) // (2 * denominator)
+
+
+def to_minor(amount):
+    """Currency amounts as int64 minor units, rounded half away from zero.
+
+    The amount is first read to a millionth of a minor unit, so a decimal
+    input such as 1.005 rounds as written (to 1.01) despite its binary
+    representation falling just below.
+    """
+    amount = np.asarray(amount, dtype=np.float64) * MINOR_UNIT
+    if not np.all(np.abs(amount) < MAX_MINOR):
+        raise ValueError(f"Amounts must be finite and below {MAX_MINOR // MINOR_UNIT:,} for fixed-point money")
+    return round_half_away(np.round(amount, 6))
+
+
+def from_minor(minor):
+    """Minor units back to currency amounts as floats"""
+    return np.asarray(minor) / MINOR_UNIT
+
+
+def scaled(values, scale, name):
+    """`values` times `scale` as int64, which must be whole at that scale"""
+    values = np.asarray(values, dtype=np.float64) * scale
+    rounded = np.round(values)
+    if np.any(np.abs(values - rounded) > 1e-6):
+        raise ValueError(f"{name} must be whole multiples of 1/{scale:,} for fixed-point money")
+    return rounded.astype(np.int64)
+
+
+def fx_units(fx_rate):
+    """EUR rates (units per EUR) as int64 millionths, rounded to the nearest"""
+    return round_half_away(np.asarray(fx_rate, dtype=np.float64) * FX_SCALE)
+
+
+class FixedBracketSet:
+    """Integer version of a `BracketSet`: thresholds in cents, rates in millionths.
+
+    The slot layout is the same as in the float set. The intercepts and
+    rates are exact and kept doubled, with half a cent folded into the
+    intercepts, so a tax rounds half up to the cent in one floor division.
+    Rates are not negative, so no tax is.
+    """
+
+    def __init__(self, brackets):
+        slot_start, intercepts, rates = [], [RATE_SCALE], [0]
+        for i, (thresholds, table_rates) in enumerate(brackets.tables):
+            thresholds = scaled(thresholds, MINOR_UNIT, "Tax bracket thresholds")
+            table_rates = scaled(table_rates, RATE_SCALE, "Tax rates")
+            if thresholds[-1] >= MAX_MINOR or table_rates.min() < 0:
+                raise ValueError("Tax brackets must have rates of at least 0 and fit fixed-point money")
+            base = np.concatenate([[0], np.cumsum(np.diff(thresholds) * table_rates[:-1])])
+            slot_start.extend(thresholds + i * MAX_MINOR)
+            intercepts.extend(2 * (base - thresholds * table_rates) + RATE_SCALE)
+            rates.extend(2 * table_rates)
+        self.tables = brackets.tables
+        self.slot_start = np.array(slot_start, dtype=np.int64)
+        self.intercepts = np.array(intercepts, dtype=np.int64)
+        self.rates = np.array(rates, dtype=np.int64)
+        self.offsets = np.arange(len(self.tables), dtype=np.int64) * MAX_MINOR
+        self.flat_rates = self.rates[1:] if all(t.size == 1 for t, _ in self.tables) else None
+
+    def __len__(self):
+        return len(self.tables)
+
+    def tax(self, amount, table_idx):
+        """Tax in minor units on `amount` minor units, rounded to the minor unit"""
+        amount = np.clip(amount, 0, MAX_MINOR - 1)
+        table_idx = np.asarray(table_idx, dtype=np.intp)
+        if self.flat_rates is not None:
+            return (amount * self.flat_rates[table_idx] + RATE_SCALE) // (2 * RATE_SCALE)
+        pos = np.searchsorted(self.slot_start, amount + self.offsets[table_idx], side="right")
+        return (self.intercepts[pos] + amount * self.rates[pos]) // (2 * RATE_SCALE)
+
+
+def fixed_table(table):
+    """Fixed-point version of an `engine.build_scenario_table` table.
+
+    Apply `with_fx_rates` and `with_cost_of_living` to `table` first; the
+    result holds its EUR rates in millionths.
+    """
+    return {
+        "kind": table["kind"],
+        "income_tax": FixedBracketSet(table["income_tax"]),
+        "social_security": FixedBracketSet(table["social_security"]),
+        "corporate_tax": FixedBracketSet(table["corporate_tax"]),
+        "dividend_tax": FixedBracketSet(table["dividend_tax"]),
+        "pension_rate": scaled(table["pension_rate"], RATE_SCALE, "Pension rates"),
+        "min_salary": to_minor(table["min_salary"]),
+        "self_employment_deduction": to_minor(table["self_employment_deduction"]),
+        "col_index": table["col_index"],
+        "country": table["country"],
+        "currency_idx": table["currency_idx"],
+        "fx_rate": fx_units(table["fx_rate"]),
+    }
+
+
+def convert(amount, from_codes, to_codes="EUR", fx_rates=None):
+    """Convert minor units between currencies with one rounding, elementwise"""
+    rates = fx_units(CURRENCIES.rates(fx_rates))
+    return divide_round(
+        np.asarray(amount, dtype=np.int64) * rates[CURRENCIES.index(to_codes)],
+        rates[CURRENCIES.index(from_codes)],
+    )
+
+
+def evaluate(gross_income, company_expenses, scenario_idx, table):
+    """`engine.evaluate` in minor units, with the module's rounding rules.
+
+    `gross_income` and `company_expenses` are int64 minor units in the
+    scenario's local currency and `table` comes from `fixed_table`. Returns
+    columns keyed like `RESULT_COLUMNS`: money as int64 minor units,
+    retention % and the cost of living index as floats.
+    """
+    gross_income = np.asarray(gross_income, dtype=np.int64)
+    company_expenses = np.asarray(company_expenses, dtype=np.int64)
+    scenario_idx = np.asarray(scenario_idx, dtype=np.intp)
+    shape = np.broadcast_shapes(gross_income.shape, company_expenses.shape, scenario_idx.shape)
+
+    kind = table["kind"][scenario_idx]
+    is_company = kind == COMPANY
+    is_self_employed = kind == SELF_EMPLOYED
+
+    taxable_income = gross_income - company_expenses
+    taxable_income = np.where(
+        is_self_employed,
+        taxable_income - table["self_employment_deduction"][scenario_idx],
+        taxable_income,
+    )
+    salary = np.where(is_company, table["min_salary"][scenario_idx], taxable_income)
+
+    personal_tax = table["income_tax"].tax(salary, scenario_idx)
+    social_security = table["social_security"].tax(salary, scenario_idx)
+    pension = np.where(
+        is_self_employed, 0, divide_round(salary * table["pension_rate"][scenario_idx], RATE_SCALE)
+    )
+    net_income = salary - personal_tax - social_security - pension
+
+    corporate_income = np.where(is_company, gross_income - salary - company_expenses, 0)
+    corporate_income = np.maximum(corporate_income, 0)
+    corporate_tax = table["corporate_tax"].tax(corporate_income, scenario_idx)
+    net_income = np.broadcast_to(net_income + corporate_income - corporate_tax, shape)
+    dividend_tax = np.zeros(shape, dtype=np.int64)
+
+    col_index = table["col_index"][scenario_idx]
+    net_income_adjusted = round_half_away(net_income * (100 / col_index))
+    retention_pct = np.divide(
+        net_income * 100.0, gross_income,
+        out=np.zeros(shape), where=gross_income != 0,
+    )
+
+    columns = {
+        "gross_income": gross_income,
+        "company_expenses": company_expenses,
+        "net_income": net_income,
+        "net_income_adjusted": net_income_adjusted,
+        "personal_tax": personal_tax,
+        "corporate_tax": corporate_tax,
+        "dividend_tax": dividend_tax,
+        "social_security": social_security,
+        "pension": pension,
+        "retention_pct": retention_pct,
+        "col_index": col_index,
+    }
+    return {key: np.broadcast_to(value, shape) for key, value in columns.items()}
+
+
+def evaluate_profiles(daily_rate, working_days, company_expenses, table, fx_rate=None):
+    """`engine.evaluate_profiles` in minor units.
+
+    Inputs are floats in currency units as for the float engine and `table`
+    comes from `fixed_table`. The annual EUR income is rounded to the cent
+    and converted to each scenario's currency with one more rounding.
+    """
+    annual_income = to_minor(np.asarray(daily_rate, dtype=np.float64) * np.asarray(working_days, dtype=np.float64))
+    fx_rate = table["fx_rate"][None, :] if fx_rate is None else fx_units(fx_rate)
+    gross_income = divide_round(annual_income[:, None] * fx_rate, FX_SCALE)
+    scenario_idx = np.arange(len(table["kind"]))[None, :]
+    return evaluate(gross_income, to_minor(company_expenses), scenario_idx, table)
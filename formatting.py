@@ -0,0 +1,145 @@
+"""Display formatting for results tables."""
+import numpy as np
+
+from currencies import CURRENCIES
+
+# Widest integer part the column formatter handles (just under 1e15)
+_DIGITS = 15
+
+# Shown for missing (NaN) or infinite values
+MISSING = "—"
+
+
+# Currency formatting function
+def format_currency(amount, currency):
+    """Format amount with appropriate currency symbol and thousands separator"""
+    entry = CURRENCIES[currency]
+    return f"{entry.prefix}{amount:,.0f}".replace(",", entry.separator)
+
+
+def group_thousands(values, separators=","):
+    """Vectorized equivalent of `f"{x:,.0f}"` for a whole array.
+
+    `separators` is one thousands separator for all values or one per value.
+    Digits are laid out right-aligned in a fixed-width code point matrix,
+    separators are inserted as extra columns wherever a digit sits to their
+    left, and the padding is stripped again. Arrays of any shape are
+    formatted flat and keep their shape. NaN and infinite values come out
+    as `MISSING`.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if not values.size:
+        return values.astype(str)
+    finite = np.isfinite(values)
+    if not finite.all():
+        return np.where(finite, group_thousands(np.where(finite, values, 0.0), separators), MISSING)
+    rounded = np.rint(values).ravel()
+    magnitude = np.abs(rounded)
+    separators = np.broadcast_to(np.asarray(separators, dtype="U1"), values.shape).ravel()
+    if magnitude.max() >= 10 ** _DIGITS:
+        formatted = [f"{x:,.0f}".replace(",", sep) for x, sep in zip(rounded, separators)]
+        return np.array(formatted, dtype=str).reshape(values.shape)
+
+    rows = magnitude.size
+    digits = np.char.rjust(magnitude.astype(np.int64).astype(f"U{_DIGITS}"), _DIGITS)
+    groups = digits.view(np.uint32).reshape(rows, _DIGITS // 3, 3)
+
+    # One leading column per 3-digit group holds the separator (or padding)
+    spaced = np.empty((rows, _DIGITS // 3, 4), dtype=np.uint32)
+    spaced[:, :, 1:] = groups
+    spaced[:, 0, 0] = ord(" ")
+    separator_points = np.ascontiguousarray(separators).view(np.uint32)
+    spaced[:, 1:, 0] = np.where(groups[:, :-1, 2] != ord(" "), separator_points[:, None], ord(" "))
+    width = _DIGITS + _DIGITS // 3 - 1
+    body = np.ascontiguousarray(spaced.reshape(rows, -1)[:, 1:]).view(f"U{width}").ravel()
+
+    sign = np.where(np.signbit(rounded), "-", "")
+    return np.char.add(sign, np.char.lstrip(body)).reshape(values.shape)
+
+
+def currency_strings(values, currency_idx):
+    """`values` formatted with the prefix and separator of each row's currency.
+
+    `currency_idx` holds registry positions, one per value. Missing values
+    get no prefix.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    return np.where(
+        np.isfinite(values),
+        np.char.add(CURRENCIES.prefixes[currency_idx], group_thousands(values, CURRENCIES.separators[currency_idx])),
+        MISSING,
+    )
+
+
+def format_currency_columns(df, columns, currency_col="Currency"):
+    """Format monetary columns with each row's currency prefix and separator.
+
+    Each row's currency is looked up in the registry once and reused for
+    every column; the numbers go through the vectorized `group_thousands`.
+    """
+    formatted = df.copy()
+    currency_idx = CURRENCIES.index(df[currency_col].to_numpy(dtype=str))
+    for col in columns:
+        formatted[col] = currency_strings(df[col].to_numpy(), currency_idx)
+    return formatted
+
+
+def fixed_decimals(values, decimals=0, suffix=""):
+    """Vectorized equivalent of `f"{x:.{decimals}f}{suffix}"` for a whole array.
+
+    Values are scaled to whole units of 10**-decimals and their digits laid
+    out right-aligned in a code point matrix, with columns for the sign and
+    the decimal point, as in `group_thousands`. Scaling can move a value
+    onto or off a half (0.05 to one decimal), so values near one are
+    formatted one by one. Arrays of any shape are formatted flat and keep
+    their shape. NaN and infinite values come out as `MISSING`.
+    """
+    shape = np.shape(values)
+    values = np.asarray(values, dtype=np.float64).ravel()
+    finite = np.isfinite(values)
+    exact = np.where(finite, values, 0.0) * 10 ** decimals
+    scaled = np.rint(exact)
+    magnitude = np.abs(scaled)
+    if magnitude.size and magnitude.max() >= 10 ** _DIGITS:
+        text = np.array([f"{x:.{decimals}f}{suffix}" for x in values], dtype=object)
+        return np.where(finite, text, MISSING).reshape(shape)
+
+    # Digits most significant first, blank left of the leading one (or of the
+    # units digit); the column before it takes the minus sign
+    units = magnitude.astype(np.int64)
+    powers = 10 ** np.arange(_DIGITS - 1, -1, -1, dtype=np.int64)
+    length = np.maximum((units[:, None] >= powers).sum(axis=1), decimals + 1)
+    points = np.full((units.size, _DIGITS + 1), ord(" "), dtype=np.uint32)
+    points[:, 1:] = units[:, None] // powers % 10 + ord("0")
+    points[np.arange(_DIGITS + 1) < _DIGITS + 1 - length[:, None]] = ord(" ")
+    points[np.signbit(scaled), _DIGITS - length[np.signbit(scaled)]] = ord("-")
+
+    split = _DIGITS + 1 - decimals
+    columns = [points[:, :split]]
+    if decimals:
+        columns += [np.full((units.size, 1), ord("."), dtype=np.uint32), points[:, split:]]
+    if suffix:
+        columns.append(np.broadcast_to(np.array([ord(c) for c in suffix], dtype=np.uint32), (units.size, len(suffix))))
+    matrix = np.ascontiguousarray(np.concatenate(columns, axis=1))
+    text = np.char.lstrip(matrix.view(f"U{matrix.shape[1]}").ravel()).astype(object)
+
+    near_half = np.flatnonzero(np.abs(np.abs(exact - scaled) - 0.5) < 1e-6)
+    text[near_half] = [f"{values[i]:.{decimals}f}{suffix}" for i in near_half]
+    return np.where(finite, text, MISSING).reshape(shape)
+
+
+def format_rates(retention_pct, col_index):
+    """Retention percentages and cost of living indices as display strings"""
+    return (
+        fixed_decimals(retention_pct, 1, "%"),
+        fixed_decimals(col_index),
+    )
+
+
+def format_results_table(df, money_columns):
+    """Results frame with currencies, retention and CoL index as display strings"""
+    display_df = format_currency_columns(df, money_columns)
+    display_df["Retention %"], display_df["Cost of Living Index"] = format_rates(
+        df["Retention %"], df["Cost of Living Index"]
+    )
+    return display_df
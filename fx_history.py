@@ -0,0 +1,133 @@
+"""Historical EUR reference rates with as-of-date lookups.
+
+Rates are read from a CSV in the layout of the ECB's `eurofxref-hist.csv`: a
+`Date` column followed by one column per currency in units per EUR, with
+"N/A" where there was no fixing. The bundled `data/ecb_reference_rates.csv`
+holds ECB annual average rates dated December 31st of their year, the day the
+average is known. An as-of lookup therefore uses the previous year's average
+and never one that includes later fixings. The full daily history from the
+ECB can be used in its place unchanged.
+
+The store is one sorted vector of days and one dense (days, currencies) rate
+matrix, so a lookup is a binary search plus fancy indexing and whole columns
+of dates and currencies convert in one call. It is only loaded on first use.
+"""
+import csv
+import functools
+import json
+import os
+
+import numpy as np
+
+from currencies import CodeIndex
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "ecb_reference_rates.csv")
+
+# Currencies the ECB does not fix, derived from the currency they are pegged to
+PEGGED = {"AED": ("USD", 3.6725)}  # UAE dirham, 3.6725 AED per USD
+
+
+def _rate(value):
+    value = value.strip()
+    return float(value) if value and value != "N/A" else np.nan
+
+
+class FXHistory:
+    """EUR reference rates (units per EUR) by day and currency.
+
+    `days` is a sorted int32 vector of days since 1970-01-01 and `rates` the
+    matching (days, currencies) float64 matrix. Missing fixings are carried
+    forward from the previous day at load time, so every lookup is "as of".
+    """
+
+    def __init__(self, days, currencies, rates):
+        self.days = days
+        self.currencies = list(currencies)
+        self.rates = rates
+        self._columns = CodeIndex(self.currencies)
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            columns = [(i, name.strip()) for i, name in enumerate(header) if i > 0 and name.strip()]
+            dates, values = [], []
+            for row in reader:
+                if not row or not row[0].strip():
+                    continue
+                dates.append(row[0].strip())
+                values.append([_rate(row[i]) if i < len(row) else np.nan for i, _ in columns])
+
+        days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        order = np.argsort(days, kind="stable")
+        days, rates = days[order], np.array(values, dtype=np.float64).reshape(len(days), -1)[order]
+
+        # Carry the last fixing forward over gaps (leading gaps stay missing)
+        last_fixing = np.where(np.isnan(rates), 0, np.arange(len(days))[:, None])
+        rates = rates[np.maximum.accumulate(last_fixing, axis=0), np.arange(rates.shape[1])]
+
+        currencies = ["EUR"] + [name for _, name in columns]
+        rates = np.column_stack([np.ones(len(days)), rates])
+        for currency, (anchor, units) in PEGGED.items():
+            if currency not in currencies and anchor in currencies:
+                currencies.append(currency)
+                rates = np.column_stack([rates, rates[:, currencies.index(anchor)] * units])
+        return cls(days.astype(np.int32), currencies, np.ascontiguousarray(rates))
+
+    def save(self, directory):
+        """Write the arrays as .npy files that `open` can memory-map"""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "days.npy"), self.days)
+        np.save(os.path.join(directory, "rates.npy"), self.rates)
+        with open(os.path.join(directory, "currencies.json"), "w") as f:
+            json.dump(self.currencies, f)
+
+    @classmethod
+    def open(cls, directory, mmap=True):
+        """Load arrays written by `save`, memory-mapped unless `mmap` is False"""
+        mode = "r" if mmap else None
+        with open(os.path.join(directory, "currencies.json")) as f:
+            currencies = json.load(f)
+        return cls(
+            np.load(os.path.join(directory, "days.npy"), mmap_mode=mode),
+            currencies,
+            np.load(os.path.join(directory, "rates.npy"), mmap_mode=mode),
+        )
+
+    @property
+    def first_date(self):
+        return np.datetime64(int(self.days[0]), "D").astype(object)
+
+    @property
+    def last_date(self):
+        return np.datetime64(int(self.days[-1]), "D").astype(object)
+
+    def _rows(self, dates):
+        days = np.asarray(dates, dtype="datetime64[D]").astype(np.int64)
+        rows = np.searchsorted(self.days, days, side="right") - 1
+        if np.any(rows < 0):
+            raise ValueError(f"No FX rates before {self.first_date:%Y-%m-%d}")
+        return rows
+
+    def rates_as_of(self, currencies, dates):
+        """Units of each currency per EUR as of each date, broadcast elementwise"""
+        rates = self.rates[self._rows(dates), self._columns(currencies)]
+        if np.any(np.isnan(rates)):
+            raise ValueError("No FX fixing yet for some currency on the requested dates")
+        return rates
+
+    def rates_on(self, date):
+        """{currency: units per EUR} as of one date, for every fixed currency"""
+        row = self.rates[self._rows(date)]
+        return {currency: float(rate) for currency, rate in zip(self.currencies, row) if not np.isnan(rate)}
+
+    def convert_to_eur(self, amounts, currencies, dates):
+        """Convert amounts in `currencies` to EUR at the rates as of `dates`"""
+        return np.asarray(amounts, dtype=np.float64) / self.rates_as_of(currencies, dates)
+
+
+@functools.lru_cache(maxsize=4)
+def load_history(path=DATA_PATH):
+    """FX history from `path`, parsed once per process"""
+    return FXHistory.from_csv(path)
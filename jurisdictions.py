@@ -0,0 +1,164 @@
+"""Locations and scenarios loaded from `data/jurisdictions.json`.
+
+A location is a place with a currency and a cost-of-living index; a scenario
+is one way of earning there (employment, a company, self-employment) with its
+tax tables. Tax components in the file are either the name of a table under
+`tax_tables`, an inline list of (threshold, rate) pairs or a flat rate.
+
+Everything is resolved when the file is loaded: table names become bracket
+lists, the strategy name becomes an integer id and minimum salaries given in
+EUR become local amounts, so the records are plain values that the engine
+packs into arrays without looking at names.
+"""
+import functools
+import json
+import os
+
+from brackets import flat, validate
+from currencies import CURRENCIES
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jurisdictions.json")
+
+# Calculation strategies
+SALARY = 0
+COMPANY = 1
+SELF_EMPLOYED = 2
+
+STRATEGIES = {"salary": SALARY, "company": COMPANY, "self_employed": SELF_EMPLOYED}
+
+
+class Location:
+    """A place to live: its currency and cost of living index (NL = 100)"""
+
+    __slots__ = ("code", "name", "currency", "cost_of_living", "default")
+
+    def __init__(self, code, name, currency, cost_of_living, default=False):
+        self.code = code
+        self.name = name
+        self.currency = currency
+        self.cost_of_living = cost_of_living
+        self.default = default
+
+    def __repr__(self):
+        return f"Location({self.code!r})"
+
+
+class Scenario:
+    """One way of earning in a location, with its resolved tax parameters.
+
+    Tax components are bracket lists in local currency and `strategy` is one
+    of SALARY, COMPANY or SELF_EMPLOYED.
+    """
+
+    __slots__ = (
+        "name", "location", "strategy", "income_tax", "social_security", "corporate_tax",
+        "dividend_tax", "pension_rate", "min_salary", "self_employment_deduction",
+        "needs_hourly", "description",
+    )
+
+    def __init__(self, name, location, strategy, income_tax, social_security, corporate_tax,
+                 dividend_tax=None, pension_rate=0.0, min_salary=0.0,
+                 self_employment_deduction=0.0, needs_hourly=False, description=""):
+        self.name = name
+        self.location = location
+        self.strategy = strategy
+        self.income_tax = income_tax
+        self.social_security = social_security
+        self.corporate_tax = corporate_tax
+        self.dividend_tax = dividend_tax if dividend_tax is not None else flat(0.0)
+        self.pension_rate = pension_rate
+        self.min_salary = min_salary
+        self.self_employment_deduction = self_employment_deduction
+        self.needs_hourly = needs_hourly
+        self.description = description
+
+    @property
+    def country(self):
+        return self.location.code
+
+    @property
+    def currency(self):
+        return self.location.currency
+
+    def __repr__(self):
+        return f"Scenario({self.name!r})"
+
+
+class Jurisdictions:
+    """Every location and scenario from one data file, in file order"""
+
+    def __init__(self, locations, scenarios):
+        self.locations = {loc.code: loc for loc in locations}
+        self.scenarios = list(scenarios)
+
+    def __getitem__(self, name):
+        for scenario in self.scenarios:
+            if scenario.name == name:
+                return scenario
+        raise KeyError(name)
+
+    def defaults(self):
+        """Scenarios of the locations shown by default"""
+        return [s for s in self.scenarios if s.location.default]
+
+    def in_locations(self, codes):
+        """Scenarios of the given location codes"""
+        codes = set(codes)
+        return [s for s in self.scenarios if s.country in codes]
+
+    @classmethod
+    def from_dict(cls, data):
+        tables = {name: table["brackets"] for name, table in data.get("tax_tables", {}).items()}
+
+        def brackets(spec):
+            if isinstance(spec, str):
+                if spec not in tables:
+                    raise ValueError(f"Unknown tax table: {spec}")
+                spec = tables[spec]
+            elif isinstance(spec, (int, float)):
+                spec = flat(spec)
+            spec = [(float(t), float(r)) for t, r in spec]
+            validate(spec)
+            return spec
+
+        locations = {}
+        for entry in data["locations"]:
+            if entry["currency"] not in CURRENCIES:
+                raise ValueError(f"Unknown currency for {entry['code']}: {entry['currency']}")
+            locations[entry["code"]] = Location(
+                entry["code"], entry["name"], entry["currency"],
+                float(entry["cost_of_living"]), bool(entry.get("default", False)),
+            )
+
+        scenarios = []
+        for entry in data["scenarios"]:
+            location = locations.get(entry["location"])
+            if location is None:
+                raise ValueError(f"Unknown location for {entry['name']}: {entry['location']}")
+            if entry["strategy"] not in STRATEGIES:
+                raise ValueError(f"Unknown strategy for {entry['name']}: {entry['strategy']}")
+            min_salary = entry.get("min_salary", 0.0)
+            if "min_salary_eur" in entry:
+                min_salary = entry["min_salary_eur"] * CURRENCIES.eur_rate(location.currency)
+            scenarios.append(Scenario(
+                entry["name"],
+                location,
+                STRATEGIES[entry["strategy"]],
+                brackets(entry.get("income_tax", 0.0)),
+                brackets(entry.get("social_security", 0.0)),
+                brackets(entry.get("corporate_tax", 0.0)),
+                brackets(entry.get("dividend_tax", 0.0)),
+                pension_rate=float(entry.get("pension_rate", 0.0)),
+                min_salary=float(min_salary),
+                self_employment_deduction=float(entry.get("self_employment_deduction", 0.0)),
+                needs_hourly=bool(entry.get("needs_hourly", False)),
+                description=entry.get("description", ""),
+            ))
+        return cls(locations.values(), scenarios)
+
+
+@functools.lru_cache(maxsize=4)
+def load_jurisdictions(path=DATA_PATH):
+    """Jurisdictions from `path`, parsed once per process"""
+    with open(path) as f:
+        return Jurisdictions.from_dict(json.load(f))
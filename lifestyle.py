@@ -0,0 +1,188 @@
+"""Weighted lifestyle scores for any number of candidate locations.
+
+Scores are a dense (factors, locations) matrix read from
+`data/lifestyle_scores.csv`: one row per factor, one column per location,
+each score from 0 to 10. Weighting every location is one matrix-vector
+product and ranking uses a partial sort, so comparing a few hundred cities
+costs about the same as comparing three.
+"""
+import csv
+import functools
+import os
+
+import numpy as np
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lifestyle_scores.csv")
+
+
+class FactorScores:
+    """Scores of every location on every lifestyle factor.
+
+    `scores[i, j]` is location j's score on factor i.
+    """
+
+    def __init__(self, factors, locations, scores):
+        self.factors = list(factors)
+        self.locations = list(locations)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        if self.scores.shape != (len(self.factors), len(self.locations)):
+            raise ValueError("Scores must have one row per factor and one column per location")
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH):
+        with open(path, newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            rows = [row for row in reader if row and row[0].strip()]
+        return cls(
+            [row[0].strip() for row in rows],
+            [name.strip() for name in header[1:]],
+            [[float(value) for value in row[1:]] for row in rows],
+        )
+
+    def location_index(self, names):
+        """Column positions of the given location names"""
+        positions = {name: i for i, name in enumerate(self.locations)}
+        return np.array([positions[name] for name in names], dtype=np.intp)
+
+    def weighted(self, weights, locations=None):
+        """Weighted average score per location.
+
+        `weights` has one entry per factor, or shape (..., factors) for many
+        weightings at once; the result has shape (..., locations). Weightings
+        summing to zero score 0. `locations` optionally restricts the
+        columns to those positions.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        scores = self.scores if locations is None else self.scores[:, locations]
+        total = weights.sum(axis=-1, keepdims=True)
+        return np.divide(weights @ scores, total, out=np.zeros(weights.shape[:-1] + scores.shape[1:]),
+                         where=total != 0)
+
+    def top_k(self, weights, k, locations=None):
+        """Positions and scores of the `k` best locations, best first.
+
+        Only the `k` winners are sorted (`np.argpartition` finds them in
+        linear time). Positions index `self.locations`.
+        """
+        candidates = np.arange(len(self.locations)) if locations is None else np.asarray(locations)
+        scores = self.weighted(weights, candidates)
+        k = min(k, len(candidates))
+        if k <= 0:
+            return candidates[:0], scores[:0]
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return candidates[best], scores[best]
+
+    def flip_points(self, weights, locations=None, max_weight=10):
+        """Smallest whole-point change of each factor's weight that changes the leader.
+
+        Returns the signed change per factor (0 where no weight between 0 and
+        `max_weight` changes it) and the position of the location that then
+        ranks first (-1 where none). Thresholds are exact: the leader's lead
+        over every rival is linear in each weight.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        candidates = np.arange(len(self.locations)) if locations is None else np.asarray(locations)
+        scores = self.scores[:, candidates]
+        leader = np.argmax(weights @ scores)
+
+        # Lead over every rival per factor point; moving weight f by d changes
+        # the leader's total lead over rival l from margin[l] to
+        # margin[l] + d * advantage[f, l], so the leader changes past -margin / advantage
+        advantage = scores[:, [leader]] - scores
+        margin = weights @ advantage
+        with np.errstate(divide="ignore", invalid="ignore"):
+            threshold = -margin[None, :] / advantage
+        threshold[advantage == 0] = np.inf
+        threshold[:, leader] = np.inf
+        # Whole points strictly past the threshold, up where the rival scores
+        # higher on the factor and down where it scores lower, within the slider range
+        steps = np.where(advantage < 0, np.floor(threshold) + 1, np.ceil(threshold) - 1)
+        new_weight = weights[:, None] + steps
+        steps[(new_weight < 0) | (new_weight > max_weight) | ~np.isfinite(steps)] = np.inf
+
+        change = np.take_along_axis(steps, np.argmin(np.abs(steps), axis=1)[:, None], axis=1)[:, 0]
+        flips = np.isfinite(change)
+        change = np.where(flips, change, 0.0)
+
+        # The location that leads after the change (another rival may overtake first)
+        moved = np.where(np.eye(len(weights), dtype=bool), weights + change[:, None], weights)
+        new_leader = np.where(flips, candidates[np.argmax(moved @ scores, axis=1)], -1)
+        return change.astype(int), new_leader
+
+    def sample_wins(self, weights, locations=None, draws=1_000_000, concentration=50.0, seed=0,
+                    chunk_size=100_000):
+        """Tally which location ranks first for weightings drawn around `weights`.
+
+        Weightings are Dirichlet draws with mean `weights / weights.sum()`;
+        `concentration` sets how tightly they cluster (higher is tighter).
+        Factors weighted 0 get a small share so they can still tip the
+        ranking. Draws are scored in chunks of `chunk_size` with seeds
+        spawned from `seed`, and the running tally is yielded after each
+        chunk so callers can show progress or stop early. Tallies hold
+        `draws` so far, `wins` per candidate, the `leader` at `weights`, the
+        number of `flipped` draws (another location first) and the mean
+        weighting of flipped and kept draws.
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        candidates = np.arange(len(self.locations)) if locations is None else np.asarray(locations)
+        scores = self.scores[:, candidates]
+        alpha = np.maximum(concentration * weights / weights.sum(), 0.1)
+        leader = int(np.argmax(weights @ scores))
+
+        tally = {
+            "draws": 0,
+            "wins": np.zeros(len(candidates), dtype=np.int64),
+            "leader": leader,
+            "flipped": 0,
+            "flipped_weight_sum": np.zeros(len(weights)),
+            "kept_weight_sum": np.zeros(len(weights)),
+        }
+        sizes = [min(chunk_size, draws - start) for start in range(0, draws, chunk_size)]
+        for chunk_seed, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes):
+            sample = np.random.default_rng(chunk_seed).dirichlet(alpha, size)
+            first = np.argmax(sample @ scores, axis=1)
+            flipped = first != leader
+            tally["draws"] += size
+            tally["wins"] += np.bincount(first, minlength=len(candidates))
+            tally["flipped"] += int(flipped.sum())
+            tally["flipped_weight_sum"] += sample[flipped].sum(axis=0)
+            tally["kept_weight_sum"] += sample[~flipped].sum(axis=0)
+            yield tally
+
+    def win_probabilities(self, weights, locations=None, **options):
+        """Summary of `sample_wins` once all draws are scored.
+
+        Returns each candidate's probability of ranking first, the share of
+        draws where the leader changes and, per factor, how much more of the
+        total weight the flipped draws gave it than the kept ones (positive:
+        caring more about the factor tends to change the leader).
+        """
+        for tally in self.sample_wins(weights, locations, **options):
+            pass
+        return robustness_summary(tally)
+
+    def extremes(self):
+        """Best and worst location per factor, as (positions, positions)"""
+        return self.scores.argmax(axis=1), self.scores.argmin(axis=1)
+
+
+def robustness_summary(tally):
+    """Probabilities and per-factor flip tendency from a `sample_wins` tally"""
+    flipped, kept = tally["flipped"], tally["draws"] - tally["flipped"]
+    shift = np.zeros_like(tally["flipped_weight_sum"])
+    if flipped and kept:
+        shift = tally["flipped_weight_sum"] / flipped - tally["kept_weight_sum"] / kept
+    return {
+        "probability_first": tally["wins"] / tally["draws"],
+        "leader": tally["leader"],
+        "flip_share": flipped / tally["draws"],
+        "flip_weight_shift": shift,
+    }
+
+
+@functools.lru_cache(maxsize=4)
+def load_scores(path=DATA_PATH):
+    """Factor scores from `path`, parsed once per process"""
+    return FactorScores.from_csv(path)
@@ -0,0 +1,142 @@
+"""Monte Carlo projection of FX and cost-of-living uncertainty.
+
+The point estimates of the EUR rates and cost of living indices are
+replaced by draws around them: correlated log-normal shocks to every EUR
+exchange rate, independent log-normal shocks to the cost-of-living index of
+every non-base country and optionally normal variation in working days. Each draw runs all
+scenarios through the engine, giving a distribution of EUR net income.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from engine import COST_OF_LIVING, build_scenario_table, eur_rate, evaluate
+
+# Default one-year uncertainty around the point estimates
+DEFAULT_UNCERTAINTY = {
+    "fx_volatility": {"CHF": 0.06, "AED": 0.08},  # Log-volatility per EUR rate
+    "fx_correlation": 0.3,  # Correlation between the EUR rates' shocks
+    "col_volatility": 0.05,  # Log-volatility of each non-base CoL index
+    "working_days_sd": 0.0,  # Standard deviation of working days
+}
+
+# Percentiles reported per scenario
+BAND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Cost of living base country, its index stays fixed at 100
+BASE_COUNTRY = "NL"
+
+
+def _lognormal(rng, sigma, size):
+    """Mean-one log-normal multipliers, correlated through `sigma` (a matrix)"""
+    z = rng.standard_normal(size=(size, sigma.shape[0])) @ sigma.T
+    variance = np.einsum("ij,ij->i", sigma, sigma)
+    return np.exp(z - variance / 2)
+
+
+def min_fx_correlation(shocked):
+    """Lowest equal correlation between `shocked` EUR rates that is feasible.
+
+    A matrix with ones on the diagonal and rho elsewhere is positive
+    semi-definite only for rho >= -1/(n-1).
+    """
+    return -1.0 / (shocked - 1) if shocked > 2 else -1.0
+
+
+def _fx_factor(vol, correlation):
+    """Cholesky factor of the FX covariance, over the shocked rates only.
+
+    Rates without volatility (EUR itself, for one) get zero rows, so they
+    do not count towards the feasible correlation range.
+    """
+    shocked = np.flatnonzero(vol > 0)
+    factor = np.zeros((len(vol), len(vol)))
+    if len(shocked):
+        corr = np.full((len(shocked), len(shocked)), correlation)
+        np.fill_diagonal(corr, 1.0)
+        factor[np.ix_(shocked, shocked)] = (
+            np.linalg.cholesky(corr + 1e-12 * np.eye(len(shocked))) * vol[shocked, None]
+        )
+    return factor
+
+
+def _simulate_chunk(args):
+    (seed, draws, daily_rate, working_days, company_expenses,
+     scenarios, currencies, countries, uncertainty, fx_rates, cost_of_living) = args
+    rng = np.random.default_rng(seed)
+    table = build_scenario_table(scenarios, fx_rates)
+
+    vol = np.array([uncertainty["fx_volatility"].get(c, 0.0) for c in currencies])
+    fx_factor = _fx_factor(vol, uncertainty["fx_correlation"])
+    base_fx = np.array([eur_rate(c, fx_rates) for c in currencies])
+    fx = base_fx * _lognormal(rng, fx_factor, draws)
+
+    col_vol = np.full(len(countries), uncertainty["col_volatility"])
+    col_vol[[c == BASE_COUNTRY for c in countries]] = 0.0
+    col = np.array([cost_of_living[c] for c in countries]) * _lognormal(rng, np.diag(col_vol), draws)
+
+    days = np.full(draws, float(working_days))
+    if uncertainty["working_days_sd"] > 0:
+        days = np.clip(rng.normal(working_days, uncertainty["working_days_sd"], draws), 0, 260)
+
+    # Map every scenario onto its currency and country draw
+    scenario_fx = fx[:, [currencies.index(s.currency) for s in scenarios]]
+    scenario_col = col[:, [countries.index(s.country) for s in scenarios]]
+    gross_income = (daily_rate * days)[:, None] * scenario_fx
+    net_income = evaluate(gross_income, company_expenses, np.arange(len(scenarios)), table)["net_income"]
+    net_income_eur = net_income / scenario_fx
+    return net_income_eur, net_income_eur * 100 / scenario_col
+
+
+def simulate(daily_rate, working_days, company_expenses, scenarios, draws=1_000_000,
+             seed=0, uncertainty=None, chunk_size=250_000, workers=1, fx_rates=None, cost_of_living=None):
+    """Draw `draws` joint FX/CoL/working-day outcomes for all scenarios.
+
+    `company_expenses` holds one value per scenario in its local currency.
+    Draws are generated in fixed-size chunks with seeds spawned from `seed`,
+    so results are identical for any number of `workers`. Returns EUR net
+    income and CoL-adjusted EUR net income, each shaped (draws, scenarios).
+    FX shocks are drawn around `fx_rates` (see `engine.eur_rate`) if given,
+    and cost of living shocks around `cost_of_living` (location code to
+    index, e.g. from a price basket) for the locations it covers. Raises
+    ValueError if the FX correlation is infeasible for the number of EUR
+    rates with volatility (see `min_fx_correlation`).
+    """
+    uncertainty = {**DEFAULT_UNCERTAINTY, **(uncertainty or {})}
+    currencies = sorted({s.currency for s in scenarios})
+    shocked = sum(uncertainty["fx_volatility"].get(c, 0.0) > 0 for c in currencies)
+    if not min_fx_correlation(shocked) <= uncertainty["fx_correlation"] <= 1.0:
+        raise ValueError(
+            f"FX correlation must be between {min_fx_correlation(shocked):.2f} and 1 "
+            f"for {shocked} volatile EUR rates"
+        )
+    countries = sorted({s.country for s in scenarios})
+    company_expenses = np.asarray(company_expenses, dtype=np.float64)
+    cost_of_living = {**COST_OF_LIVING, **(cost_of_living or {})}
+
+    sizes = [min(chunk_size, draws - start) for start in range(0, draws, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [
+        (chunk_seed, size, daily_rate, working_days, company_expenses,
+         scenarios, currencies, countries, uncertainty, fx_rates, cost_of_living)
+        for chunk_seed, size in zip(seeds, sizes)
+    ]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(_simulate_chunk, jobs))
+    else:
+        chunks = [_simulate_chunk(job) for job in jobs]
+
+    return {
+        "net_income_eur": np.concatenate([c[0] for c in chunks]),
+        "net_income_adjusted_eur": np.concatenate([c[1] for c in chunks]),
+    }
+
+
+def percentile_bands(samples, scenarios, percentiles=BAND_PERCENTILES):
+    """Percentiles per scenario as a DataFrame (one row per scenario)"""
+    values = np.percentile(samples, percentiles, axis=0)
+    bands = pd.DataFrame(values.T, columns=[f"P{p}" for p in percentiles])
+    bands.insert(0, "Scenario", [s.name for s in scenarios])
+    return bands
@@ -1,34 +1,65 @@
+import datetime
+import time
+
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
 
-# Define currency conversion rates
-CURRENCY_RATES = {
-    "EUR_TO_CHF": 0.95,  # 1 EUR = 0.95 CHF
-    "EUR_TO_AED": 3.98,  # 1 EUR = 3.98 AED
-}
+from profiling import SectionTimer, profile_dump, profile_summary, start_profile
 
-# Currency formatting function
-def format_currency(amount, currency):
-    """Format amount with appropriate currency symbol and thousands separator"""
-    if currency == "EUR":
-        return f"€{amount:,.0f}"
-    elif currency == "CHF":
-        return f"CHF {amount:,.0f}"
-    else:  # AED
-        return f"AED {amount:,.0f}"
-
-# Cost of living index (Netherlands as base 100)
-COST_OF_LIVING = {
-    "NL": 100,  # Base index
-    "UAE": 85,  # Dubai is about 15% cheaper overall
-    "CH-ZG": 145,  # Zug is about 45% more expensive
-}
+# Started ahead of the other imports so a cold start reports what they cost.
+# numpy and the engine modules load here. pandas, the Monte Carlo module,
+# the price basket and the ECB rate history are imported where first
+# needed, which for pandas is the expense editor right after first paint
+# (or the basket table, when the basket index is switched on).
+timer = SectionTimer()
+
+import numpy as np
+
+from breakeven import required_daily_rate
+from currencies import CURRENCIES
+from engine import BASE_SCENARIOS, JURISDICTIONS, build_scenario_table, with_cost_of_living, with_fx_rates
+from figures import (
+    crossover_figure,
+    factor_radar_figure,
+    figure_payload,
+    income_breakdown_figure,
+    net_income_figure,
+    percentile_band_figure,
+    sweep_heatmap_figure,
+)
+from formatting import format_currency, format_results_table
+from lifestyle import load_scores, robustness_summary
+from result_cache import FIGURES, RESULTS, cache_key
+from result_store import ResultStore
+from safetynet import BENEFITS, load_safety_nets, simulate_careers, value_safety_nets
+from split import OBJECTIVES, optimize_splits
+from sweep import crossover, grid_axes, sweep_grid
+
+timer.lap("Imports")
 
-# Add social security benefits information after cost of living definitions
+# Parameter arrays of the base scenarios, compiled once per process
+SCENARIO_TABLE = build_scenario_table(BASE_SCENARIOS)
+
+
+def scenario_table(fx_rates=None, cost_of_living=None):
+    """`SCENARIO_TABLE` at these EUR rates and cost of living indices"""
+    return with_cost_of_living(with_fx_rates(SCENARIO_TABLE, fx_rates), cost_of_living)
+
+
+# Social security benefits information by location. Only the base scenarios' locations
+# are described; the other jurisdictions have no entry and are left out below
 SOCIAL_SECURITY_BENEFITS = {
     "NL": {
+        "label": "🇳🇱 Netherlands",
+        "overview": (
+            "The Dutch social security system is comprehensive and provides extensive coverage. "
+            "It's based on residency and employment, with both employers and employees contributing."
+        ),
         "rate": "Up to 27.65% total (employer + employee)",
+        "summary": {
+            "Unemployment Max": "24 months, 70-75%",
+            "Healthcare System": "Universal + Private",
+            "State Pension": "€1,300/month",
+        },
         "unemployment": {
             "contribution": "2.7% (WW-premie)",
             "benefit": "Up to 75% of last salary for 2 months, then 70% for up to 24 months",
@@ -51,7 +82,17 @@ SOCIAL_SECURITY_BENEFITS = {
         }
     },
     "UAE": {
+        "label": "🇦🇪 Dubai",
+        "overview": (
+            "Dubai's system for expats is primarily private insurance-based with minimal state benefits. "
+            "Employers are required to provide certain basic coverages and end-of-service benefits."
+        ),
         "rate": "No mandatory social security for expats",
+        "summary": {
+            "Unemployment Max": "None (end of service only)",
+            "Healthcare System": "Private Only",
+            "State Pension": "End of service gratuity",
+        },
         "unemployment": {
             "contribution": "None",
             "benefit": "No unemployment benefits for expats",
@@ -74,7 +115,18 @@ SOCIAL_SECURITY_BENEFITS = {
         }
     },
     "CH-ZG": {
+        "label": "🇨🇭 Zug",
+        "overview": (
+            "The Swiss social security system is well-structured and provides good coverage, "
+            "though with higher out-of-pocket costs than the Netherlands. It combines state and "
+            "private elements."
+        ),
         "rate": "Up to 13.8% total (employer + employee)",
+        "summary": {
+            "Unemployment Max": "18 months, 70-80%",
+            "Healthcare System": "Universal + Private",
+            "State Pension": "Up to CHF 2,390/month",
+        },
         "unemployment": {
             "contribution": "2.2% (ALV)",
             "benefit": "70-80% of last salary for up to 18 months",
@@ -98,742 +150,1073 @@ SOCIAL_SECURITY_BENEFITS = {
     }
 }
 
-def adjust_for_cost_of_living(amount, country):
-    """Adjust amount based on cost of living index (higher index = more expensive)"""
-    nl_equivalent = (amount * 100) / COST_OF_LIVING[country]
-    return nl_equivalent
-
-# Add currency conversion functions after the CURRENCY_RATES definition
-def convert_to_eur(amount, from_currency):
-    if from_currency == "EUR":
-        return amount
-    elif from_currency == "CHF":
-        return amount / CURRENCY_RATES["EUR_TO_CHF"]
-    elif from_currency == "AED":
-        return amount / CURRENCY_RATES["EUR_TO_AED"]
-    return amount
+# Benefit sections shown for every location, in order
+BENEFIT_SECTIONS = {
+    "unemployment": "🏢 Unemployment Protection",
+    "disability": "🏥 Disability Coverage",
+    "healthcare": "⚕️ Healthcare System",
+    "pension": "👴 Pension System",
+}
+
+# Metrics offered by the rate x days sweep
+SWEEP_METRICS = {
+    "Net Income (CoL Adjusted)": "net_income_adjusted_eur",
+    "Net Income": "net_income_eur",
+    "Retention %": "retention_pct",
+}
+
+# Dirichlet concentration of the weight robustness samples (higher is tighter)
+WEIGHT_SPREADS = {"Small": 200.0, "Moderate": 50.0, "Large": 15.0}
+
+@st.cache_resource(max_entries=16)
+def cached_sweep(rate_step, days_step, company_expenses, fx_rates=None, cost_of_living=None):
+    """Rate x days surfaces for the base scenarios, shared across sessions"""
+    daily_rates, working_days = grid_axes(rate_step, days_step)
+    surfaces = sweep_grid(
+        daily_rates, working_days, company_expenses, scenario_table(fx_rates, cost_of_living)
+    )
+    for surface in surfaces.values():
+        surface.setflags(write=False)
+    return surfaces
+
+@st.cache_data(max_entries=32)
+def cached_simulation(daily_rate, working_days, company_expenses, draws, seed, uncertainty, fx_rates=None,
+                      cost_of_living=None):
+    """Percentile bands of CoL-adjusted EUR net income for the base scenarios"""
+    from montecarlo import percentile_bands, simulate
+
+    chf_vol, aed_vol, fx_correlation, col_vol, days_sd = uncertainty
+    samples = simulate(
+        daily_rate,
+        working_days,
+        company_expenses,
+        BASE_SCENARIOS,
+        draws=draws,
+        seed=seed,
+        uncertainty={
+            "fx_volatility": {"CHF": chf_vol, "AED": aed_vol},
+            "fx_correlation": fx_correlation,
+            "col_volatility": col_vol,
+            "working_days_sd": days_sd,
+        },
+        fx_rates=fx_rates,
+        cost_of_living=cost_of_living,
+    )
+    return percentile_bands(samples["net_income_adjusted_eur"], BASE_SCENARIOS)
+
+@st.cache_data
+def benefit_markdown(code):
+    """A location's social security section as one markdown block, built once per process"""
+    location = SOCIAL_SECURITY_BENEFITS[code]
+    lines = [
+        f"### {JURISDICTIONS.locations[code].name} Social Security System",
+        location["overview"],
+        f"**Overall Rate:** {location['rate']}",
+    ]
+    for section, title in BENEFIT_SECTIONS.items():
+        details = location[section]
+        lines += [
+            f"#### {title}",
+            f"**Contribution:** {details['contribution']}  \n"
+            f"**Benefit:** {details['benefit']}  \n"
+            f"**Conditions:** {details['conditions']}",
+        ]
+    return "\n\n".join(lines)
+
+# Widgets inside tabs that fast startup may skip; their values are carried over
+# while the tab is closed, since Streamlit drops the state of unrendered widgets
+TAB_WIDGET_PREFIXES = (
+    "tab_", "master_daily_rate", "working_days", "valuation_date", "breakeven_", "expense_", "weight_",
+    "lifestyle_", "sweep_", "crossover_", "mc_", "split_", "col_", "safety_"
+)
+
+def section_tabs(labels, key):
+    """`st.tabs`, or with fast startup only the tab that is open.
+
+    With fast startup the tabs become a horizontal radio, and the returned
+    list holds a container for the selected tab and None for the others, so
+    their code is skipped instead of rendered out of sight.
+    """
+    if not fast_startup:
+        return st.tabs(labels)
+    selected = st.radio(key, labels, horizontal=True, key=key, label_visibility="collapsed")
+    return [st.container() if label == selected else None for label in labels]
+
+def record_fragment_time(name, start):
+    """Keep a fragment's latest run time; fragment reruns bypass the page timer"""
+    st.session_state.setdefault("fragment_timings", {})[name] = time.perf_counter() - start
+
+def plot_figure(name, key, build, store=None):
+    """Plot the figure `build(lean)` returns, built once per `key` and chart mode.
+
+    The size and serialization time of its spec are measured when it is
+    built, cached with it and kept for the Performance panel. Figures of the
+    session's `ResultStore` are kept there instead, without a `key`, and
+    patched when its results change.
+    """
+    def compute():
+        fig = build(lean_charts)
+        return fig, figure_payload(fig)
+
+    if store is not None:
+        fig, payload = store.figure(name, build, lean_charts)
+    else:
+        fig, payload = FIGURES.get_or_compute(cache_key(name, key, lean_charts), compute)
+    st.session_state.setdefault("figure_payloads", {})[name] = payload
+    st.plotly_chart(fig, use_container_width=True)
 
 st.set_page_config(page_title="NL vs CH & Dubai Comparison", layout="wide")
 
+# Opt-in profile of this rerun, enabled from the Performance panel in the sidebar
+profiler = start_profile() if st.session_state.get("profile_rerun") else None
+
+# Fast startup renders only the open tab; opt-in from the Performance panel
+fast_startup = st.session_state.get("fast_startup", False)
+# Lean chart specs (WebGL traces, label templates) unless switched off there too
+lean_charts = not st.session_state.get("full_chart_payloads", False)
+if fast_startup:
+    for key in list(st.session_state.keys()):
+        if key.startswith(TAB_WIDGET_PREFIXES):
+            st.session_state[key] = st.session_state[key]
+
 st.title("Netherlands vs Switzerland (Zug) & Dubai Comparison")
 st.write("Compare income scenarios and lifestyle factors between locations")
 
+# Tax information in the sidebar, on every rerun whichever tab is open
+with st.sidebar:
+    st.header("Tax Information")
+    st.markdown("""
+    ### Netherlands (BV)
+    - Corporate tax: 19% (up to €200k), 25.8% (over €200k)
+    - Dividend tax (box 2): 24.5% up to €67,000, 33% above
+    - VAT (BTW): 21%
+    - Income tax: 36.97% (up to €75,518), 49.5% (above)
+    - Healthcare contribution: 6.69% up to €71,628
+    - Minimum director salary: €60,000
+
+    ### Dubai (Free Zone)
+    - Corporate tax: 0% up to AED 375,000, 9% above (as of 2023)
+    - No personal income tax
+    - No dividend tax
+    - VAT: 5%
+    - No social security for expats
+    - Minimum salary requirement: AED 238,800 (€60,000 equivalent)
+
+    ### Zug (AG)
+    - Corporate tax: 11.52% (Federal 8.5% + Cantonal 3.02%)
+    - No dividend tax for residents
+    - VAT (MwSt): 7.7%
+    - Income tax: progressive, up to ~20% marginal (federal + cantonal + municipal)
+    - Unemployment insurance (ALV) capped at CHF 148,200
+    - Minimum salary requirement: CHF 57,000 (€60,000 equivalent)
+    """)
+
 # Create main tabs
-tab_income, tab_factors = st.tabs(["💰 Income Scenarios", "🌟 Lifestyle Factors"])
+tab_income, tab_factors = section_tabs(["💰 Income Scenarios", "🌟 Lifestyle Factors"], key="tab_main")
 
-with tab_income:
-    # Add master inputs at the top
-    st.subheader("Master Income Parameters")
-    col1, col2 = st.columns(2)
+if tab_income is not None:
+    with tab_income:
+        # Add master inputs at the top, with the break-even rates next to them
+        master_col, breakeven_col = st.columns([3, 2])
+        with master_col:
+            st.subheader("Master Income Parameters")
+            col1, col2, col3 = st.columns(3)
     
-    with col1:
-        master_daily_rate = st.number_input(
-            "Daily Rate (EUR)",
-            min_value=200,
-            max_value=2000,
-            value=800,
-            step=50,
-            help="Base daily rate in EUR for all calculations"
-        )
+            with col1:
+                master_daily_rate = st.number_input(
+                    "Daily Rate (EUR)",
+                    min_value=200,
+                    max_value=2000,
+                    value=800,
+                    step=50,
+                    key="master_daily_rate",
+                    help="Base daily rate in EUR for all calculations"
+                )
         
-    with col2:
-        working_days = st.number_input(
-            "Working Days per Year",
-            min_value=100,
-            max_value=240,
-            value=220,
-            step=5,
-            help="Number of working days per year"
-        )
+            with col2:
+                working_days = st.number_input(
+                    "Working Days per Year",
+                    min_value=100,
+                    max_value=240,
+                    value=220,
+                    step=5,
+                    key="working_days",
+                    help="Number of working days per year"
+                )
 
-    # Calculate master annual income
-    master_annual_income = master_daily_rate * working_days
-    
-    # Display equivalent annual incomes in different currencies
-    st.write("### Equivalent Annual Income")
-    curr_col1, curr_col2, curr_col3 = st.columns(3)
-    with curr_col1:
-        st.metric("EUR", f"€{master_annual_income:,.0f}")
-    with curr_col2:
-        st.metric("CHF", f"CHF {master_annual_income * CURRENCY_RATES['EUR_TO_CHF']:,.0f}")
-    with curr_col3:
-        st.metric("AED", f"AED {master_annual_income * CURRENCY_RATES['EUR_TO_AED']:,.0f}")
-
-    # Define the scenarios with their respective tax rates
-    base_scenarios = [
-        # Netherlands scenarios
-        {
-            "scenario": "NL: Regular Salary",
-            "country": "NL",
-            "currency": "EUR",
-            "income_tax_rate": 0.3961,
-            "social_security_rate": 0.0669,
-            "needs_hourly": False,
-            "description": "Standard Dutch employment"
-        },
-        {
-            "scenario": "NL: BV Retention",
-            "country": "NL",
-            "currency": "EUR",
-            "income_tax_rate": 0.3961,
-            "corporate_tax_rate": 0.25,
-            "dividend_tax_rate": 0.25,
-            "social_security_rate": 0.0669,
-            "min_salary": 60000,
-            "needs_hourly": True,
-            "description": "Dutch BV with minimum salary and maximum retention"
-        },
-        # Dubai scenarios
-        {
-            "scenario": "Dubai: Regular Salary",
-            "country": "UAE",
-            "currency": "AED",
-            "income_tax_rate": 0.0,
-            "social_security_rate": 0.0,
-            "pension_rate": 0.0,
-            "needs_hourly": False,
-            "description": "UAE employment in Dubai"
-        },
-        {
-            "scenario": "Dubai: FZ Company",
-            "country": "UAE",
-            "currency": "AED",
-            "income_tax_rate": 0.0,
-            "social_security_rate": 0.0,
-            "pension_rate": 0.0,
-            "corporate_tax_rate": 0.09,
-            "dividend_tax_rate": 0.0,
-            "min_salary": 60000 * CURRENCY_RATES['EUR_TO_AED'],  # Convert EUR to AED
-            "needs_hourly": True,
-            "description": "Dubai Free Zone Company with minimum salary and maximum retention"
-        },
-        # Zug scenarios
-        {
-            "scenario": "Zug: Regular Salary",
-            "country": "CH-ZG",
-            "currency": "CHF",
-            "income_tax_rate": 0.05,
-            "social_security_rate": 0.0515,
-            "pension_rate": 0.0865,
-            "needs_hourly": False,
-            "description": "Swiss employment in Zug"
-        },
-        {
-            "scenario": "Zug: AG Retention",
-            "country": "CH-ZG",
-            "currency": "CHF",
-            "income_tax_rate": 0.05,
-            "social_security_rate": 0.0515,
-            "pension_rate": 0.0865,
-            "corporate_tax_rate": 0.1152,
-            "dividend_tax_rate": 0.0,
-            "min_salary": 60000 * CURRENCY_RATES['EUR_TO_CHF'],  # Convert EUR to CHF
-            "needs_hourly": True,
-            "description": "Swiss AG in Zug with minimum salary and maximum retention"
-        }
-    ]
+            with col3:
+                valuation_date = st.date_input(
+                    "Valuation Date",
+                    value=None,
+                    min_value=datetime.date(1999, 1, 4),
+                    max_value=datetime.date.today(),
+                    key="valuation_date",
+                    help="Convert at historical ECB reference rates as of this date; leave empty for current rates"
+                )
 
-    # Add tax information in the sidebar
-    with st.sidebar:
-        st.header("Tax Information")
-        st.markdown("""
-        ### Netherlands (BV)
-        - Corporate tax: 19% (up to €395k), 25.8% (over €395k)
-        - Dividend tax: 25%
-        - VAT (BTW): 21%
-        - Income tax: up to 49.5%
-        - Minimum director salary: €60,000
-        
-        ### Dubai (Free Zone)
-        - Corporate tax: 9% (as of 2023)
-        - No personal income tax
-        - No dividend tax
-        - VAT: 5%
-        - No social security for expats
-        - Minimum salary requirement: AED 238,800 (€60,000 equivalent)
-        
-        ### Zug (AG)
-        - Corporate tax: 11.52% (Federal 8.5% + Cantonal 3.02%)
-        - No dividend tax for residents
-        - VAT (MwSt): 7.7%
-        - Income tax: ~5% (combined)
-        - Minimum salary requirement: CHF 57,000 (€60,000 equivalent)
-        """)
+        with breakeven_col:
+            st.subheader("Break-even Daily Rates")
+            reference_cols = st.columns(2)
+            with reference_cols[0]:
+                breakeven_reference = st.selectbox(
+                    "Match",
+                    [s.name for s in BASE_SCENARIOS],
+                    key="breakeven_reference",
+                    help="Daily rate every scenario needs for the CoL-adjusted EUR net income of this one"
+                )
+            with reference_cols[1]:
+                breakeven_target = st.number_input(
+                    "Or a net income (€, CoL adjusted)",
+                    min_value=0,
+                    value=None,
+                    step=5000,
+                    placeholder="Same as Match",
+                    key="breakeven_target"
+                )
+            # Filled in by the income outputs, which know the committed expenses
+            breakeven_slot = st.empty()
 
-    # Create sections for expense inputs
-    st.subheader("Company Expenses")
-    expense_cols = st.columns(len(base_scenarios))
-    scenarios = []
-
-    # Initialize session state for storing values if not already initialized
-    if 'scenario_values' not in st.session_state:
-        st.session_state.scenario_values = {
-            idx: {
-                'company_expenses': 0
-            } for idx in range(len(base_scenarios))
-        }
+        # Historical rates are only loaded once a valuation date is picked
+        fx_rates = None
+        if valuation_date is not None:
+            from fx_history import load_history
+
+            try:
+                fx_rates = load_history().rates_on(valuation_date)
+            except ValueError as exc:
+                st.warning(f"{exc}, using current rates instead.")
 
-    for idx, (col, base_scenario) in enumerate(zip(expense_cols, base_scenarios)):
-        with col:
-            st.markdown(f"**{base_scenario['scenario']}**")
-            st.caption(base_scenario['description'])
-            
-            # Convert master annual income to scenario currency
-            if base_scenario['currency'] == 'EUR':
-                gross_income = master_annual_income
-                currency_symbol = '€'
-            elif base_scenario['currency'] == 'CHF':
-                gross_income = master_annual_income * CURRENCY_RATES['EUR_TO_CHF']
-                currency_symbol = 'CHF'
-            else:  # AED
-                gross_income = master_annual_income * CURRENCY_RATES['EUR_TO_AED']
-                currency_symbol = 'AED'
-
-            company_expenses = st.number_input(
-                f"Additional Expenses ({currency_symbol})",
-                min_value=0,
-                max_value=int(gross_income * 0.5),  # Max 50% of gross income
-                value=st.session_state.scenario_values[idx]['company_expenses'],
-                step=1000,
-                key=f"expense_{idx}"
+        # Cost of living indices from the price basket for the household below,
+        # or the reference indices of the jurisdictions file
+        cost_of_living = None
+        with st.expander("Cost of Living Basket"):
+            use_basket = st.checkbox(
+                "Index from price basket",
+                value=False,
+                key="col_basket",
+                help="Price the household's basket of rent, groceries, schooling, insurance and transport "
+                     "in every location instead of using the reference indices"
             )
-            
-            # Update session state
-            st.session_state.scenario_values[idx]['company_expenses'] = company_expenses
-            
-            # Create complete scenario with all parameters
-            scenario = base_scenario.copy()
-            scenario["gross_income"] = gross_income
-            scenario["company_expenses"] = company_expenses
-            scenarios.append(scenario)
-
-    # Calculate net retention and its percentage for each scenario
-    results = []
-    for scenario in scenarios:
-        scenario_type = scenario["scenario"]
-        gross_income = scenario["gross_income"]
-        company_expenses = scenario["company_expenses"]
-        currency = scenario["currency"]
-        country = scenario["country"]
-        
-        # Initialize tax components
-        personal_tax = 0
-        corporate_tax = 0
-        dividend_tax = 0
-        social_security = 0
-        pension = 0
-        
-        if "Self-employed" in scenario_type:
-            # Apply deductions before tax
-            if "NL" in scenario_type:
-                taxable_income = gross_income - scenario["self_employment_deduction"] - company_expenses
-            else:
-                taxable_income = gross_income - company_expenses
-                
-            personal_tax = taxable_income * scenario["income_tax_rate"]
-            social_security = taxable_income * scenario.get("social_security_rate", 0)
-            net_income = taxable_income - personal_tax - social_security
-        
-        elif "AG" in scenario_type or "BV" in scenario_type:
-            # Use minimum salary for all BV/AG scenarios
-            salary = scenario["min_salary"]
-            personal_tax = salary * scenario["income_tax_rate"]
-            social_security = salary * scenario.get("social_security_rate", 0)
-            pension = salary * scenario.get("pension_rate", 0)
-            
-            # Calculate corporate portion (everything above minimum salary)
-            corporate_income = gross_income - salary - company_expenses
-            if corporate_income > 0:
-                corporate_tax = corporate_income * scenario["corporate_tax_rate"]
-                # No immediate dividend distribution, keep as retained earnings
-                retained_earnings = corporate_income - corporate_tax
-                net_income = (salary - personal_tax - social_security - pension) + retained_earnings
+            household_cols = st.columns(3)
+            with household_cols[0]:
+                bedrooms = st.selectbox("Bedrooms", [1, 2, 3], index=1, key="col_bedrooms")
+            with household_cols[1]:
+                adults = st.number_input("Adults", min_value=1, max_value=6, value=1, step=1, key="col_adults")
+            with household_cols[2]:
+                children = st.number_input("Children", min_value=0, max_value=6, value=0, step=1, key="col_children")
+
+            # The basket loads on first use; partial sums per
+            # category are aggregated once per process and a household only
+            # re-weights them
+            if use_basket:
+                import pandas as pd
+                from basket import CATEGORIES, household_weights, load_basket
+
+                col_basket = load_basket()
+                household = household_weights(bedrooms, adults, children)
+                cost_of_living = col_basket.index(household, fx_rates)
+                monthly_cost = dict(zip(col_basket.locations, col_basket.monthly_cost(household, fx_rates)))
+                shown_locations = [
+                    loc for loc in dict.fromkeys(s.location for s in BASE_SCENARIOS) if loc.code in cost_of_living
+                ]
+                st.table(pd.DataFrame({
+                    "Location": [loc.name for loc in shown_locations],
+                    "Reference Index": [f"{loc.cost_of_living:.0f}" for loc in shown_locations],
+                    "Basket Index": [f"{cost_of_living[loc.code]:.0f}" for loc in shown_locations],
+                    "Monthly Basket": [f"€{monthly_cost[loc.code]:,.0f}" for loc in shown_locations],
+                }).set_index("Location"))
+                st.caption(
+                    "Categories: " + ", ".join(CATEGORIES.values()) + ". Rent is for the chosen number of bedrooms. "
+                    "Each item has one approximate 2024 reference price per location, not survey data, "
+                    "so the basket index is illustrative."
+                )
             else:
-                net_income = salary - personal_tax - social_security - pension
-        
-        else:
-            # Regular salary scenarios
-            taxable_income = gross_income - company_expenses
-            personal_tax = taxable_income * scenario["income_tax_rate"]
-            social_security = taxable_income * scenario.get("social_security_rate", 0)
-            pension = taxable_income * scenario.get("pension_rate", 0)
-            net_income = taxable_income - personal_tax - social_security - pension
-        
-        # After calculating net_income, add cost of living adjustment
-        net_income_adjusted = adjust_for_cost_of_living(net_income, country)
-        
-        # Store results with tax breakdown
-        results.append({
-            "Scenario": scenario_type,
-            "Country": country,
-            "Currency": currency,
-            "Gross Income": gross_income,
-            "Company Expenses": company_expenses,
-            "Net Income": net_income,
-            "Net Income (CoL Adjusted)": net_income_adjusted,
-            "Personal Tax": personal_tax,
-            "Corporate Tax": corporate_tax,
-            "Dividend Tax": dividend_tax,
-            "Social Security": social_security,
-            "Pension": pension,
-            "Retention %": (net_income / gross_income) * 100,
-            "Cost of Living Index": COST_OF_LIVING[country]
-        })
-
-    # Convert results to DataFrame
-    df = pd.DataFrame(results)
-
-    # Create EUR version for charts
-    df_eur = df.copy()
-    currency_cols = ["Gross Income", "Company Expenses", "Net Income", "Net Income (CoL Adjusted)",
-                    "Personal Tax", "Corporate Tax", "Dividend Tax", "Social Security", "Pension"]
-
-    # Convert all monetary values to EUR for the chart DataFrame
-    for col in currency_cols:
-        df_eur[col] = df_eur.apply(lambda x: convert_to_eur(x[col], x['Currency']), axis=1)
-
-    # Create two columns for displaying results
-    col1, col2 = st.columns([2, 3])
-
-    with col1:
-        st.subheader("Results Table")
-        display_df = df.copy()
-        currency_cols = ["Gross Income", "Company Expenses", "Net Income", "Net Income (CoL Adjusted)",
-                        "Personal Tax", "Corporate Tax", "Dividend Tax", "Social Security", "Pension"]
-        
-        # Update currency formatting
-        for col in currency_cols:
-            display_df[col] = display_df.apply(
-                lambda x: format_currency(x[col], x['Currency']), 
-                axis=1
-            )
-        display_df["Retention %"] = display_df["Retention %"].apply(lambda x: f"{x:.1f}%")
-        display_df["Cost of Living Index"] = display_df["Cost of Living Index"].apply(lambda x: f"{x:.0f}")
-        
-        # Create simplified view
-        simple_df = display_df[["Scenario", "Net Income", "Net Income (CoL Adjusted)", "Cost of Living Index", "Retention %"]]
-        st.table(simple_df)
-        
-        with st.expander("Show Full Breakdown"):
-            display_cols = [col for col in display_df.columns if col not in ['Country', 'Currency']]
-            st.table(display_df[display_cols])
+                st.caption("Using the reference indices: " + ", ".join(
+                    f"{loc.name} {loc.cost_of_living:.0f}" for loc in dict.fromkeys(s.location for s in BASE_SCENARIOS)
+                ) + ".")
+        timer.lap("Cost of living")
 
-    with col2:
-        # Create tabs for different visualizations
-        tab1, tab2 = st.tabs(["Income Breakdown", "Net Income Comparison"])
-        
-        with tab1:
-            st.subheader("Full Income Breakdown (in EUR)")
-            # Create stacked bar chart using plotly
-            fig1 = go.Figure()
-            
-            # Add bars for each component using df_eur
-            components = [
-                ("Net Income", "rgb(53, 167, 137)"),
-                ("Personal Tax", "rgb(251, 133, 0)"),
-                ("Corporate Tax", "rgb(255, 65, 54)"),
-                ("Dividend Tax", "rgb(128, 0, 128)"),
-                ("Social Security", "rgb(55, 83, 109)"),
-                ("Pension", "rgb(0, 128, 128)"),
-                ("Company Expenses", "rgb(169, 169, 169)")
-            ]
-            
-            for component, color in components:
-                fig1.add_trace(go.Bar(
-                    name=component,
-                    x=df_eur["Scenario"],
-                    y=df_eur[component],  # Use df_eur for EUR values
-                    marker_color=color,
-                    text=df_eur[component].apply(lambda x: f"€{x:,.0f}"),
-                    textposition="inside"
-                ))
-            
-            fig1.update_layout(
-                barmode='stack',
-                height=600,
-                yaxis_title="Amount in EUR",
-                xaxis_title="Scenario",
-                legend_title="Components",
-                font=dict(size=12),
-                xaxis_tickangle=-75,
-                margin=dict(b=150)
+        # Calculate master annual income
+        master_annual_income = master_daily_rate * working_days
+    
+        # Display equivalent annual incomes in different currencies
+        st.write("### Equivalent Annual Income")
+        display_currencies = list(dict.fromkeys(s.currency for s in BASE_SCENARIOS))
+        equivalents = CURRENCIES.convert(master_annual_income, "EUR", display_currencies, fx_rates)
+        for curr_col, code, amount in zip(st.columns(len(display_currencies)), display_currencies, equivalents):
+            with curr_col:
+                st.metric(code, format_currency(amount, code))
+        if fx_rates is not None:
+            st.caption(f"At ECB reference rates as of {valuation_date:%d %b %Y}")
+
+        base_scenarios = BASE_SCENARIOS
+
+        # Expenses, results and charts rerun on their own when one of their inputs
+        # changes; the master inputs above trigger a full rerun
+        @st.fragment
+        def income_outputs(master_daily_rate, working_days, master_annual_income, fx_rates, cost_of_living,
+                           breakeven):
+            fragment_start = time.perf_counter()
+            # Create sections for expense inputs
+            st.subheader("Company Expenses")
+            # Convert master annual income to every scenario's currency
+            gross_income = master_annual_income * with_fx_rates(SCENARIO_TABLE, fx_rates)["fx_rate"]
+            expense_limits = np.floor(gross_income * 0.5)  # Max 50% of gross income
+
+            # Committed inputs per scenario; the editor below only changes them on submit
+            if 'scenario_values' not in st.session_state:
+                st.session_state.scenario_values = {
+                    s.name: {'company_expenses': 0} for s in base_scenarios
+                }
+            scenario_values = st.session_state.scenario_values
+
+            location_names = list(dict.fromkeys(s.location.name for s in base_scenarios))
+            shown_locations = st.multiselect(
+                "Locations",
+                location_names,
+                placeholder="All locations",
+                key="expense_locations",
+                help="Only list these locations below; the others keep their expenses"
             )
-            
-            st.plotly_chart(fig1, use_container_width=True)
-        
-        with tab2:
-            st.subheader("Net Income & Cost of Living Comparison (in EUR)")
-            fig2 = go.Figure()
-            
-            # Add nominal net income bars
-            fig2.add_trace(go.Bar(
-                name="Net Income",
-                x=df_eur["Scenario"],
-                y=df_eur["Net Income"],
-                marker_color="rgb(53, 167, 137)",
-                text=df_eur["Net Income"].apply(lambda x: f"€{x:,.0f}"),
-                textposition="inside"
-            ))
-            
-            # Add CoL adjusted net income line
-            fig2.add_trace(go.Scatter(
-                name="Net Income (CoL Adjusted)",
-                x=df_eur["Scenario"],
-                y=df_eur["Net Income (CoL Adjusted)"],
-                line=dict(color="rgb(255, 165, 0)", width=3),  # Orange line
-                mode="lines+markers+text",
-                text=df_eur["Net Income (CoL Adjusted)"].apply(lambda x: f"€{x:,.0f}"),
-                textposition="top center"
-            ))
-            
-            # Add retention percentage line
-            fig2.add_trace(go.Scatter(
-                name="Retention %",
-                x=df_eur["Scenario"],
-                y=df_eur["Retention %"],
-                yaxis="y2",
-                line=dict(color="rgb(255, 65, 54)", width=3),
-                mode="lines+markers+text",
-                text=df_eur["Retention %"].apply(lambda x: f"{x:.1f}%"),
-                textposition="top center"
-            ))
-            
-            fig2.update_layout(
-                height=600,
-                yaxis=dict(
-                    title="Amount in EUR",
-                    tickfont=dict(color="rgb(53, 167, 137)")
-                ),
-                yaxis2=dict(
-                    title="Retention %",
-                    tickfont=dict(color="rgb(255, 65, 54)"),
-                    overlaying="y",
-                    side="right",
-                    range=[0, 100]
-                ),
-                xaxis_title="Scenario",
-                legend_title="Metrics",
-                font=dict(size=12),
-                xaxis_tickangle=-75,
-                margin=dict(b=150),
-                showlegend=True
+            shown = [
+                idx for idx, s in enumerate(base_scenarios)
+                if not shown_locations or s.location.name in shown_locations
+            ]
+
+            timer.lap("Inputs")
+            timer.milestone("First paint")
+
+            # One editable grid in a form, so a batch of edits is a single rerun.
+            # Pending edits are kept by row position, so each location filter
+            # gets its own editor and they cannot land on another scenario.
+            import pandas as pd
+
+            with st.form("scenario_inputs"):
+                edited = st.data_editor(
+                    pd.DataFrame({
+                        "Scenario": [base_scenarios[idx].name for idx in shown],
+                        "Description": [base_scenarios[idx].description for idx in shown],
+                        "Currency": [base_scenarios[idx].currency for idx in shown],
+                        "Additional Expenses": [
+                            scenario_values[base_scenarios[idx].name]['company_expenses'] for idx in shown
+                        ],
+                    }),
+                    column_config={
+                        "Additional Expenses": st.column_config.NumberColumn(
+                            min_value=0,
+                            step=1000,
+                            format="%d",
+                            help="Company expenses in the scenario's currency, at most 50% of gross income"
+                        ),
+                    },
+                    disabled=["Scenario", "Description", "Currency"],
+                    hide_index=True,
+                    use_container_width=True,
+                    key="scenario_editor_" + "_".join(map(str, shown))
+                )
+                submitted = st.form_submit_button("Apply expenses")
+
+            if submitted:
+                expenses = edited["Additional Expenses"].fillna(0).to_numpy(dtype=np.float64)
+                expenses = np.clip(expenses, 0, expense_limits[shown])
+                st.session_state.scenario_values = scenario_values = {
+                    **scenario_values,
+                    **{
+                        base_scenarios[idx].name: {'company_expenses': int(value)}
+                        for idx, value in zip(shown, expenses)
+                    },
+                }
+            company_expenses = tuple(
+                int(min(scenario_values[s.name]['company_expenses'], limit))
+                for s, limit in zip(base_scenarios, expense_limits)
             )
-            
-            st.plotly_chart(fig2, use_container_width=True)
-
-            # Add explanatory note about cost of living adjustment
-            st.markdown("""
-            ### Notes:
-            - Cost of Living Index: Netherlands = 100 (base)
-            - Dubai: 85 (15% cheaper than NL)
-            - Zug: 145 (45% more expensive than NL)
-            - Adjusted values show the equivalent purchasing power in Netherlands
-            - All chart values are in EUR
-            - Table values are in local currencies
-            """)
-
-    # Add explanatory notes
-    st.markdown("""
-    ### Notes:
-    - All chart values are converted to EUR for easy comparison
-    - Table values remain in local currencies (EUR, CHF, AED)
-    - Tax rates based on 2023/2024 rates
-    - Netherlands (NL):
-      - BV scenarios assume minimum salary of €60,000
-      - Corporate tax: 19% up to €395k, 25.8% above
-      - Dividend tax: 25%
-
-    - Dubai (UAE):
-      - No personal income tax
-      - 9% corporate tax (as of 2023)
-      - Minimum salary requirement in AED
-      - No social security for expats
-
-    - Zug (CH):
-      - Personal tax ~5%
-      - Combined federal (8.5%) and cantonal (3.02%) corporate tax
-      - Minimum salary requirement in CHF
-    """)
+            timer.lap("Expense editor")
 
-    # Add social security benefits section after the charts
-    st.header("Social Security Benefits by Location")
-    st.write("Compare social security contributions and benefits across locations")
+            # The session's results only re-evaluate the scenarios whose inputs changed,
+            # or copy every row from the shared cache when another session had these
+            # inputs; its two figures are patched in place. Derived results (salary
+            # split, safety net) are shared across sessions under the normalized inputs
+            results_key = cache_key(master_daily_rate, working_days, company_expenses, fx_rates, cost_of_living)
+            if "result_store" not in st.session_state:
+                st.session_state.result_store = ResultStore(base_scenarios, SCENARIO_TABLE, cache=RESULTS)
+            result_store = st.session_state.result_store
+            result_store.update(gross_income, company_expenses, fx_rates, cost_of_living)
+            df_eur, display_df = result_store.df_eur, result_store.display_df
+            timer.lap("Calculation")
 
-    # Create tabs for each location
-    nl_tab, dubai_tab, zug_tab = st.tabs(["🇳🇱 Netherlands", "🇦🇪 Dubai", "🇨🇭 Zug"])
+            # Daily rates matching the reference's CoL-adjusted net income, solved exactly
+            breakeven_reference, breakeven_target, breakeven_slot = breakeven
+            reference = df_eur["Scenario"].tolist().index(breakeven_reference)
+            target = breakeven_target
+            if target is None:
+                target = df_eur["Net Income (CoL Adjusted)"].iloc[reference]
+            required_rates = required_daily_rate(
+                target, working_days, company_expenses, scenario_table(fx_rates, cost_of_living)
+            )[:, 0]
+            with breakeven_slot.container():
+                st.table(pd.DataFrame({
+                    "Scenario": df_eur["Scenario"],
+                    "Daily Rate": [f"€{rate:,.0f}" if np.isfinite(rate) else "Not reachable" for rate in required_rates],
+                    "vs. Current": [
+                        f"{round(rate - master_daily_rate):+,d}" if np.isfinite(rate) else "" for rate in required_rates
+                    ],
+                }).set_index("Scenario"))
+                st.caption(f"For €{target:,.0f} CoL-adjusted net a year over {working_days} working days")
+            timer.lap("Break-even")
 
-    def format_benefit_section(location_data):
-        st.write(f"**Overall Rate:** {location_data['rate']}")
-        
-        # Unemployment Benefits
-        st.subheader("🏢 Unemployment Protection")
-        cols = st.columns([1, 2])
-        with cols[0]:
-            st.write("Contribution:")
-            st.write("Benefit:")
-            st.write("Conditions:")
-        with cols[1]:
-            st.write(f"{location_data['unemployment']['contribution']}")
-            st.write(f"{location_data['unemployment']['benefit']}")
-            st.write(f"{location_data['unemployment']['conditions']}")
-        
-        # Disability Benefits
-        st.subheader("🏥 Disability Coverage")
-        cols = st.columns([1, 2])
-        with cols[0]:
-            st.write("Contribution:")
-            st.write("Benefit:")
-            st.write("Conditions:")
-        with cols[1]:
-            st.write(f"{location_data['disability']['contribution']}")
-            st.write(f"{location_data['disability']['benefit']}")
-            st.write(f"{location_data['disability']['conditions']}")
-        
-        # Healthcare
-        st.subheader("⚕️ Healthcare System")
-        cols = st.columns([1, 2])
-        with cols[0]:
-            st.write("Contribution:")
-            st.write("Benefit:")
-            st.write("Conditions:")
-        with cols[1]:
-            st.write(f"{location_data['healthcare']['contribution']}")
-            st.write(f"{location_data['healthcare']['benefit']}")
-            st.write(f"{location_data['healthcare']['conditions']}")
+            # Create two columns for displaying results
+            col1, col2 = st.columns([2, 3])
+
+            with col1:
+                st.subheader("Results Table")
+                # Create simplified view
+                simple_df = display_df[["Scenario", "Net Income", "Net Income (CoL Adjusted)", "Cost of Living Index", "Retention %"]]
+                st.table(simple_df)
         
-        # Pension
-        st.subheader("👴 Pension System")
-        cols = st.columns([1, 2])
-        with cols[0]:
-            st.write("Contribution:")
-            st.write("Benefit:")
-            st.write("Conditions:")
-        with cols[1]:
-            st.write(f"{location_data['pension']['contribution']}")
-            st.write(f"{location_data['pension']['benefit']}")
-            st.write(f"{location_data['pension']['conditions']}")
-
-    with nl_tab:
-        st.subheader("Netherlands Social Security System")
-        st.write("""
-        The Dutch social security system is comprehensive and provides extensive coverage.
-        It's based on residency and employment, with both employers and employees contributing.
-        """)
-        format_benefit_section(SOCIAL_SECURITY_BENEFITS["NL"])
+                with st.expander("Show Full Breakdown"):
+                    display_cols = [col for col in display_df.columns if col not in ['Country', 'Currency']]
+                    st.table(display_df[display_cols])
+            timer.lap("Results table")
+
+            with col2:
+                # Create tabs for different visualizations
+                tab1, tab2, tab3, tab4, tab5, tab6 = section_tabs(
+                    [
+                        "Income Breakdown", "Net Income Comparison", "Rate × Days Sweep", "Uncertainty",
+                        "Salary Split", "Safety Net",
+                    ],
+                    key="tab_charts"
+                )
         
-    with dubai_tab:
-        st.subheader("Dubai Social Security System")
-        st.write("""
-        Dubai's system for expats is primarily private insurance-based with minimal state benefits.
-        Employers are required to provide certain basic coverages and end-of-service benefits.
-        """)
-        format_benefit_section(SOCIAL_SECURITY_BENEFITS["UAE"])
+                if tab1 is not None:
+                    with tab1:
+                        st.subheader("Full Income Breakdown (in EUR)")
+                        plot_figure(
+                            "Income breakdown",
+                            None,
+                            lambda lean: income_breakdown_figure(df_eur, lean),
+                            result_store
+                        )
+                        timer.lap("Income breakdown chart")
         
-    with zug_tab:
-        st.subheader("Zug Social Security System")
-        st.write("""
-        The Swiss social security system is well-structured and provides good coverage,
-        though with higher out-of-pocket costs than the Netherlands. It combines state and
-        private elements.
+                if tab2 is not None:
+                    with tab2:
+                        st.subheader("Net Income & Cost of Living Comparison (in EUR)")
+                        plot_figure(
+                            "Net income",
+                            None,
+                            lambda lean: net_income_figure(df_eur, lean),
+                            result_store
+                        )
+
+                        # Add explanatory note about cost of living adjustment, with the indices in use
+                        location_indices = dict(zip(df_eur["Country"], df_eur["Cost of Living Index"]))
+                        st.markdown("\n".join(
+                            ["### Notes:", "- Cost of Living Index: Netherlands = 100 (base)"]
+                            + [
+                                f"- {JURISDICTIONS.locations[code].name}: {index:.0f} "
+                                f"({abs(index - 100):.0f}% {'cheaper' if index < 100 else 'more expensive'} than NL)"
+                                for code, index in location_indices.items() if code != "NL"
+                            ]
+                            + [
+                                "- Adjusted values show the equivalent purchasing power in Netherlands",
+                                "- All chart values are in EUR",
+                                "- Table values are in local currencies",
+                            ]
+                        ))
+                        timer.lap("Net income chart")
+
+                if tab3 is not None:
+                    with tab3:
+                        st.subheader("Daily Rate × Working Days Sensitivity (in EUR)")
+                        sweep_cols = st.columns(3)
+                        with sweep_cols[0]:
+                            sweep_metric = st.selectbox(
+                                "Metric",
+                                list(SWEEP_METRICS.keys()),
+                                key="sweep_metric"
+                            )
+                        with sweep_cols[1]:
+                            sweep_scenario = st.selectbox(
+                                "Scenario",
+                                df_eur["Scenario"].tolist(),
+                                key="sweep_scenario"
+                            )
+                        with sweep_cols[2]:
+                            fine_sweep = st.checkbox(
+                                "1 EUR / 1 day resolution",
+                                value=False,
+                                key="sweep_fine",
+                                help="Default grid steps are 50 EUR and 5 days"
+                            )
+
+                        rate_step, days_step = (1, 1) if fine_sweep else (50, 5)
+                        sweep_rates, sweep_days = grid_axes(rate_step, days_step)
+                        surface = cached_sweep(
+                            rate_step,
+                            days_step,
+                            company_expenses,
+                            fx_rates,
+                            cost_of_living
+                        )[SWEEP_METRICS[sweep_metric]]
+                        scenario_names = df_eur["Scenario"].tolist()
+
+                        sweep_key = (rate_step, days_step, company_expenses, fx_rates, cost_of_living, sweep_metric)
+                        plot_figure(
+                            "Rate × days sweep",
+                            (sweep_key, sweep_scenario, master_daily_rate, working_days),
+                            lambda lean: sweep_heatmap_figure(
+                                sweep_rates,
+                                sweep_days,
+                                surface[scenario_names.index(sweep_scenario)],
+                                sweep_metric,
+                                (master_daily_rate, working_days),
+                                lean
+                            )
+                        )
+
+                        # Crossover between two scenarios: positive where the first one wins
+                        st.write("#### Crossover")
+                        pair_cols = st.columns(2)
+                        with pair_cols[0]:
+                            first_scenario = st.selectbox(
+                                "Scenario",
+                                scenario_names,
+                                index=scenario_names.index("Zug: AG Retention"),
+                                key="crossover_first"
+                            )
+                        with pair_cols[1]:
+                            second_scenario = st.selectbox(
+                                "beats",
+                                scenario_names,
+                                index=scenario_names.index("NL: BV Retention"),
+                                key="crossover_second"
+                            )
+                        margin = crossover(
+                            surface,
+                            scenario_names.index(first_scenario),
+                            scenario_names.index(second_scenario)
+                        )
+
+                        plot_figure(
+                            "Crossover",
+                            (sweep_key, first_scenario, second_scenario),
+                            lambda lean: crossover_figure(sweep_rates, sweep_days, margin, lean)
+                        )
+                        st.caption(
+                            f"{first_scenario} beats {second_scenario} on "
+                            f"{(margin > 0).mean() * 100:.0f}% of the grid (blue); the black line marks the crossover."
+                        )
+                        timer.lap("Rate × days sweep")
+
+                if tab4 is not None:
+                    with tab4:
+                        st.subheader("FX & Cost of Living Uncertainty (in EUR)")
+                        simulate_enabled = st.checkbox(
+                            "Simulation mode",
+                            value=False,
+                            key="mc_enabled",
+                            help="Draw correlated FX rates, cost of living shocks and working days around the point estimates"
+                        )
+                        if simulate_enabled:
+                            mc_cols = st.columns(3)
+                            with mc_cols[0]:
+                                chf_vol = st.slider("EUR/CHF volatility (%)", 0.0, 20.0, 6.0, 0.5, key="mc_chf_vol")
+                                aed_vol = st.slider("EUR/AED volatility (%)", 0.0, 20.0, 8.0, 0.5, key="mc_aed_vol")
+                            with mc_cols[1]:
+                                fx_correlation = st.slider("FX correlation", -1.0, 1.0, 0.3, 0.05, key="mc_fx_corr")
+                                col_vol = st.slider("Cost of living volatility (%)", 0.0, 20.0, 5.0, 0.5, key="mc_col_vol")
+                            with mc_cols[2]:
+                                days_sd = st.slider("Working days std. dev.", 0, 30, 0, 1, key="mc_days_sd")
+                                draws = st.selectbox("Draws", [100_000, 1_000_000], index=1, format_func="{:,}".format, key="mc_draws")
+                                seed = st.number_input("Seed", min_value=0, value=0, step=1, key="mc_seed")
+
+                            simulation_inputs = (
+                                master_daily_rate,
+                                working_days,
+                                company_expenses,
+                                draws,
+                                seed,
+                                (chf_vol / 100, aed_vol / 100, fx_correlation, col_vol / 100, days_sd),
+                                fx_rates,
+                                cost_of_living
+                            )
+                            try:
+                                bands = cached_simulation(*simulation_inputs)
+                            except ValueError as error:
+                                st.warning(str(error))
+                            else:
+                                plot_figure("Uncertainty bands", simulation_inputs, lambda lean: percentile_band_figure(bands))
+                                st.table(bands.set_index("Scenario").apply(lambda col: col.map("€{:,.0f}".format)))
+                                st.caption(
+                                    "Boxes span the 25th-75th percentile of CoL-adjusted net income, whiskers the "
+                                    "5th-95th; the line marks the median."
+                                )
+                        timer.lap("Uncertainty")
+
+                if tab5 is not None:
+                    with tab5:
+                        st.subheader("Salary & Dividend Split")
+                        split_objective = st.radio(
+                            "Maximize",
+                            list(OBJECTIVES),
+                            format_func=OBJECTIVES.get,
+                            horizontal=True,
+                            key="split_objective",
+                            help="Lifetime value counts pension contributions and retained earnings after the "
+                                 "dividend tax due when paid out later; net income is the results table's measure"
+                        )
+                        splits = RESULTS.get_or_compute(
+                            ("split", results_key, split_objective),
+                            lambda: optimize_splits(
+                                gross_income, company_expenses, scenario_table(fx_rates, cost_of_living), split_objective
+                            )
+                        )
+                        currencies = [base_scenarios[idx].currency for idx in splits["scenario"]]
+                        st.table(pd.DataFrame({
+                            "Scenario": [base_scenarios[idx].name for idx in splits["scenario"]],
+                            "Salary": [format_currency(v, c) for v, c in zip(splits["salary"], currencies)],
+                            "Dividend Now": [format_currency(v, c) for v, c in zip(splits["dividend"], currencies)],
+                            "Retained": [format_currency(v, c) for v, c in zip(splits["retained"], currencies)],
+                            "Value": [f"€{v:,.0f}" for v in splits["value"]],
+                            "vs. Minimum Salary": [
+                                f"{round(v):+,d}" for v in splits["value"] - splits["baseline"]
+                            ],
+                        }).set_index("Scenario"))
+                        st.caption(
+                            "Best salary, at least the minimum salary, and dividend paid out of the profit after "
+                            "corporate tax; the rest is retained. Solved exactly at the tax bracket kinks and "
+                            "compared with the minimum salary and no payout."
+                        )
+                        timer.lap("Salary split")
+
+                if tab6 is not None:
+                    with tab6:
+                        st.subheader("Safety Net Value (in EUR)")
+                        assumptions = load_safety_nets().assumptions
+                        safety_cols = st.columns(3)
+                        with safety_cols[0]:
+                            job_loss_rate = st.slider(
+                                "Job loss rate (% per year)", 0.0, 20.0, assumptions["job_loss_rate"] * 100, 0.5,
+                                key="safety_job_loss"
+                            )
+                            unemployment_months = st.slider(
+                                "Average months out of work", 1, 36, int(assumptions["unemployment_months"]),
+                                key="safety_unemployment_months"
+                            )
+                        with safety_cols[1]:
+                            disability_rate = st.slider(
+                                "Disability rate (% per year)", 0.0, 2.0, assumptions["disability_rate"] * 100, 0.1,
+                                key="safety_disability"
+                            )
+                            discount_rate = st.slider(
+                                "Real discount rate (%)", 0.0, 6.0, assumptions["discount_rate"] * 100, 0.5,
+                                key="safety_discount"
+                            )
+                        with safety_cols[2]:
+                            career_years = st.slider(
+                                "Career years", 5, 45, int(assumptions["career_years"]), key="safety_career_years"
+                            )
+                            lives = st.selectbox(
+                                "Simulated lives", [1_000, 10_000, 100_000], index=1, format_func="{:,}".format,
+                                key="safety_lives"
+                            )
+                        assumptions = {
+                            **assumptions,
+                            "job_loss_rate": job_loss_rate / 100,
+                            "unemployment_months": float(unemployment_months),
+                            "disability_rate": disability_rate / 100,
+                            "discount_rate": discount_rate / 100,
+                            "career_years": float(career_years),
+                        }
+                        safety_net = RESULTS.get_or_compute(
+                            ("safety_net", results_key, cache_key(assumptions), lives),
+                            lambda: value_safety_nets(
+                                gross_income, company_expenses, scenario_table(fx_rates, cost_of_living),
+                                simulate_careers(lives, assumptions), assumptions
+                            )
+                        )
+
+                        def euros(values):
+                            return [f"€{v:,.0f}" if np.isfinite(v) else "Not modelled" for v in values]
+
+                        st.table(pd.DataFrame({
+                            "Scenario": [s.name for s in base_scenarios],
+                            **{label: euros(safety_net[key]) for key, label in BENEFITS.items()},
+                            "Contributions": euros(safety_net["contributions"]),
+                            "Net Value": euros(safety_net["net"]),
+                        }).set_index("Scenario"))
+                        st.caption(
+                            "Present value per career of the benefits each system pays, averaged over simulated "
+                            "lives with spells out of work and permanent disability, against the social security "
+                            "and pension contributions of the results table over the months in work. Company "
+                            "owners are not insured against unemployment in NL or Switzerland; healthcare is left out."
+                        )
+                        timer.lap("Safety net")
+            record_fragment_time("Income outputs", fragment_start)
+
+        income_outputs(
+            master_daily_rate, working_days, master_annual_income, fx_rates, cost_of_living,
+            (breakeven_reference, breakeven_target, breakeven_slot)
+        )
+
+        # Add explanatory notes
+        st.markdown("""
+        ### Notes:
+        - All chart values are converted to EUR for easy comparison
+        - Table values remain in local currencies (EUR, CHF, AED)
+        - Tax rates based on 2023/2024 rates
+        - Netherlands (NL):
+          - BV scenarios assume minimum salary of €60,000
+          - Corporate tax: 19% up to €200k, 25.8% above
+          - Income tax: 36.97% up to €75,518, 49.5% above
+          - Dividend tax (box 2): 24.5% up to €67,000, 33% above
+
+        - Dubai (UAE):
+          - No personal income tax
+          - 9% corporate tax above AED 375,000 (as of 2023)
+          - Minimum salary requirement in AED
+          - No social security for expats
+
+        - Zug (CH):
+          - Progressive personal tax, up to ~20% marginal
+          - Combined federal (8.5%) and cantonal (3.02%) corporate tax
+          - Minimum salary requirement in CHF
         """)
-        format_benefit_section(SOCIAL_SECURITY_BENEFITS["CH-ZG"])
-
-    # Add summary comparison
-    st.subheader("Quick Comparison")
-    comparison_df = pd.DataFrame({
-        "Location": ["Netherlands", "Dubai", "Zug"],
-        "Social Security Rate": [
-            SOCIAL_SECURITY_BENEFITS["NL"]["rate"],
-            SOCIAL_SECURITY_BENEFITS["UAE"]["rate"],
-            SOCIAL_SECURITY_BENEFITS["CH-ZG"]["rate"]
-        ],
-        "Unemployment Max": [
-            "24 months, 70-75%",
-            "None (end of service only)",
-            "18 months, 70-80%"
-        ],
-        "Healthcare System": [
-            "Universal + Private",
-            "Private Only",
-            "Universal + Private"
-        ],
-        "State Pension": [
-            "€1,300/month",
-            "End of service gratuity",
-            "Up to CHF 2,390/month"
-        ]
-    })
+        timer.lap("Notes")
 
-    st.table(comparison_df)
+        # Add social security benefits section after the charts
+        st.header("Social Security Benefits by Location")
+        st.write("Compare social security contributions and benefits across locations")
 
-    st.markdown("""
-    ### Additional Notes:
-    - **Netherlands**: Most comprehensive system with highest contributions but also highest benefits
-    - **Dubai**: Lowest contributions but relies heavily on private insurance and company benefits
-    - **Zug**: Balance between contributions and benefits, with high-quality healthcare but higher out-of-pocket costs
-
-    ### Important Considerations:
-    1. **Netherlands**:
-       - Most secure system for unemployment and disability
-       - Healthcare has low out-of-pocket costs
-       - Pension system includes state, employer, and private pillars
-
-    2. **Dubai**:
-       - No unemployment benefits for expats
-       - Healthcare quality depends on insurance plan
-       - End of service benefits instead of pension
-       - Need private planning for long-term security
-
-    3. **Zug**:
-       - Strong unemployment protection
-       - High-quality but expensive healthcare
-       - Good pension system with three pillars
-       - Lower contributions than Netherlands
-    """)
+        # Each location's section is one prebuilt markdown element, and only the
+        # selected location is sent, so reruns stay cheap however many there are
+        benefit_location = st.radio(
+            "Location",
+            list(SOCIAL_SECURITY_BENEFITS),
+            format_func=lambda code: SOCIAL_SECURITY_BENEFITS[code]["label"],
+            horizontal=True,
+            key="tab_benefits",
+            label_visibility="collapsed",
+        )
+        st.markdown(benefit_markdown(benefit_location))
+        timer.lap("Social security section")
 
-with tab_factors:
-    st.subheader("Location Factor Comparison")
-    st.write("Compare quality of life factors between locations")
-    
-    # Define factors and their scores
-    factors = {
-        "Cost of Living": {"NL": 7, "Dubai": 6, "Zug": 3},
-        "Quality of Life": {"NL": 8, "Dubai": 8, "Zug": 9},
-        "Tax Burden": {"NL": 6, "Dubai": 10, "Zug": 9},
-        "Education": {"NL": 8, "Dubai": 7, "Zug": 8},
-        "Political Stability": {"NL": 9, "Dubai": 8, "Zug": 9},
-        "Safety": {"NL": 8, "Dubai": 9, "Zug": 9},
-        "Healthcare": {"NL": 8, "Dubai": 7, "Zug": 8},
-        "Banking & Privacy": {"NL": 7, "Dubai": 8, "Zug": 9},
-        "International Community": {"NL": 9, "Dubai": 9, "Zug": 8},
-        "Public Transport": {"NL": 9, "Dubai": 7, "Zug": 8},
-        "Nature & Recreation": {"NL": 7, "Dubai": 6, "Zug": 9}
-    }
-    
-    # Create columns for factor weights
-    st.write("Adjust importance of different factors (0-10)")
-    weights = {}
-    factor_cols = st.columns(4)
-    for i, (factor, scores) in enumerate(factors.items()):
-        with factor_cols[i % 4]:
-            weights[factor] = st.slider(
-                factor,
-                min_value=0,
-                max_value=10,
-                value=5,
-                key=f"weight_{factor.lower().replace(' ', '_')}",  # Add unique keys
-                help=f"NL: {scores['NL']}/10, Dubai: {scores['Dubai']}/10, Zug: {scores['Zug']}/10"
-            )
+        # Add summary comparison
+        st.subheader("Quick Comparison")
+        import pandas as pd
+
+        # One row per location described above, named as in the jurisdictions file
+        comparison_df = pd.DataFrame([
+            {
+                "Location": JURISDICTIONS.locations[code].name,
+                "Social Security Rate": location["rate"],
+                **location["summary"],
+            }
+            for code, location in SOCIAL_SECURITY_BENEFITS.items()
+        ])
+
+        st.table(comparison_df)
+
+        st.markdown("""
+        ### Additional Notes:
+        - **Netherlands**: Most comprehensive system with highest contributions but also highest benefits
+        - **Dubai**: Lowest contributions but relies heavily on private insurance and company benefits
+        - **Zug**: Balance between contributions and benefits, with high-quality healthcare but higher out-of-pocket costs
+
+        ### Important Considerations:
+        1. **Netherlands**:
+           - Most secure system for unemployment and disability
+           - Healthcare has low out-of-pocket costs
+           - Pension system includes state, employer, and private pillars
+
+        2. **Dubai**:
+           - No unemployment benefits for expats
+           - Healthcare quality depends on insurance plan
+           - End of service benefits instead of pension
+           - Need private planning for long-term security
+
+        3. **Zug**:
+           - Strong unemployment protection
+           - High-quality but expensive healthcare
+           - Good pension system with three pillars
+           - Lower contributions than Netherlands
+        """)
+        timer.lap("Social security summary")
+
+if tab_factors is not None:
+    with tab_factors:
+        # Weight sliders only rerun the scores and radar chart
+        @st.fragment
+        def lifestyle_factors():
+            fragment_start = time.perf_counter()
+            st.subheader("Location Factor Comparison")
+            st.write("Compare quality of life factors between locations")
     
-    # Ensure we don't divide by zero
-    total_weight = sum(weights.values())
-    if total_weight > 0:
-        # Calculate weighted scores
-        nl_score = sum(weights[f] * factors[f]["NL"] for f in factors) / total_weight
-        dubai_score = sum(weights[f] * factors[f]["Dubai"] for f in factors) / total_weight
-        zg_score = sum(weights[f] * factors[f]["Zug"] for f in factors) / total_weight
-        
-        # Create radar chart
-        categories = list(factors.keys())
-        nl_values = [factors[f]["NL"] for f in categories]
-        dubai_values = [factors[f]["Dubai"] for f in categories]
-        zg_values = [factors[f]["Zug"] for f in categories]
-        
-        fig = go.Figure()
-        
-        fig.add_trace(go.Scatterpolar(
-            r=nl_values,
-            theta=categories,
-            fill='toself',
-            name='Netherlands',
-            line=dict(color='#FF9999')  # Light red
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=dubai_values,
-            theta=categories,
-            fill='toself',
-            name='Dubai',
-            line=dict(color='#FFD700')  # Gold
-        ))
-        
-        fig.add_trace(go.Scatterpolar(
-            r=zg_values,
-            theta=categories,
-            fill='toself',
-            name='Zug',
-            line=dict(color='#99FF99')  # Light green
-        ))
-        
-        fig.update_layout(
-            polar=dict(
-                radialaxis=dict(
-                    visible=True,
-                    range=[0, 10]
-                )),
-            showlegend=True,
-            title="Location Comparison by Factors",
-            height=700,
-            template="plotly_white"  # Use a white template for better visibility
-        )
-        
-        st.plotly_chart(fig, use_container_width=True)
+            # Factor scores: one row per factor, one column per location
+            lifestyle = load_scores()
+            best, worst = lifestyle.extremes()
+
+            # Create columns for factor weights
+            st.write("Adjust importance of different factors (0-10)")
+            weights = np.zeros(len(lifestyle.factors))
+            factor_cols = st.columns(4)
+            for i, factor in enumerate(lifestyle.factors):
+                with factor_cols[i % 4]:
+                    weights[i] = st.slider(
+                        factor,
+                        min_value=0,
+                        max_value=10,
+                        value=5,
+                        key=f"weight_{factor.lower().replace(' ', '_')}",  # Add unique keys
+                        help=(
+                            f"Best: {lifestyle.locations[best[i]]} ({lifestyle.scores[i, best[i]]:.0f}/10), "
+                            f"worst: {lifestyle.locations[worst[i]]} ({lifestyle.scores[i, worst[i]]:.0f}/10)"
+                        )
+                    )
+            timer.lap("Factor weights")
+            timer.milestone("First paint")
+
+            # Locations to rank, by default the ones compared on the income tab
+            location_cols = st.columns([3, 1])
+            with location_cols[0]:
+                candidates = st.multiselect(
+                    "Candidate locations",
+                    lifestyle.locations,
+                    default=[
+                        loc.name for loc in JURISDICTIONS.locations.values()
+                        if loc.default and loc.name in lifestyle.locations
+                    ],
+                    placeholder="All locations",
+                    key="lifestyle_locations"
+                )
+            with location_cols[1]:
+                top_k = st.number_input(
+                    "Show top",
+                    min_value=1,
+                    max_value=len(lifestyle.locations),
+                    value=3,
+                    key="lifestyle_top_k"
+                )
+
+            # Ensure we don't divide by zero
+            if weights.sum() > 0:
+                # Weighted scores of every candidate in one product, only the top k sorted
+                top, top_scores = lifestyle.top_k(
+                    weights, top_k, lifestyle.location_index(candidates) if candidates else None
+                )
+                top_names = [lifestyle.locations[i] for i in top]
+
+                # Create radar chart
+                plot_figure(
+                    "Factor radar",
+                    top_names,
+                    lambda lean: factor_radar_figure(lifestyle.factors, top_names, lifestyle.scores[:, top], lean)
+                )
         
-        # Display final scores
-        st.subheader("Overall Weighted Scores")
-        score_data = pd.DataFrame({
-            "Location": ["Netherlands", "Dubai", "Zug"],
-            "Score": [f"{nl_score:.1f}/10", f"{dubai_score:.1f}/10", f"{zg_score:.1f}/10"],
-            "Raw Score": [nl_score, dubai_score, zg_score]  # Add raw scores for sorting
-        }).sort_values(by="Raw Score", ascending=False).drop("Raw Score", axis=1)  # Sort and drop raw scores
+                # Display final scores, best first
+                st.subheader("Overall Weighted Scores")
+                import pandas as pd
+
+                score_data = pd.DataFrame(
+                    {"Location": top_names, "Score": [f"{score:.1f}/10" for score in top_scores]},
+                    index=pd.RangeIndex(1, len(top_names) + 1, name="Rank")
+                )
         
-        st.table(score_data)
-    else:
-        st.warning("Please adjust at least one factor weight above zero to see the comparison.")
+                st.table(score_data)
+                timer.lap("Factor radar")
+
+                # How far the weights can move before another location ranks first
+                st.subheader("Weight Robustness")
+                robustness_enabled = st.checkbox(
+                    "Analyse ranking robustness",
+                    value=False,
+                    key="lifestyle_robustness",
+                    help="Sample weightings around the sliders and count how often each location ranks first"
+                )
+                if robustness_enabled:
+                    candidate_idx = lifestyle.location_index(candidates) if candidates else None
+                    robustness_cols = st.columns(2)
+                    with robustness_cols[0]:
+                        spread = st.select_slider(
+                            "Weight uncertainty",
+                            options=list(WEIGHT_SPREADS),
+                            value="Moderate",
+                            key="lifestyle_spread"
+                        )
+                    with robustness_cols[1]:
+                        weight_draws = st.selectbox(
+                            "Samples",
+                            [100_000, 1_000_000],
+                            index=1,
+                            format_func="{:,}".format,
+                            key="lifestyle_draws"
+                        )
+
+                    def sample_robustness():
+                        # Chunked so a slider change interrupts the run between chunks
+                        progress = st.progress(0.0, text="Sampling weightings...")
+                        for tally in lifestyle.sample_wins(
+                            weights, candidate_idx, draws=weight_draws, concentration=WEIGHT_SPREADS[spread]
+                        ):
+                            progress.progress(tally["draws"] / weight_draws, text="Sampling weightings...")
+                        progress.empty()
+                        return robustness_summary(tally)
+
+                    robustness = RESULTS.get_or_compute(
+                        cache_key("weight_robustness", weights, candidates, weight_draws, spread),
+                        sample_robustness
+                    )
+                    positions = np.arange(len(lifestyle.locations)) if candidate_idx is None else candidate_idx
+                    leader = lifestyle.locations[positions[robustness["leader"]]]
+                    order = np.argsort(-robustness["probability_first"], kind="stable")
+                    order = order[robustness["probability_first"][order] > 0][:10]
+                    st.table(pd.DataFrame(
+                        {
+                            "Location": [lifestyle.locations[positions[i]] for i in order],
+                            "P(Ranks First)": [f"{robustness['probability_first'][i]:.1%}" for i in order],
+                        },
+                        index=pd.RangeIndex(1, len(order) + 1, name="Rank")
+                    ))
+
+                    shift = robustness["flip_weight_shift"]
+                    summary = f"{leader} ranks first in {1 - robustness['flip_share']:.0%} of {weight_draws:,} weightings."
+                    tipping = [i for i in np.argsort(-np.abs(shift))[:3] if shift[i] != 0]
+                    if tipping:
+                        summary += " Weightings that change the leader mostly put " + ", ".join(
+                            f"{'more' if shift[i] > 0 else 'less'} weight on {lifestyle.factors[i]}" for i in tipping
+                        ) + "."
+                    st.caption(summary)
+
+                    # Exact slider changes, one factor at a time, that put another location first
+                    changes, new_leaders = lifestyle.flip_points(weights, candidate_idx)
+                    flips = np.flatnonzero(changes)
+                    flips = flips[np.argsort(np.abs(changes[flips]), kind="stable")]
+                    if flips.size:
+                        st.write(f"Single slider changes that put another location ahead of {leader}:")
+                        st.table(pd.DataFrame({
+                            "Factor": [lifestyle.factors[i] for i in flips],
+                            "Change": [f"{changes[i]:+d} → {int(weights[i] + changes[i])}" for i in flips],
+                            "New Leader": [lifestyle.locations[new_leaders[i]] for i in flips],
+                        }).set_index("Factor"))
+                    else:
+                        st.write(f"No single slider change puts another location ahead of {leader}.")
+            else:
+                st.warning("Please adjust at least one factor weight above zero to see the comparison.")
+            timer.lap("Weight robustness")
     
-    # Add explanatory notes for factors
-    with st.expander("See Detailed Factor Explanations"):
-        st.markdown("""
-        ### Factor Explanations
+            # Add explanatory notes for factors
+            with st.expander("See Detailed Factor Explanations"):
+                st.markdown("""
+                ### Factor Explanations
         
-        #### Cost of Living
-        - 🇳🇱 NL: High housing costs in major cities, moderate daily expenses
-        - 🇦🇪 Dubai: High housing costs, tax-free shopping but expensive lifestyle
-        - 🇨🇭 Zug: Extremely high housing costs, highest daily expenses
+                #### Cost of Living
+                - 🇳🇱 NL: High housing costs in major cities, moderate daily expenses
+                - 🇦🇪 Dubai: High housing costs, tax-free shopping but expensive lifestyle
+                - 🇨🇭 Zug: Extremely high housing costs, highest daily expenses
         
-        #### Quality of Life
-        - 🇳🇱 NL: Excellent work-life balance, cycling culture
-        - 🇦🇪 Dubai: Modern amenities, luxury lifestyle, but very hot climate
-        - 🇨🇭 Zug: High standard of living, clean environment, outdoor activities
+                #### Quality of Life
+                - 🇳🇱 NL: Excellent work-life balance, cycling culture
+                - 🇦🇪 Dubai: Modern amenities, luxury lifestyle, but very hot climate
+                - 🇨🇭 Zug: High standard of living, clean environment, outdoor activities
         
-        #### Tax Structure
-        - 🇳🇱 NL: Higher tax burden, complex system
-        - 🇦🇪 Dubai: No personal income tax, 9% corporate tax, very favorable
-        - 🇨🇭 Zug: Very low personal tax, competitive corporate tax
+                #### Tax Structure
+                - 🇳🇱 NL: Higher tax burden, complex system
+                - 🇦🇪 Dubai: No personal income tax, 9% corporate tax, very favorable
+                - 🇨🇭 Zug: Very low personal tax, competitive corporate tax
         
-        #### International Community
-        - 🇳🇱 NL: Very international, especially in major cities
-        - 🇦🇪 Dubai: Highly international, expat-dominated society
-        - 🇨🇭 Zug: Growing international community, many global companies
+                #### International Community
+                - 🇳🇱 NL: Very international, especially in major cities
+                - 🇦🇪 Dubai: Highly international, expat-dominated society
+                - 🇨🇭 Zug: Growing international community, many global companies
         
-        #### Healthcare
-        - 🇳🇱 NL: Universal healthcare, lower costs
-        - 🇦🇪 Dubai: High-quality private healthcare, insurance required
-        - 🇨🇭 Zug: High-quality but expensive healthcare
+                #### Healthcare
+                - 🇳🇱 NL: Universal healthcare, lower costs
+                - 🇦🇪 Dubai: High-quality private healthcare, insurance required
+                - 🇨🇭 Zug: High-quality but expensive healthcare
         
-        #### Education
-        - 🇳🇱 NL: Good public schools, many international schools
-        - 🇦🇪 Dubai: Mainly private international schools, high quality but expensive
-        - 🇨🇭 Zug: Excellent public schools, some international options
+                #### Education
+                - 🇳🇱 NL: Good public schools, many international schools
+                - 🇦🇪 Dubai: Mainly private international schools, high quality but expensive
+                - 🇨🇭 Zug: Excellent public schools, some international options
         
-        #### Public Transport
-        - 🇳🇱 NL: Extensive network, frequent service
-        - 🇦🇪 Dubai: Modern metro and bus system, car-dependent culture
-        - 🇨🇭 Zug: Very reliable but more expensive
+                #### Public Transport
+                - 🇳🇱 NL: Extensive network, frequent service
+                - 🇦🇪 Dubai: Modern metro and bus system, car-dependent culture
+                - 🇨🇭 Zug: Very reliable but more expensive
         
-        #### Nature & Recreation
-        - 🇳🇱 NL: Flat landscape, water activities
-        - 🇦🇪 Dubai: Desert activities, beaches, indoor attractions
-        - 🇨🇭 Zug: Mountains, lakes, skiing, hiking
-        """)
+                #### Nature & Recreation
+                - 🇳🇱 NL: Flat landscape, water activities
+                - 🇦🇪 Dubai: Desert activities, beaches, indoor attractions
+                - 🇨🇭 Zug: Mountains, lakes, skiing, hiking
+                """)
+            record_fragment_time("Lifestyle factors", fragment_start)
 
+        lifestyle_factors()
+
+# Show how often reruns were served from the shared caches
+with st.sidebar:
+    with st.expander("Cache Statistics"):
+        import pandas as pd
+
+        cache_stats = pd.DataFrame([
+            {"Cache": name, **cache.stats()}
+            for name, cache in [("Results", RESULTS), ("Figures", FIGURES)]
+        ])
+        cache_stats["hit_rate"] = cache_stats["hit_rate"].apply(lambda x: f"{x:.0%}")
+        st.table(cache_stats.set_index("Cache"))
+timer.lap("Cache statistics")
+
+# Time spent in each section of this run, to tell which part makes a rerun slow
+with st.sidebar:
+    with st.expander("Performance"):
+        st.checkbox(
+            "Profile reruns",
+            value=False,
+            key="profile_rerun",
+            help="Capture a cProfile of every rerun while enabled, downloadable as a .pstats file"
+        )
+        st.checkbox(
+            "Fast startup",
+            value=False,
+            key="fast_startup",
+            help="Show the tabs as a selector and run only the open one instead of every tab on each rerun"
+        )
+        st.checkbox(
+            "Full chart payloads",
+            value=False,
+            key="full_chart_payloads",
+            help="Send SVG traces with pre-formatted label arrays instead of WebGL traces and label templates"
+        )
+        timings = pd.DataFrame(timer.rows(), columns=["Section", "ms", "Share"])
+        timings.loc[len(timings)] = ["Total", timings["ms"].sum(), timings["Share"].sum()]
+        timings["ms"] = timings["ms"].map("{:,.1f}".format)
+        timings["Share"] = timings["Share"].map("{:.0%}".format)
+        st.table(timings.set_index("Section"))
+        st.caption(" · ".join(
+            f"{name}: {seconds * 1000:,.0f} ms" for name, seconds in timer.milestones.items()
+        ))
+        if st.session_state.get("fragment_timings"):
+            st.caption("Latest fragment runs: " + " · ".join(
+                f"{name}: {seconds * 1000:,.0f} ms"
+                for name, seconds in st.session_state.fragment_timings.items()
+            ))
+        if st.session_state.get("figure_payloads"):
+            payloads = pd.DataFrame([
+                {"Figure": name, "KB": payload["bytes"] / 1024, "Serialize ms": payload["serialize_s"] * 1000}
+                for name, payload in st.session_state.figure_payloads.items()
+            ])
+            payloads["KB"] = payloads["KB"].map("{:,.1f}".format)
+            payloads["Serialize ms"] = payloads["Serialize ms"].map("{:,.1f}".format)
+            st.table(payloads.set_index("Figure"))
+        # Kept for headless runs (benchmarks) that read the timings back
+        st.session_state.section_timings = timer.summary()
+
+        if profiler is not None:
+            st.download_button(
+                "Download profile (.pstats)",
+                data=profile_dump(profiler),
+                file_name=f"rerun-{time.strftime('%Y%m%d-%H%M%S')}.pstats",
+                mime="application/octet-stream"
+            )
+            st.code(profile_summary(profiler, limit=15), language="text")
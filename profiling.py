@@ -0,0 +1,78 @@
+"""Per-section timing and single-rerun profiling for the comparison page.
+
+Nothing here depends on Streamlit: the page marks its sections on a
+`SectionTimer` and renders the collected timings and profile itself.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+
+class SectionTimer:
+    """Wall-clock time spent in each named section of one script run.
+
+    `lap(name)` charges the time since the previous lap (or since the timer
+    was created) to `name`, so sections are marked with a single call at
+    their end instead of wrapping the page code in blocks. `milestone(name)`
+    records the time since the start the first time it is reached.
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self.milestones = {}
+        self._start = self._last = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0.0) + now - self._last
+        self._last = now
+
+    def milestone(self, name):
+        self.milestones.setdefault(name, time.perf_counter() - self._start)
+
+    def total(self):
+        """Seconds since the timer was created"""
+        return time.perf_counter() - self._start
+
+    def rows(self):
+        """(section, milliseconds, share of the run) per section, in run order"""
+        total = self.total()
+        return [
+            (name, seconds * 1000, seconds / total if total > 0 else 0.0)
+            for name, seconds in self.sections.items()
+        ]
+
+    def summary(self):
+        """Plain dict of section and milestone seconds and the total so far"""
+        return {
+            "sections": dict(self.sections),
+            "milestones": dict(self.milestones),
+            "total_s": self.total(),
+        }
+
+
+def start_profile():
+    """Start a cProfile profiler for the rest of the run"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def profile_dump(profiler):
+    """Stop `profiler` and return its stats in the binary pstats format.
+
+    The bytes are what `pstats.Stats.dump_stats` writes, so the download
+    opens with `pstats`, snakeviz or `python -m pstats`.
+    """
+    profiler.disable()
+    profiler.create_stats()
+    return marshal.dumps(profiler.stats)
+
+
+def profile_summary(profiler, limit=20, sort="cumulative"):
+    """Text listing of the `limit` most expensive functions of a stopped profiler"""
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).strip_dirs().sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
@@ -0,0 +1,79 @@
+"""Process-wide LRU caches for computed results and figures.
+
+Streamlit imports this module once per server process, so the caches are
+shared by every session. Cached values are treated as read-only by callers.
+"""
+from collections import OrderedDict
+import threading
+
+import numpy as np
+
+
+class LRUCache:
+    """Bounded mapping with least-recently-used eviction and hit/miss counters"""
+
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for `key`, calling `compute()` on a miss"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+
+        # Compute outside the lock so slow builds don't serialize sessions
+        value = compute()
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _normalize(value):
+    if isinstance(value, dict):
+        return tuple(sorted((key, _normalize(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(item) for item in value)
+    if isinstance(value, np.ndarray):
+        return (value.dtype.str, value.shape, value.tobytes())
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # 800, 800.0 and np.float64(800) all map to the same key
+        return round(float(value), 6)
+    return value
+
+
+def cache_key(*parts):
+    """Hashable key from nested inputs (dicts, lists, arrays, numbers)"""
+    return _normalize(parts)
+
+
+# Shared caches for the comparison page
+RESULTS = LRUCache(maxsize=64)
+FIGURES = LRUCache(maxsize=128)
@@ -0,0 +1,132 @@
+"""Per-scenario results kept between reruns and patched where inputs change.
+
+A `ResultStore` lives in one session's state. Each rerun hands it every
+scenario's inputs. It evaluates only the rows whose inputs differ from the
+last rerun and writes them into its column arrays in place. The frames the
+page reads are thin wrappers rebuilt from those arrays, because a pandas
+operation costs about a millisecond whatever the number of rows. A rerun
+that changes one scenario's expenses then costs about the same for six
+scenarios as for hundreds.
+
+Given a shared cache (`result_cache.RESULTS`), the columns after every
+update are also kept there under the full set of inputs. A session whose
+inputs another session has already seen, such as a new session at the
+default inputs, copies those columns instead of evaluating. Figures stay
+per session and are patched in place, since copying a cached figure costs
+as much as building it. This module must not import Streamlit.
+"""
+import numpy as np
+
+from currencies import CURRENCIES
+from engine import MONEY_COLUMNS, RESULT_COLUMNS, evaluate, with_cost_of_living, with_fx_rates
+from figures import figure_payload, refresh_traces
+from formatting import currency_strings, format_rates
+from result_cache import cache_key
+
+
+class ResultStore:
+    """Results frame, its EUR version and the display table of fixed scenarios.
+
+    A row's inputs are the scenario's gross income and expenses in local
+    currency, its EUR rate and its cost of living index. The tax tables are
+    fixed for the store's lifetime, so these inputs decide whether a row is
+    out of date. The frames match `results_frame`, `convert_frame_to_eur`
+    and `format_results_table` applied to all rows. `cache` is an optional
+    shared `LRUCache` for the columns.
+    """
+
+    def __init__(self, scenarios, table, cache=None):
+        self.scenarios = list(scenarios)
+        self.table = table
+        self.cache = cache
+        self.labels = {
+            "Scenario": np.array([s.name for s in self.scenarios], dtype=object),
+            "Country": np.array([s.country for s in self.scenarios], dtype=object),
+            "Currency": np.array([s.currency for s in self.scenarios], dtype=object),
+        }
+        self.inputs = None
+        self.local = {label: np.zeros(len(self.scenarios)) for label in RESULT_COLUMNS.values()}
+        self.eur = {label: np.zeros(len(self.scenarios)) for label in MONEY_COLUMNS}
+        self.display = {
+            label: np.empty(len(self.scenarios), dtype=object)
+            for label in MONEY_COLUMNS + ["Retention %", "Cost of Living Index"]
+        }
+        self.df = self.df_eur = self.display_df = None
+        # Bumped whenever a row changes, so figures know when to refresh
+        self.version = 0
+        self._figures = {}
+
+    def update(self, gross_income, company_expenses, fx_rates=None, cost_of_living=None):
+        """Bring every frame up to date; returns the positions of the rows that changed"""
+        table = with_cost_of_living(with_fx_rates(self.table, fx_rates), cost_of_living)
+        inputs = np.column_stack(np.broadcast_arrays(
+            np.asarray(gross_income, dtype=np.float64), np.asarray(company_expenses, dtype=np.float64),
+            table["fx_rate"], table["col_index"]
+        ))
+        if self.inputs is None:
+            changed = np.arange(len(inputs))
+        else:
+            changed = np.flatnonzero((inputs != self.inputs).any(axis=1))
+        if changed.size == 0:
+            return changed
+        self.inputs = inputs
+        self.version += 1
+
+        if self.cache is None:
+            self._evaluate(changed, table, fx_rates)
+        else:
+            # On a miss the changed rows are evaluated here; on a hit every
+            # column is copied from the session that evaluated these inputs
+            columns = self.cache.get_or_compute(
+                ("result_store", cache_key([s.name for s in self.scenarios], inputs)),
+                lambda: self._evaluate(changed, table, fx_rates)
+            )
+            for group, cached in zip((self.local, self.eur, self.display), columns):
+                for label, values in cached.items():
+                    group[label][:] = values
+
+        self.df = self._frame(self.local)
+        self.df_eur = self._frame({**self.local, **self.eur})
+        self.display_df = self._frame({**self.local, **self.display})
+        return changed
+
+    def _evaluate(self, changed, table, fx_rates):
+        """Evaluate the `changed` rows into the columns; returns copies of them"""
+        breakdown = evaluate(self.inputs[changed, 0], self.inputs[changed, 1], changed, table)
+        currency_idx = self.table["currency_idx"][changed]
+        to_eur = CURRENCIES.matrix(fx_rates)[currency_idx, CURRENCIES.index("EUR")]
+        for key, label in RESULT_COLUMNS.items():
+            self.local[label][changed] = breakdown[key]
+        for label in MONEY_COLUMNS:
+            self.eur[label][changed] = self.local[label][changed] * to_eur
+            self.display[label][changed] = currency_strings(self.local[label][changed], currency_idx)
+        self.display["Retention %"][changed], self.display["Cost of Living Index"][changed] = format_rates(
+            self.local["Retention %"][changed], self.local["Cost of Living Index"][changed]
+        )
+        return tuple(
+            {label: values.copy() for label, values in group.items()}
+            for group in (self.local, self.eur, self.display)
+        )
+
+    def _frame(self, columns):
+        import pandas as pd
+
+        # The frame copies the arrays, so later patches do not reach it
+        return pd.DataFrame({**self.labels, **{label: columns[label] for label in RESULT_COLUMNS.values()}})
+
+    def figure(self, name, build, lean):
+        """Figure `build(lean)` drawn from `df_eur`, with its spec payload.
+
+        The figure is built once per chart mode. After that, rows changed by
+        `update` are written into its traces instead of rebuilding it.
+        """
+        entry = self._figures.get(name)
+        if entry is None or entry["lean"] != lean:
+            fig = build(lean)
+            entry = self._figures[name] = {"figure": fig, "lean": lean, "version": self.version}
+            entry["payload"] = figure_payload(fig)
+        elif entry["version"] != self.version:
+            refresh_traces(entry["figure"], self.df_eur, lean)
+            entry["version"] = self.version
+            entry["payload"] = figure_payload(entry["figure"])
+        return entry["figure"], entry["payload"]
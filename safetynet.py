@@ -0,0 +1,352 @@
+"""Expected present value of each location's social safety net.
+
+`data/safety_net.json` encodes the benefits described in the app's social
+security section as numbers in the location's currency: replacement rates
+and their durations, salary caps, waiting periods, state pension amounts
+and end-of-service gratuity scales. Each benefit lists the strategies it
+covers; company owners, for instance, are not insured against unemployment.
+
+Careers are simulated once and shared by every scenario, so scenarios are
+compared on the same lives. A life alternates between spells in work and
+out of work (geometric durations in months) and may end early in permanent
+disability. A career is kept as a handful of spells per life rather than
+month by month. Every benefit over a spell is a discounted sum read from a
+cumulative table, so valuing thousands of lives for every scenario takes a
+few array operations of shape (scenarios, lives, spells).
+
+Valued are unemployment and disability benefits, the state pension, the
+end-of-service gratuity and the `pension` column's funded savings, which
+come back at the discount rate. Healthcare is insurance bought at cost and
+is left out, as is death before retirement. Amounts are real (today's
+money), and the salary stays fixed over the career.
+This module must not import Streamlit.
+"""
+import functools
+import json
+import os
+
+import numpy as np
+
+from engine import scenario_salary
+from jurisdictions import SELF_EMPLOYED, STRATEGIES
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "safety_net.json")
+
+# Benefits in display order, with their column labels
+BENEFITS = {
+    "unemployment": "Unemployment",
+    "disability": "Disability",
+    "state_pension": "State Pension",
+    "gratuity": "End of Service",
+    "funded_pension": "Funded Pension",
+}
+
+
+def _covers(section, name):
+    unknown = set(section.get("covers", [])) - set(STRATEGIES)
+    if unknown:
+        raise ValueError(f"Unknown strategy in {name}: {', '.join(sorted(unknown))}")
+    return frozenset(STRATEGIES[strategy] for strategy in section.get("covers", []))
+
+
+def _phases(pairs, name):
+    """(length, value) pairs; only the last length may be None (open-ended)"""
+    phases = [(None if length is None else int(length), float(value)) for length, value in pairs]
+    if any(length is None or length <= 0 for length, _ in phases[:-1]):
+        raise ValueError(f"Only the last phase of {name} may be open-ended, and lengths must be positive")
+    return phases
+
+
+class SafetyNet:
+    """Numeric benefit parameters of one location, in its currency.
+
+    Each benefit is a dict of parameters, or None where the location has
+    none. Phases are (months, replacement rate) pairs, gratuity tiers are
+    (years, days of salary per year) pairs; a length of None lasts until
+    retirement.
+    """
+
+    __slots__ = ("code", "unemployment", "disability", "state_pension", "gratuity")
+
+    def __init__(self, code, unemployment=None, disability=None, state_pension=None, gratuity=None):
+        self.code = code
+        self.unemployment = unemployment
+        self.disability = disability
+        self.state_pension = state_pension
+        self.gratuity = gratuity
+
+    @classmethod
+    def from_dict(cls, code, data):
+        benefits = {}
+        if "unemployment" in data:
+            section = data["unemployment"]
+            phases = _phases(section["phases"], f"{code} unemployment")
+            if phases and phases[-1][0] is None:
+                raise ValueError(f"Unemployment benefits of {code} must end")
+            benefits["unemployment"] = {
+                "covers": _covers(section, f"{code} unemployment"),
+                "phases": phases,
+                "salary_cap": float(section.get("salary_cap", np.inf)),
+                "min_employed_months": int(section.get("min_employed_months", 0)),
+            }
+        if "disability" in data:
+            section = data["disability"]
+            benefits["disability"] = {
+                "covers": _covers(section, f"{code} disability"),
+                "phases": _phases(section.get("phases", []), f"{code} disability"),
+                "salary_cap": float(section.get("salary_cap", np.inf)),
+                "waiting_months": int(section.get("waiting_months", 0)),
+                "state_pension": bool(section.get("state_pension", False)),
+            }
+        if "state_pension" in data:
+            section = data["state_pension"]
+            benefits["state_pension"] = {
+                "covers": _covers(section, f"{code} state pension"),
+                "annual_amount": float(section["annual_amount"]),
+                "full_years": float(section["full_years"]),
+                "min_fraction": float(section.get("min_fraction", 1.0)),
+                "min_income": float(section.get("min_income", 0.0)),
+                "full_income": float(section.get("full_income", 0.0)),
+            }
+        if "gratuity" in data:
+            section = data["gratuity"]
+            benefits["gratuity"] = {
+                "covers": _covers(section, f"{code} gratuity"),
+                "days_per_year": _phases(section["days_per_year"], f"{code} gratuity"),
+                "min_service_months": int(section.get("min_service_months", 0)),
+                "cap_years": float(section.get("cap_years", np.inf)),
+            }
+        return cls(code, **benefits)
+
+    def pension_amount(self, salary, strategy):
+        """Annual state pension for a full contribution record at `salary`"""
+        params = self.state_pension
+        if params is None or strategy not in params["covers"]:
+            return 0.0
+        fraction = 1.0
+        if params["full_income"] > params["min_income"]:
+            fraction = params["min_fraction"] + (1 - params["min_fraction"]) * (
+                (salary - params["min_income"]) / (params["full_income"] - params["min_income"])
+            )
+            fraction = min(max(fraction, params["min_fraction"]), 1.0)
+        return params["annual_amount"] * fraction
+
+
+class SafetyNets:
+    """Career assumptions and the safety net of every location in one data file"""
+
+    def __init__(self, assumptions, locations):
+        self.assumptions = dict(assumptions)
+        self.locations = {net.code: net for net in locations}
+
+    def __getitem__(self, code):
+        """A location's safety net; locations without parameters have none"""
+        return self.locations.get(code) or SafetyNet(code)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            {key: float(value) for key, value in data["assumptions"].items()},
+            [SafetyNet.from_dict(code, entry) for code, entry in data["locations"].items()],
+        )
+
+
+@functools.lru_cache(maxsize=4)
+def load_safety_nets(path=DATA_PATH):
+    """Safety nets from `path`, parsed once per process"""
+    with open(path) as f:
+        return SafetyNets.from_dict(json.load(f))
+
+
+class Careers:
+    """Simulated working lives, held as spells out of work.
+
+    Spell k of life i starts at month `start[i, k]` after `employed[i, k]`
+    months in a job and lasts `length[i, k]` months. The working life ends
+    at month `end[i]`, the career's end or the onset of disability
+    (`disabled[i]`). Spells are cut at the end, and those starting after it
+    have length 0.
+    """
+
+    __slots__ = ("months", "start", "length", "employed", "end", "disabled")
+
+    def __init__(self, months, start, length, employed, end, disabled):
+        self.months = months
+        self.start = start
+        self.length = length
+        self.employed = employed
+        self.end = end
+        self.disabled = disabled
+
+
+def _monthly(annual_rate):
+    """Monthly probability of an event with the given annual probability"""
+    return 1 - (1 - annual_rate) ** (1 / 12)
+
+
+def simulate_careers(lives, assumptions, seed=0):
+    """Draw `lives` careers under `assumptions` (see `SafetyNets.assumptions`)"""
+    rng = np.random.default_rng(seed)
+    months = int(round(assumptions["career_years"] * 12))
+    job_loss = _monthly(assumptions["job_loss_rate"])
+    recovery = 1 / max(assumptions["unemployment_months"], 1.0)
+    disability = _monthly(assumptions["disability_rate"])
+
+    onset = rng.geometric(disability, lives) - 1 if disability > 0 else np.full(lives, months)
+    end = np.minimum(onset, months)
+    # Draw enough spells that every career ends before its last spell starts
+    spells = 8 + int(4 * months * job_loss)
+    while True:
+        if job_loss > 0:
+            employed = rng.geometric(job_loss, (lives, spells))
+        else:
+            employed = np.full((lives, spells), months + 1)
+        length = rng.geometric(recovery, (lives, spells))
+        start = np.cumsum(employed + length, axis=1) - length
+        if np.all(start[:, -1] >= end):
+            break
+        spells *= 2
+
+    length = np.clip(np.minimum(length, end[:, None] - start), 0, None)
+    return Careers(months, start, length, employed, end, onset < months)
+
+
+def value_safety_nets(gross_income, company_expenses, table, careers, assumptions, nets=None):
+    """Mean present value in EUR of every scenario's safety net over `careers`.
+
+    `gross_income` and `company_expenses` hold one annual value per scenario
+    of `table` in its local currency. Returns a dict of arrays with one entry
+    per scenario: the `BENEFITS` columns, their sum as "benefits", the
+    "contributions" counted in the engine's `social_security` and `pension`
+    columns over the months in work, and "net" (benefits less contributions).
+    Benefits and net are NaN for locations without safety net parameters.
+    """
+    nets = load_safety_nets() if nets is None else nets
+    scenarios = np.arange(len(table["kind"]))
+    salary = np.maximum(scenario_salary(
+        np.asarray(gross_income, dtype=np.float64), np.asarray(company_expenses, dtype=np.float64), scenarios, table
+    ), 0.0)
+    social_security = table["social_security"].tax(salary, scenarios)
+    pension = np.where(table["kind"] == SELF_EMPLOYED, 0.0, salary * table["pension_rate"])
+
+    months = careers.months
+    discount = (1 + assumptions["discount_rate"]) ** (-np.arange(months + 1) / 12)
+    # annuity[n]: value of 1 a month for the first n months
+    annuity = np.concatenate([[0.0], np.cumsum(discount[:-1])])
+
+    # Per-scenario schedules, in local currency per month and discounted from
+    # the first month they apply; cumulative sums turn a spell into a lookup
+    unemployment_months = max(
+        (sum(length for length, _ in nets[code].unemployment["phases"])
+         for code in table["country"] if nets[code].unemployment), default=0
+    )
+    unemployment = np.zeros((len(scenarios), unemployment_months))
+    min_employed = np.zeros(len(scenarios))
+    disability = np.zeros((len(scenarios), months))
+    state_pension = np.zeros(len(scenarios))
+    gratuity_tiers = max((len(nets[code].gratuity["days_per_year"]) for code in table["country"]
+                          if nets[code].gratuity), default=0)
+    tier_years = np.zeros((len(scenarios), gratuity_tiers + 1))
+    tier_days = np.zeros((len(scenarios), gratuity_tiers))
+    gratuity_cap = np.zeros(len(scenarios))
+    min_service = np.zeros(len(scenarios))
+
+    for s, (code, strategy) in enumerate(zip(table["country"], table["kind"])):
+        net = nets[code]
+        params = net.unemployment
+        if params and strategy in params["covers"]:
+            monthly = min(salary[s], params["salary_cap"]) / 12
+            rates = np.concatenate([np.full(length, rate) for length, rate in params["phases"]])
+            unemployment[s, :rates.size] = monthly * rates
+            min_employed[s] = params["min_employed_months"]
+        params = net.disability
+        if params and strategy in params["covers"]:
+            monthly = min(salary[s], params["salary_cap"]) / 12
+            position = params["waiting_months"]
+            for length, rate in params["phases"]:
+                stop = months if length is None else min(position + length, months)
+                disability[s, position:stop] += monthly * rate
+                position = stop
+            if params["state_pension"]:
+                disability[s, params["waiting_months"]:] += net.pension_amount(salary[s], strategy) / 12
+        params = net.state_pension
+        if params:
+            years = min((assumptions["prior_years"] + assumptions["career_years"]) / params["full_years"], 1.0)
+            state_pension[s] = net.pension_amount(salary[s], strategy) * years
+        params = net.gratuity
+        if params and strategy in params["covers"]:
+            lengths = [np.inf if length is None else length for length, _ in params["days_per_year"]]
+            tier_years[s, 1:len(lengths) + 1] = np.cumsum(lengths)
+            tier_years[s, len(lengths) + 1:] = np.inf
+            tier_days[s, :len(lengths)] = [days for _, days in params["days_per_year"]]
+            gratuity_cap[s] = params["cap_years"] * salary[s]
+            min_service[s] = params["min_service_months"]
+
+    unemployment_value = np.concatenate(
+        [np.zeros((len(scenarios), 1)), np.cumsum(unemployment * discount[:unemployment_months], axis=1)], axis=1
+    )
+    disability_value = np.concatenate(
+        [np.zeros((len(scenarios), 1)), np.cumsum(disability * discount[:-1], axis=1)], axis=1
+    )
+
+    # Means over lives are sums over the spells and jobs that happened, divided
+    # by the number of lives, so only those are evaluated
+    lives = len(careers.end)
+    happened = careers.length > 0
+    spell_start = careers.start[happened]
+    spell_length = careers.length[happened]
+    employed = careers.employed.copy()
+    employed[:, 0] += int(assumptions["prior_years"] * 12)
+    spell_employed = employed[happened]
+
+    # Unemployment: each eligible spell pays its schedule for its length; the
+    # first spell counts the work history before the simulated career
+    spell_value = (
+        unemployment_value[:, np.minimum(spell_length, unemployment_months)] * discount[spell_start]
+    )
+    eligible = spell_employed[None, :] >= min_employed[:, None]
+    unemployment_pv = (spell_value * eligible).sum(axis=1) / lives
+
+    # Disability pays from its onset until retirement
+    onset = careers.end[careers.disabled]
+    disability_pv = (disability_value[:, months - onset] * discount[onset]).sum(axis=1) / lives
+
+    # State pension: an annuity over retirement, paid monthly from the career's end
+    retirement_months = int(round(assumptions["retirement_years"] * 12))
+    retirement_annuity = np.sum((1 + assumptions["discount_rate"]) ** (-np.arange(retirement_months) / 12))
+    state_pension_pv = state_pension / 12 * retirement_annuity * discount[months]
+
+    # Gratuity: paid when each job ends, on its years of service
+    job_start = np.concatenate([np.zeros((lives, 1), dtype=np.int64), careers.start + careers.length], axis=1)
+    job_end = np.concatenate([np.minimum(careers.start, careers.end[:, None]), careers.end[:, None]], axis=1)
+    service = job_end - job_start
+    worked = service > 0
+    years = service[worked] / 12
+    days = np.zeros((len(scenarios), years.size))
+    for tier in range(gratuity_tiers):
+        lower, upper = tier_years[:, tier, None], tier_years[:, tier + 1, None]
+        days += tier_days[:, tier, None] * np.clip(years - lower, 0, upper - lower)
+    payout = np.minimum(salary[:, None] / 365 * days, gratuity_cap[:, None])
+    payout = np.where(service[worked] >= min_service[:, None], payout, 0.0)
+    gratuity_pv = (payout * discount[job_end[worked]]).sum(axis=1) / lives
+
+    # Contributions are paid in every month in work
+    work_months = (annuity[careers.end].sum() - (discount[spell_start] * annuity[spell_length]).sum()) / lives
+    funded_pension_pv = pension / 12 * work_months
+    contributions_pv = (social_security + pension) / 12 * work_months
+
+    to_eur = 1 / table["fx_rate"]
+    result = {
+        "unemployment": unemployment_pv * to_eur,
+        "disability": disability_pv * to_eur,
+        "state_pension": state_pension_pv * to_eur,
+        "gratuity": gratuity_pv * to_eur,
+        "funded_pension": funded_pension_pv * to_eur,
+    }
+    modelled = np.array([code in nets.locations for code in table["country"]], dtype=bool)
+    for key in BENEFITS:
+        result[key] = np.where(modelled, result[key], np.nan)
+    result["benefits"] = sum(result[key] for key in BENEFITS)
+    result["contributions"] = contributions_pv * to_eur
+    result["net"] = result["benefits"] - result["contributions"]
+    return result
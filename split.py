@@ -0,0 +1,152 @@
+"""Salary and dividend split optimizer for the company scenarios.
+
+The engine pays a company owner the minimum salary and keeps the rest in the
+company. Here the owner chooses any salary from that minimum up to the whole
+profit, and the profit left after corporate tax is either paid out now as a
+dividend or retained.
+
+With the dividend given as an amount, every tax is piecewise linear in
+(salary, dividend). The salary kinks are the income tax and social security
+thresholds and the salaries where profit crosses a corporate threshold. The
+dividend kinks are the dividend thresholds, counted against both the payout
+and the retained part. A piecewise-linear function peaks at a vertex of the
+regions between its kinks, so evaluating the grid of those vertices finds
+the exact optimum. All company scenarios are evaluated in one pass.
+"""
+import numpy as np
+
+from engine import COMPANY
+
+# Objectives to maximize, keyed by name
+OBJECTIVES = {
+    "lifetime": "Lifetime value (EUR)",
+    "net": "Net income (EUR, CoL adjusted)",
+}
+
+
+def split_value(salary, dividend, gross_income, company_expenses, scenario_idx, table, objective="lifetime"):
+    """Taxes and value to the owner of a salary and a dividend paid now.
+
+    Amounts are in the scenario's local currency and broadcast against each
+    other; the dividend is capped at the profit left after corporate tax.
+    The "lifetime" value counts pension contributions as the owner's and
+    retained earnings after the dividend tax due when they are paid out in a
+    later year. The "net" value is the engine's net income: retained
+    earnings count in full and pension contributions as spent, adjusted for
+    cost of living. Both values are in EUR.
+    """
+    salary = np.asarray(salary, dtype=np.float64)
+    scenario_idx = np.asarray(scenario_idx, dtype=np.intp)
+
+    personal_tax = table["income_tax"].tax(salary, scenario_idx)
+    social_security = table["social_security"].tax(salary, scenario_idx)
+    pension = salary * table["pension_rate"][scenario_idx]
+
+    profit = np.maximum(gross_income - company_expenses - salary, 0.0)
+    corporate_tax = table["corporate_tax"].tax(profit, scenario_idx)
+    after_tax_profit = profit - corporate_tax
+    dividend = np.clip(dividend, 0.0, after_tax_profit)
+    retained = after_tax_profit - dividend
+    dividend_tax = table["dividend_tax"].tax(dividend, scenario_idx)
+
+    net_income = salary - personal_tax - social_security - pension + dividend - dividend_tax + retained
+    if objective == "lifetime":
+        value = net_income + pension - table["dividend_tax"].tax(retained, scenario_idx)
+        value = value / table["fx_rate"][scenario_idx]
+    elif objective == "net":
+        value = net_income / table["fx_rate"][scenario_idx] * (100 / table["col_index"][scenario_idx])
+    else:
+        raise ValueError(f"Unknown objective: {objective}")
+
+    return {
+        "salary": salary,
+        "dividend": dividend,
+        "retained": retained,
+        "personal_tax": personal_tax,
+        "social_security": social_security,
+        "pension": pension,
+        "corporate_tax": corporate_tax,
+        "dividend_tax": dividend_tax,
+        "net_income": net_income,
+        "value": value,
+    }
+
+
+def salary_candidates(gross_income, company_expenses, scenario, table):
+    """Salaries (local currency) at which the optimum of one scenario can lie"""
+    low = table["min_salary"][scenario]
+    high = max(low, gross_income - company_expenses)
+    corporate = table["corporate_tax"].thresholds(scenario)
+    dividend = table["dividend_tax"].thresholds(scenario)
+
+    # Profit left after corporate tax rises strictly with profit, so the
+    # salaries where it equals a dividend threshold, or the sum of two, are
+    # found by interpolating between the corporate thresholds
+    max_profit = high - low
+    profit = np.unique(np.append(corporate[corporate < max_profit], max_profit))
+    after_tax = profit - table["corporate_tax"].tax(profit, scenario)
+    targets = np.unique((dividend[:, None] + dividend[None, :]).ravel())
+    targets = targets[targets <= after_tax[-1]]
+    crossings = np.interp(targets, after_tax, profit)
+
+    candidates = np.concatenate([
+        [low, high],
+        table["income_tax"].thresholds(scenario),
+        table["social_security"].thresholds(scenario),
+        gross_income - company_expenses - corporate,
+        gross_income - company_expenses - crossings,
+    ])
+    return np.unique(np.clip(candidates, low, high))
+
+
+def optimize_splits(gross_income, company_expenses, table, objective="lifetime"):
+    """Best salary and dividend for every company scenario in `table`.
+
+    `gross_income` and `company_expenses` hold one value per scenario in its
+    local currency. Returns a dict of arrays with one entry per company
+    scenario: its "scenario" index, the `split_value` columns of the best
+    split and the "baseline" value of the engine's split (the minimum
+    salary, nothing paid out).
+    """
+    gross_income = np.asarray(gross_income, dtype=np.float64)
+    company_expenses = np.asarray(company_expenses, dtype=np.float64)
+    scenarios = np.flatnonzero(table["kind"] == COMPANY)
+
+    # Candidates are padded to a common length by repeating the minimum salary
+    salaries = [salary_candidates(gross_income[s], company_expenses[s], s, table) for s in scenarios]
+    salary = np.full((len(scenarios), max((c.size for c in salaries), default=1)), np.nan)
+    for row, candidates in zip(salary, salaries):
+        row[:candidates.size] = candidates
+        row[candidates.size:] = candidates[0]
+    thresholds = [table["dividend_tax"].thresholds(s) for s in scenarios]
+    dividend_thresholds = np.zeros((len(scenarios), max((t.size for t in thresholds), default=1)))
+    for row, t in zip(dividend_thresholds, thresholds):
+        row[:t.size] = t
+
+    # Every dividend vertex for each salary: nothing, everything, or a
+    # threshold reached by the payout or by the retained part
+    gross = gross_income[scenarios, None]
+    expenses = company_expenses[scenarios, None]
+    profit = np.maximum(gross - expenses - salary, 0.0)
+    idx = scenarios[:, None]
+    after_tax_profit = profit - table["corporate_tax"].tax(profit, idx)
+    dividend = np.concatenate([
+        np.zeros_like(salary)[:, :, None],
+        after_tax_profit[:, :, None],
+        np.broadcast_to(dividend_thresholds[:, None, :], salary.shape + dividend_thresholds.shape[1:]),
+        after_tax_profit[:, :, None] - dividend_thresholds[:, None, :],
+    ], axis=2)
+
+    grid = split_value(
+        salary[:, :, None], dividend, gross[:, :, None], expenses[:, :, None], idx[:, :, None], table, objective
+    )
+    best = grid["value"].reshape(len(scenarios), -1).argmax(axis=1)
+    rows = np.arange(len(scenarios))
+
+    result = {"scenario": scenarios}
+    for key, column in grid.items():
+        result[key] = np.broadcast_to(column, dividend.shape).reshape(len(scenarios), -1)[rows, best]
+    result["baseline"] = split_value(
+        table["min_salary"][scenarios], 0.0, gross[:, 0], expenses[:, 0], scenarios, table, objective
+    )["value"]
+    return result
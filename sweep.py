@@ -0,0 +1,55 @@
+"""Daily-rate x working-days sensitivity sweep over all scenarios."""
+import numpy as np
+
+from engine import evaluate, gross_breakpoints
+
+# Input ranges of the master income parameters
+RATE_RANGE = (200, 2000)
+DAYS_RANGE = (100, 240)
+
+
+def grid_axes(rate_step=50, days_step=5):
+    """Daily rate and working day axes covering the full input ranges"""
+    daily_rates = np.arange(RATE_RANGE[0], RATE_RANGE[1] + rate_step, rate_step, dtype=np.float64)
+    working_days = np.arange(DAYS_RANGE[0], DAYS_RANGE[1] + days_step, days_step, dtype=np.float64)
+    return daily_rates, working_days
+
+
+def sweep_grid(daily_rates, working_days, company_expenses, table):
+    """Evaluate every scenario on the full rate x days grid.
+
+    `company_expenses` holds one value per scenario in its local currency.
+    Returns EUR net income, EUR CoL-adjusted net income and retention
+    percentage, each shaped (scenarios, len(working_days), len(daily_rates)).
+
+    Net income is piecewise linear in gross income, so the engine only runs
+    at each scenario's bracket kinks inside the grid's income range and the
+    grid is filled by exact linear interpolation between them.
+    """
+    annual_income = np.asarray(working_days, dtype=np.float64)[:, None] * np.asarray(daily_rates, dtype=np.float64)[None, :]
+    lowest, highest = annual_income.min(), annual_income.max()
+    scenario_count = len(table["kind"])
+    shape = (scenario_count,) + annual_income.shape
+    surfaces = {
+        "net_income_eur": np.empty(shape),
+        "net_income_adjusted_eur": np.empty(shape),
+        "retention_pct": np.empty(shape),
+    }
+
+    for scenario in range(scenario_count):
+        fx_rate = table["fx_rate"][scenario]
+        expenses = float(company_expenses[scenario])
+        kinks = gross_breakpoints(table, scenario, expenses) / fx_rate
+        points = np.unique(np.concatenate([[lowest, highest], kinks[(kinks > lowest) & (kinks < highest)]]))
+        net_income = evaluate(points * fx_rate, expenses, scenario, table)["net_income"]
+
+        net_income_eur = np.interp(annual_income, points, net_income / fx_rate)
+        surfaces["net_income_eur"][scenario] = net_income_eur
+        surfaces["net_income_adjusted_eur"][scenario] = net_income_eur * (100 / table["col_index"][scenario])
+        surfaces["retention_pct"][scenario] = net_income_eur * 100 / annual_income
+    return surfaces
+
+
+def crossover(surface, first, second):
+    """Margin by which scenario `first` beats scenario `second` on each grid point"""
+    return surface[first] - surface[second]
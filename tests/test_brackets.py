@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from brackets import BracketSet, flat
+
+TABLES = [
+    [(0, 0.1), (10_000, 0.2), (50_000, 0.35), (120_000, 0.5)],
+    flat(0.09),
+    [(0, 0.0), (24_000, 0.12)],
+    flat(0.0),
+]
+
+
+def scalar_tax(amount, brackets):
+    """Tax on one amount, bracket by bracket"""
+    tax = 0.0
+    for (lower, rate), (upper, _) in zip(brackets, brackets[1:] + [(float("inf"), None)]):
+        if amount > lower:
+            tax += (min(amount, upper) - lower) * rate
+    return tax
+
+
+def test_tax_matches_scalar_loop():
+    rng = np.random.default_rng(0)
+    amounts = np.concatenate([
+        rng.uniform(-5_000, 300_000, 2_000),
+        [0.0, 10_000, 24_000, 50_000, 120_000, 1e9],
+    ])
+    table_idx = rng.integers(0, len(TABLES), amounts.size)
+    table_idx[-6:] = 0
+    taxes = BracketSet(TABLES).tax(amounts, table_idx)
+    expected = [scalar_tax(a, TABLES[i]) for a, i in zip(amounts, table_idx)]
+    np.testing.assert_allclose(taxes, expected, rtol=1e-12, atol=1e-6)
+
+
+def test_negative_amounts_owe_nothing():
+    taxes = BracketSet(TABLES).tax(np.array([-1.0, -1e6]), np.array([0, 1]))
+    np.testing.assert_array_equal(taxes, [0.0, 0.0])
+
+
+def test_tax_broadcasts_one_table_over_many_amounts():
+    amounts = np.linspace(0, 200_000, 101).reshape(101, 1)
+    taxes = BracketSet(TABLES).tax(amounts, np.arange(len(TABLES)))
+    assert taxes.shape == (101, len(TABLES))
+    for i, brackets in enumerate(TABLES):
+        np.testing.assert_allclose(taxes[:, i], [scalar_tax(a, brackets) for a in amounts[:, 0]], atol=1e-6)
+
+
+@pytest.mark.parametrize("brackets", [[], [(100, 0.1)], [(0, 0.1), (0, 0.2)]])
+def test_malformed_tables_are_rejected(brackets):
+    with pytest.raises(ValueError):
+        BracketSet([brackets])
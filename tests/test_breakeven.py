@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from breakeven import required_daily_rate, required_income
+from engine import ALL_SCENARIOS, COMPANY, build_scenario_table, evaluate
+
+WORKING_DAYS = 210
+TARGETS = np.array([60_000.0, 120_000.0, 250_000.0, 1_000_000.0])
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_scenario_table(ALL_SCENARIOS)
+
+
+@pytest.mark.parametrize("adjusted", [True, False])
+def test_required_rate_reproduces_target(table, adjusted):
+    expenses = np.linspace(5_000, 30_000, len(ALL_SCENARIOS))
+    rates = required_daily_rate(TARGETS, WORKING_DAYS, expenses, table, adjusted)
+    assert np.isfinite(rates).all()
+
+    scenario = np.arange(len(ALL_SCENARIOS))[:, None]
+    fx_rate = table["fx_rate"][scenario]
+    result = evaluate(rates * WORKING_DAYS * fx_rate, expenses[:, None], scenario, table)
+    key = "net_income_adjusted" if adjusted else "net_income"
+    achieved = result[key] / fx_rate
+    targets = np.broadcast_to(TARGETS, rates.shape)
+
+    # Company scenarios can beat a low target with the minimum salary alone,
+    # then the rate is where that salary is earned
+    start = np.where(table["kind"] == COMPANY, table["min_salary"] + expenses, 0.0) / table["fx_rate"]
+    at_start = np.isclose(rates * WORKING_DAYS, start[:, None])
+    assert (achieved[at_start] >= targets[at_start]).all()
+    np.testing.assert_allclose(achieved[~at_start], targets[~at_start], rtol=1e-9)
+
+
+def test_target_met_at_start_needs_no_more_income(table):
+    expenses = np.zeros(len(ALL_SCENARIOS))
+    incomes = required_income([-1.0], expenses, table)
+    start = np.where(table["kind"] == COMPANY, table["min_salary"] / table["fx_rate"], 0.0)
+    np.testing.assert_allclose(incomes[:, 0], start)
@@ -0,0 +1,102 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pytest
+
+import fixedpoint
+from engine import ALL_SCENARIOS, build_scenario_table
+from jurisdictions import COMPANY, SELF_EMPLOYED
+
+CENT = Decimal("0.01")
+MONEY_KEYS = ["gross_income", "net_income", "net_income_adjusted", "personal_tax",
+              "corporate_tax", "social_security", "pension"]
+
+
+def decimal(value):
+    return Decimal(repr(float(value)))
+
+
+def cents(value):
+    return decimal(value).quantize(CENT, ROUND_HALF_UP)
+
+
+def decimal_tax(amount, brackets):
+    amount = max(amount, Decimal(0))
+    tax = Decimal(0)
+    for (lower, rate), (upper, _) in zip(brackets, brackets[1:] + [(None, None)]):
+        if amount <= decimal(lower):
+            break
+        top = amount if upper is None else min(amount, decimal(upper))
+        tax += (top - decimal(lower)) * decimal(rate)
+    return tax.quantize(CENT, ROUND_HALF_UP)
+
+
+def decimal_breakdown(daily_rate, working_days, expenses, scenario, fx_rate):
+    """One profile and scenario in Decimal with the rounding rules of `fixedpoint`"""
+    annual_income = (decimal(daily_rate) * decimal(working_days)).quantize(CENT, ROUND_HALF_UP)
+    fx_rate = decimal(fx_rate).quantize(Decimal("0.000001"), ROUND_HALF_UP)
+    gross_income = (annual_income * fx_rate).quantize(CENT, ROUND_HALF_UP)
+    company_expenses = cents(expenses)
+
+    taxable_income = gross_income - company_expenses
+    if scenario.strategy == SELF_EMPLOYED:
+        taxable_income -= decimal(scenario.self_employment_deduction)
+    salary = decimal(scenario.min_salary) if scenario.strategy == COMPANY else taxable_income
+
+    personal_tax = decimal_tax(salary, scenario.income_tax)
+    social_security = decimal_tax(salary, scenario.social_security)
+    pension = Decimal(0)
+    if scenario.strategy != SELF_EMPLOYED:
+        pension = (salary * decimal(scenario.pension_rate)).quantize(CENT, ROUND_HALF_UP)
+    corporate_income = Decimal(0)
+    if scenario.strategy == COMPANY:
+        corporate_income = max(gross_income - salary - company_expenses, Decimal(0))
+    corporate_tax = decimal_tax(corporate_income, scenario.corporate_tax)
+
+    net_income = salary - personal_tax - social_security - pension + corporate_income - corporate_tax
+    return {
+        "gross_income": gross_income,
+        "net_income": net_income,
+        "net_income_adjusted": (net_income * 100 / decimal(scenario.location.cost_of_living)).quantize(
+            CENT, ROUND_HALF_UP
+        ),
+        "personal_tax": personal_tax,
+        "corporate_tax": corporate_tax,
+        "social_security": social_security,
+        "pension": pension,
+    }
+
+
+def test_matches_decimal_reference_to_the_cent():
+    rng = np.random.default_rng(1)
+    rows = 300
+    daily_rate = rng.integers(20_000, 200_000, rows) / 100
+    working_days = rng.integers(100, 240, rows).astype(np.float64)
+    expenses = rng.integers(0, 2_000_000, (rows, len(ALL_SCENARIOS))) / 100
+    # Exact halves of a cent after the percentage rates
+    expenses[:10] = 12_345.5
+
+    table = build_scenario_table(ALL_SCENARIOS)
+    result = fixedpoint.evaluate_profiles(daily_rate, working_days, expenses, fixedpoint.fixed_table(table))
+    for i in range(rows):
+        for j, scenario in enumerate(ALL_SCENARIOS):
+            expected = decimal_breakdown(daily_rate[i], working_days[i], expenses[i, j], scenario, table["fx_rate"][j])
+            for key in MONEY_KEYS:
+                assert result[key][i, j] == int(expected[key] * 100), (key, i, scenario.name)
+
+
+@pytest.mark.parametrize("amount, minor", [(1.005, 101), (-1.005, -101), (0.125, 13), (2.675, 268), (0.0, 0)])
+def test_to_minor_rounds_as_written(amount, minor):
+    assert fixedpoint.to_minor(amount) == minor
+
+
+def test_divide_round_halves_away_from_zero():
+    numerator = np.array([5, 15, -5, -15, 4, -4, 6])
+    np.testing.assert_array_equal(fixedpoint.divide_round(numerator, 10), [1, 2, -1, -2, 0, 0, 1])
+
+
+def test_to_minor_rejects_out_of_range_amounts():
+    with pytest.raises(ValueError):
+        fixedpoint.to_minor([np.inf])
+    with pytest.raises(ValueError):
+        fixedpoint.to_minor([1e12])
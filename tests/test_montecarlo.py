@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+import montecarlo
+from engine import BASE_SCENARIOS
+
+EXPENSES = np.full(len(BASE_SCENARIOS), 10_000.0)
+
+
+def run(**kwargs):
+    kwargs = {"draws": 2_000, "chunk_size": 500, "seed": 7, **kwargs}
+    return montecarlo.simulate(800, 200, EXPENSES, BASE_SCENARIOS, **kwargs)
+
+
+@pytest.mark.parametrize("correlation", [-0.55, -1.0, 1.0])
+def test_feasible_correlations(correlation):
+    result = run(uncertainty={"fx_correlation": correlation})
+    for samples in result.values():
+        assert samples.shape == (2_000, len(BASE_SCENARIOS))
+        assert np.isfinite(samples).all()
+
+
+@pytest.mark.parametrize("correlation", [-1.1, 1.1])
+def test_infeasible_correlations(correlation):
+    with pytest.raises(ValueError):
+        run(uncertainty={"fx_correlation": correlation})
+
+
+def test_feasible_range_counts_volatile_rates():
+    three_rates = {"fx_volatility": {"CHF": 0.06, "AED": 0.08, "EUR": 0.01}}
+    assert montecarlo.min_fx_correlation(3) == -0.5
+    run(uncertainty={**three_rates, "fx_correlation": -0.5})
+    with pytest.raises(ValueError):
+        run(uncertainty={**three_rates, "fx_correlation": -0.55})
+
+
+def test_results_independent_of_workers():
+    serial = run(workers=1)
+    parallel = run(workers=3)
+    for key in serial:
+        np.testing.assert_array_equal(serial[key], parallel[key])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from engine import ALL_SCENARIOS, build_scenario_table
+from split import OBJECTIVES, optimize_splits, split_value
+
+
+@pytest.fixture(scope="module")
+def table():
+    return build_scenario_table(ALL_SCENARIOS)
+
+
+@pytest.mark.parametrize("objective", list(OBJECTIVES))
+@pytest.mark.parametrize("daily_rate", [400.0, 900.0, 1_800.0])
+def test_optimum_beats_brute_force_grid(table, objective, daily_rate):
+    gross_income = daily_rate * 210 * table["fx_rate"]
+    expenses = np.full(len(ALL_SCENARIOS), 15_000.0) * table["fx_rate"]
+    best = optimize_splits(gross_income, expenses, table, objective)
+    assert best["scenario"].size
+
+    for row, scenario in enumerate(best["scenario"]):
+        low = table["min_salary"][scenario]
+        high = max(low, gross_income[scenario] - expenses[scenario])
+        salary = np.linspace(low, high, 801)[:, None]
+        profit = np.maximum(gross_income[scenario] - expenses[scenario] - salary, 0.0)
+        after_tax_profit = profit - table["corporate_tax"].tax(profit, scenario)
+        dividend = after_tax_profit * np.linspace(0, 1, 201)[None, :]
+        grid = split_value(
+            salary, dividend, gross_income[scenario], expenses[scenario], scenario, table, objective
+        )["value"]
+
+        assert best["value"][row] >= grid.max() - 1e-6
+        assert best["value"][row] >= best["baseline"][row] - 1e-6
+        again = split_value(
+            best["salary"][row], best["dividend"][row], gross_income[scenario], expenses[scenario],
+            scenario, table, objective,
+        )["value"]
+        assert again == pytest.approx(best["value"][row])
+
+
+def test_unknown_objective_is_rejected(table):
+    with pytest.raises(ValueError):
+        split_value(50_000.0, 0.0, 100_000.0, 0.0, 0, table, objective="taxes")
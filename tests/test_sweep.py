@@ -0,0 +1,28 @@
+import numpy as np
+
+from engine import ALL_SCENARIOS, build_scenario_table, evaluate
+from sweep import crossover, grid_axes, sweep_grid
+
+
+def test_interpolation_matches_direct_evaluation():
+    table = build_scenario_table(ALL_SCENARIOS)
+    expenses = np.linspace(0, 40_000, len(ALL_SCENARIOS))
+    daily_rates, working_days = grid_axes(rate_step=25, days_step=5)
+    surfaces = sweep_grid(daily_rates, working_days, expenses, table)
+
+    annual_income = working_days[:, None] * daily_rates[None, :]
+    fx_rate = table["fx_rate"][:, None, None]
+    direct = evaluate(
+        annual_income[None] * fx_rate, expenses[:, None, None],
+        np.arange(len(ALL_SCENARIOS))[:, None, None], table,
+    )
+    np.testing.assert_allclose(surfaces["net_income_eur"], direct["net_income"] / fx_rate, rtol=1e-9, atol=1e-6)
+    np.testing.assert_allclose(
+        surfaces["net_income_adjusted_eur"], direct["net_income_adjusted"] / fx_rate, rtol=1e-9, atol=1e-6
+    )
+    np.testing.assert_allclose(surfaces["retention_pct"], direct["retention_pct"], rtol=1e-9, atol=1e-9)
+
+
+def test_crossover_is_the_margin_between_two_scenarios():
+    surface = np.arange(12.0).reshape(3, 2, 2)
+    np.testing.assert_array_equal(crossover(surface, 2, 0), np.full((2, 2), 8.0))